@@ -0,0 +1,274 @@
+"""Times the analysis and forecasting hot paths at several dataset sizes.
+
+    python -m benchmarks.run                      # run and print timings
+    python -m benchmarks.run --save-baseline      # record a new baseline
+    python -m benchmarks.run --compare            # exit 1 on regressions
+
+Import benchmarks time ``python -c "import <module>"`` in a fresh process,
+less bare interpreter startup, and are reported under the "process" scale.
+Timings are the best of ``--repeat`` runs. A benchmark regresses when it
+is more than ``--threshold`` slower than the stored baseline; baselines
+are machine-specific, so record one on the machine that checks them.
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from benchmarks.synthetic import make_dataset
+from sample import clustering, core, helpers
+from sample.cache import default_cache
+from sample.facts import build_fact_table, cluster_totals, frame_dates
+from sample.ranges import PerformanceIndex
+from sample.volatility import VolatilityEngine
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+THRESHOLD = 0.25
+MIN_SECONDS = 0.05
+
+# (carriers, quarters) per scale.
+SCALES = {
+    "small": (12, 84),
+    "medium": (60, 168),
+    "large": (240, 336),
+}
+
+
+def _cluster_map(airlines):
+    return {c: airlines[c::3] for c in range(3)}
+
+
+def _context(n_carriers, n_quarters):
+    df = make_dataset(n_carriers, n_quarters)
+    airlines = helpers.extract_airlines(df)
+    columns = helpers.extract_columns(df, airlines, "PASSENGER")
+    series = pd.Series(
+        df[columns[0]].to_numpy(), index=frame_dates(df), name=columns[0]
+    )
+    fitted, forecast, _ = core.smooth_forecast.uncached(series, 16)
+    return {
+        "df": df,
+        "airlines": airlines,
+        "columns": columns,
+        "cluster_map": _cluster_map(airlines),
+        "series": series,
+        "forecast": forecast,
+        "residuals": series - fitted,
+        # The years test_airline_performance_by_range accepts.
+        "last_year": min(int(df["Year"].max()), 2023),
+    }
+
+
+# Each benchmark takes the context for a scale and runs one hot path.
+# Memoized functions are called uncached so repeats measure real work.
+BENCHMARKS = {
+    "extract_columns": lambda c: helpers.extract_columns(
+        c["df"], c["airlines"], "OPERATING_REVENUE"
+    ),
+    "normalize_columns": lambda c: helpers.normalize_columns(
+        c["df"], c["columns"]
+    ),
+    "calculate_performance": lambda c: helpers.calculate_performance.uncached(
+        c["df"], c["airlines"]
+    ),
+    "performance_by_range": lambda c: PerformanceIndex(c["df"]).score(
+        2003, c["last_year"]
+    ),
+    "cluster_totals": lambda c: cluster_totals(
+        build_fact_table(c["df"], c["cluster_map"])
+    ),
+    "smooth_forecast": lambda c: core.smooth_forecast.uncached(
+        c["series"], 16
+    ),
+    "cluster_airlines": lambda c: clustering.cluster_airlines(c["df"]),
+    "share_volatility": lambda c: VolatilityEngine(c["df"]),
+    "monte_carlo_forecast": lambda c: helpers.monte_carlo_forecast(
+        c["forecast"], c["residuals"], n_simulations=1000, seed=0
+    ),
+}
+
+# Modules whose cold import time is tracked; the CLI must stay light.
+IMPORTS = ("sample.cli", "sample.core", "sample.helpers")
+
+
+def time_call(func, repeat=5):
+    """Best per-call seconds over ``repeat`` runs, looping fast calls
+    until one run takes at least MIN_SECONDS."""
+    start = time.perf_counter()
+    func()
+    first = time.perf_counter() - start
+    number = max(1, math.ceil(MIN_SECONDS / max(first, 1e-9)))
+    best = first
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def run(scales=tuple(SCALES), names=tuple(BENCHMARKS), repeat=5):
+    """Returns ``{benchmark: {scale: seconds}}``."""
+    # Keep the shared memo cache out of the measurements.
+    saved = default_cache.maxsize, default_cache.directory
+    default_cache.maxsize, default_cache.directory = 0, None
+    results = {name: {} for name in names}
+    try:
+        for scale in scales:
+            context = _context(*SCALES[scale])
+            for name in names:
+                results[name][scale] = time_call(
+                    lambda: BENCHMARKS[name](context), repeat
+                )
+    finally:
+        default_cache.maxsize, default_cache.directory = saved
+    return results
+
+
+def _process_seconds(code, repeat):
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_imports(modules=IMPORTS, repeat=5):
+    """Returns ``{"import <module>": {"process": seconds}}``: the cold
+    import time of each module in a new interpreter."""
+    startup = _process_seconds("pass", repeat)
+    return {
+        f"import {module}": {
+            "process": max(
+                _process_seconds(f"import {module}", repeat) - startup, 0.0
+            )
+        }
+        for module in modules
+    }
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """Rows for every benchmark/scale present in both, with a
+    ``regressed`` flag when slower than the baseline by over threshold."""
+    rows = []
+    for name, scales in results.items():
+        for scale, seconds in scales.items():
+            base = baseline.get(name, {}).get(scale)
+            if base is None:
+                continue
+            ratio = seconds / base
+            rows.append(
+                {
+                    "benchmark": name,
+                    "scale": scale,
+                    "baseline": base,
+                    "seconds": seconds,
+                    "ratio": ratio,
+                    "regressed": ratio > 1 + threshold,
+                }
+            )
+    return pd.DataFrame(
+        rows,
+        columns=[
+            "benchmark",
+            "scale",
+            "baseline",
+            "seconds",
+            "ratio",
+            "regressed",
+        ],
+    )
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+    }
+
+
+def load_baseline(path=BASELINE):
+    with open(path) as fh:
+        return json.load(fh)["results"]
+
+
+def save_baseline(results, path=BASELINE):
+    with open(path, "w") as fh:
+        json.dump(
+            {"environment": environment(), "results": results},
+            fh,
+            indent=2,
+            sort_keys=True,
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", nargs="+", choices=SCALES, default=None)
+    parser.add_argument(
+        "--benchmarks", nargs="+", choices=BENCHMARKS, default=None
+    )
+    parser.add_argument("--imports", nargs="*", choices=IMPORTS, default=None)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--output", help="also write results to this JSON")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = run(
+        tuple(args.scales or SCALES),
+        tuple(args.benchmarks or BENCHMARKS),
+        args.repeat,
+    )
+    table = pd.DataFrame(results).T[list(args.scales or SCALES)]
+    print("Seconds per call:\n")
+    print(table.to_string(float_format=lambda s: f"{s:.6f}"))
+    imports = run_imports(
+        tuple(IMPORTS if args.imports is None else args.imports), args.repeat
+    )
+    if imports:
+        print("\nImport seconds (fresh interpreter):\n")
+        print(
+            pd.DataFrame(imports).T.to_string(
+                float_format=lambda s: f"{s:.6f}"
+            )
+        )
+        results.update(imports)
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2, sort_keys=True)
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        print(f"\nBaseline written to {args.baseline}")
+    if args.compare:
+        report = compare(results, load_baseline(args.baseline), args.threshold)
+        print(f"\nAgainst {args.baseline} (threshold {args.threshold:.0%}):\n")
+        print(report.to_string(index=False))
+        if report["regressed"].any():
+            print(
+                "\nRegressed:",
+                ", ".join(
+                    f"{r.benchmark}[{r.scale}]"
+                    for r in report[report["regressed"]].itertuples()
+                ),
+            )
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
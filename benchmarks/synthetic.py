@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+from sample.catalog import METRICS
+
+# Real carriers first, so small datasets look like the workbook.
+CARRIERS = (
+    "AMERICAN",
+    "DELTA",
+    "UNITED",
+    "SOUTHWEST",
+    "ALASKA",
+    "FRONTIER",
+    "ALLEGIANT",
+    "SPIRIT",
+    "JETBLUE",
+    "SUN_COUNTRY",
+    "HAWAIIN",
+    "SKYWEST",
+)
+
+
+def carrier_names(n_carriers):
+    extra = [f"CARRIER{i:04d}" for i in range(len(CARRIERS), n_carriers)]
+    return list(CARRIERS[:n_carriers]) + extra
+
+
+def make_dataset(n_carriers=12, n_quarters=84, metrics=METRICS, seed=0):
+    """Wide airline sheet (Year, Quarter, <CARRIER>_<METRIC>) of any size.
+
+    Passenger and revenue series are positive with trend and quarterly
+    seasonality; net income oscillates around zero. Quarters start at
+    2003 Q1 like the workbook.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(n_quarters)
+    season = np.tile([0.9, 1.05, 1.1, 0.95], n_quarters // 4 + 1)[:n_quarters]
+    scale = rng.uniform(0.5, 5.0, (n_carriers, 1))
+    growth = rng.uniform(0.002, 0.02, (n_carriers, 1))
+    noise = rng.normal(0, 0.01, (len(metrics), n_carriers, n_quarters))
+
+    data = {
+        "Year": 2003 + t // 4,
+        "Quarter": np.array(["Q1", "Q2", "Q3", "Q4"])[t % 4],
+    }
+    carriers = carrier_names(n_carriers)
+    for m, metric in enumerate(metrics):
+        if metric == "NET_INCOME":
+            phase = rng.uniform(0, 2 * np.pi, (n_carriers, 1))
+            values = 1e8 * scale * (np.sin(t / 6 + phase) + noise[m])
+        else:
+            unit = 5e6 if metric == "PASSENGER" else 1e9
+            values = unit * scale * (1 + growth * t) * (season + noise[m])
+        for i, carrier in enumerate(carriers):
+            data[f"{carrier}_{metric}"] = values[i]
+    return pd.DataFrame(data)
@@ -0,0 +1,222 @@
+import os
+import types
+
+import numpy as np
+import pandas as pd
+from sample.cache import CACHE_VERSION, ResultCache, content_hash
+from sample.forecasting import parallel_map
+from sample.holtwinters import HoltWintersBatch
+
+FOLD_CACHE_DIR = os.environ.get("AIRLINE_FOLD_CACHE")
+
+# Fold caches of this process, by directory (None: memory only).
+_fold_caches = {}
+
+
+def rolling_origins(n, initial, step=1, window=None):
+    """``(start, origin)`` training slices for rolling-origin evaluation.
+
+    Training covers ``[start, origin)`` and the forecast is scored on the
+    points from ``origin`` on. ``window=None`` gives an expanding window
+    starting at 0, otherwise a sliding one of ``window`` points. Origins
+    advance by ``step`` and stop once no point is left to score, so the
+    last folds score fewer points than the longer horizons need.
+    """
+    if window is not None and window > initial:
+        raise ValueError("window cannot be longer than the initial fold")
+    if initial >= n:
+        raise ValueError(f"initial ({initial}) leaves nothing to score")
+    origins = range(initial, n, step)
+    if window is None:
+        return [(0, origin) for origin in origins]
+    return [(origin - window, origin) for origin in origins]
+
+
+def _fold_rows(key, series, start, origin, forecast):
+    actual = series.iloc[origin : origin + len(forecast)]
+    h = np.arange(1, len(actual) + 1)
+    return {
+        "key": [key] * len(h),
+        "Origin": [series.index[origin - 1]] * len(h),
+        "Horizon": h,
+        "Train Size": origin - start,
+        "Actual": actual.to_numpy(dtype=float),
+        "Forecast": np.asarray(forecast, dtype=float)[: len(h)],
+    }
+
+
+def _fold_cache(directory):
+    if directory not in _fold_caches:
+        _fold_caches[directory] = ResultCache(directory=directory)
+    return _fold_caches[directory]
+
+
+def _forecaster_key(forecaster):
+    """Name, code and defaults of a forecaster, so folds fitted by an
+    earlier version of it are not reused."""
+    func = getattr(forecaster, "uncached", forecaster)
+    code = getattr(func, "__code__", None)
+    if code is None:
+        return repr(forecaster)
+    consts = [c for c in code.co_consts if not isinstance(c, types.CodeType)]
+    return (
+        f"{func.__module__}.{func.__qualname__}",
+        code.co_code,
+        code.co_names,
+        consts,
+        func.__defaults__,
+    )
+
+
+def _fold_task(task):
+    """Fits one fold once at the longest horizon; every shorter horizon
+    is scored from the same forecast. Forecasts are cached under the
+    forecaster, its configuration, the training slice and the horizon."""
+    key, series, start, origin, forecaster, horizon, config, directory = task
+    train = series.iloc[start:origin]
+    cache = _fold_cache(directory)
+    cache_key = content_hash(
+        "fold",
+        _forecaster_key(forecaster),
+        CACHE_VERSION,
+        config,
+        train,
+        horizon,
+    )
+    found, forecast = cache.get(cache_key)
+    if not found:
+        kwargs = {} if config is None else {"config": config}
+        _, forecast, _ = forecaster(train, horizon, **kwargs)
+        forecast = np.asarray(forecast, dtype=float)
+        cache.put(cache_key, forecast)
+    return _fold_rows(key, series, start, origin, forecast)
+
+
+def _batched_folds(tasks, horizon, seasonal):
+    """Fits folds with the batched Holt-Winters, one batch per training
+    length, so all series (and, for sliding windows, all folds) sharing
+    a length are optimised together."""
+    by_length = {}
+    for task in tasks:
+        _, _, start, origin = task
+        by_length.setdefault(origin - start, []).append(task)
+
+    rows = []
+    for group in by_length.values():
+        values = np.stack(
+            [
+                series.iloc[start:origin].to_numpy(dtype=float)
+                for _, series, start, origin in group
+            ]
+        )
+        model = HoltWintersBatch(values, seasonal).fit()
+        for task, forecast in zip(group, model.forecast(horizon)):
+            rows.append(_fold_rows(*task, forecast))
+    return rows
+
+
+def backtest_errors(
+    series_by_key,
+    forecaster=None,
+    horizon=8,
+    initial=None,
+    step=1,
+    window=None,
+    n_workers=None,
+    seasonal="add",
+    configs=None,
+    cache_dir=FOLD_CACHE_DIR,
+):
+    """Per-fold forecasts and actuals for every series and horizon.
+
+    ``forecaster`` is a module-level ``(series, horizon) -> (fitted,
+    forecast, model_fit)`` function, as for run_forecasts, and ``configs``
+    optionally maps keys to the configuration passed on to it. Folds are
+    then fitted in parallel with one fit per fold. Fold forecasts are
+    cached in memory, and also in ``cache_dir`` (AIRLINE_FOLD_CACHE) when
+    set, which worker processes and later runs share. ``forecaster=None``
+    fits the folds with the batched Holt-Winters (``seasonal``
+    seasonality) instead. ``initial`` defaults to half of each series.
+    """
+    tasks = []
+    for key, series in series_by_key.items():
+        first = len(series) // 2 if initial is None else initial
+        for start, origin in rolling_origins(len(series), first, step, window):
+            tasks.append((key, series, start, origin))
+
+    if forecaster is None:
+        rows = _batched_folds(tasks, horizon, seasonal)
+    else:
+        configs = configs or {}
+        rows = parallel_map(
+            _fold_task,
+            [
+                task + (forecaster, horizon, configs.get(task[0]), cache_dir)
+                for task in tasks
+            ],
+            n_workers,
+        )
+
+    errors = pd.concat([pd.DataFrame(r) for r in rows], ignore_index=True)
+    errors["Error"] = errors["Actual"] - errors["Forecast"]
+    return errors
+
+
+def summarize(errors, key_names=("Metric", "Group")):
+    """Tidy accuracy table: one row per series key and horizon with the
+    number of folds, MAE, RMSE and MAPE."""
+    scored = pd.DataFrame(
+        {
+            "key": errors["key"],
+            "Horizon": errors["Horizon"],
+            "abs": errors["Error"].abs(),
+            "sq": errors["Error"] ** 2,
+            "ape": (errors["Error"] / errors["Actual"]).abs() * 100,
+        }
+    )
+    table = (
+        scored.groupby(["key", "Horizon"], sort=False)
+        .agg(
+            Folds=("abs", "size"),
+            MAE=("abs", "mean"),
+            RMSE=("sq", "mean"),
+            MAPE=("ape", "mean"),
+        )
+        .reset_index()
+    )
+    table["RMSE"] = np.sqrt(table["RMSE"])
+
+    keys = [k if isinstance(k, tuple) else (k,) for k in table.pop("key")]
+    names = list(key_names)[: len(keys[0])] if keys else list(key_names)
+    key_frame = pd.DataFrame(keys, columns=names)
+    return pd.concat([key_frame, table], axis=1)
+
+
+def backtest(
+    series_by_key,
+    forecaster=None,
+    horizon=8,
+    initial=None,
+    step=1,
+    window=None,
+    n_workers=None,
+    seasonal="add",
+    key_names=("Metric", "Group"),
+    configs=None,
+    cache_dir=FOLD_CACHE_DIR,
+):
+    """Rolling-origin accuracy of ``forecaster`` for every series and
+    every horizon up to ``horizon``; see backtest_errors."""
+    errors = backtest_errors(
+        series_by_key,
+        forecaster,
+        horizon,
+        initial,
+        step,
+        window,
+        n_workers,
+        seasonal,
+        configs,
+        cache_dir,
+    )
+    return summarize(errors, key_names)
@@ -0,0 +1,219 @@
+import functools
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+CACHE_VERSION = 1
+
+
+def _update_array(digest, array):
+    array = np.asarray(array)
+    if array.dtype.kind in "biufcmM":
+        digest.update(f"{array.dtype.str}{array.shape}".encode())
+        digest.update(np.ascontiguousarray(array).tobytes())
+    else:
+        hashed = pd.util.hash_array(array.ravel().astype(object))
+        digest.update(f"O{array.shape}".encode())
+        digest.update(hashed.tobytes())
+
+
+def _update(digest, value):
+    if isinstance(value, pd.DataFrame):
+        digest.update(b"DataFrame")
+        _update(digest, list(value.columns))
+        _update_array(digest, value.index.to_numpy())
+        for _, column in value.items():
+            _update_array(digest, column.to_numpy())
+    elif isinstance(value, pd.Series):
+        digest.update(b"Series")
+        _update(digest, value.name)
+        _update_array(digest, value.index.to_numpy())
+        _update_array(digest, value.to_numpy())
+    elif isinstance(value, (pd.Index, np.ndarray)):
+        _update_array(digest, value)
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"{type(value).__name__}{len(value)}".encode())
+        for item in value:
+            _update(digest, item)
+    elif isinstance(value, dict):
+        digest.update(f"dict{len(value)}".encode())
+        for key in sorted(value, key=repr):
+            _update(digest, key)
+            _update(digest, value[key])
+    elif value is None or isinstance(value, (str, bytes, int, float, bool)):
+        digest.update(repr(value).encode())
+    elif isinstance(value, np.generic):
+        digest.update(repr(value.item()).encode())
+    else:
+        digest.update(pickle.dumps(value))
+
+
+def content_hash(*values):
+    """SHA-256 over the contents (not identities) of frames, arrays and
+    plain Python values."""
+    digest = hashlib.sha256()
+    for value in values:
+        _update(digest, value)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Two-tier memo store: an in-memory LRU in front of a pickle
+    directory that evicts least-recently-used files past ``max_bytes``.
+
+    Values are shared, not copied, so callers must not mutate them.
+    """
+
+    def __init__(self, maxsize=256, directory=None, max_bytes=256 << 20):
+        self.maxsize = maxsize
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = None
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.pkl")
+
+    def get(self, key):
+        """Returns ``(found, value)``."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return True, self._memory[key]
+
+        if self.directory is not None:
+            path = self._path(key)
+            try:
+                with open(path, "rb") as fh:
+                    value = pickle.load(fh)
+                os.utime(path)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                pass
+            else:
+                self._remember(key, value)
+                self.hits += 1
+                return True, value
+
+        self.misses += 1
+        return False, None
+
+    def put(self, key, value):
+        self._remember(key, value)
+        if self.directory is None:
+            return
+        try:
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(payload)
+        os.replace(tmp, path)
+        self._evict_disk(len(payload))
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.maxsize:
+                self._memory.popitem(last=False)
+
+    def _disk_entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".pkl"):
+                    path = os.path.join(root, name)
+                    stat = os.stat(path)
+                    yield stat.st_mtime, stat.st_size, path
+
+    def _evict_disk(self, added):
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(s for _, s, _ in self._disk_entries())
+            else:
+                self._disk_bytes += added
+            if self._disk_bytes <= self.max_bytes:
+                return
+            entries = sorted(self._disk_entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+            self._disk_bytes = total
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self.directory is not None:
+            for _, _, path in list(self._disk_entries()):
+                os.remove(path)
+            self._disk_bytes = 0
+
+
+default_cache = ResultCache(directory=os.environ.get("AIRLINE_RESULT_CACHE"))
+
+
+def configure_cache(maxsize=None, directory=None, max_bytes=None):
+    """Adjusts the shared cache used by @memoize; ``directory`` enables the
+    on-disk tier (also settable with AIRLINE_RESULT_CACHE)."""
+    if maxsize is not None:
+        default_cache.maxsize = maxsize
+    if directory is not None:
+        default_cache.directory = directory
+        default_cache._disk_bytes = None
+    if max_bytes is not None:
+        default_cache.max_bytes = max_bytes
+    return default_cache
+
+
+def _detached(value):
+    """Copy of the frames, series and arrays in a result (also inside
+    tuples, lists and dicts); anything else is shared."""
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index, np.ndarray)):
+        return value.copy()
+    if isinstance(value, (tuple, list)):
+        return type(value)(_detached(item) for item in value)
+    if isinstance(value, dict):
+        return {key: _detached(item) for key, item in value.items()}
+    return value
+
+
+def memoize(func=None, *, cache=None):
+    """Caches a pure function's results keyed by a hash of its inputs.
+
+    Frames, series and arrays in the result are copied on the way out, so
+    a caller mutating its result does not corrupt later hits.
+    """
+    if func is None:
+        return functools.partial(memoize, cache=cache)
+
+    name = f"{func.__module__}.{func.__qualname__}:{CACHE_VERSION}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        store = cache or default_cache
+        key = content_hash(name, args, kwargs)
+        found, value = store.get(key)
+        if not found:
+            value = func(*args, **kwargs)
+            store.put(key, value)
+        return _detached(value)
+
+    wrapper.uncached = func
+    return wrapper
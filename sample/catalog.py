@@ -0,0 +1,100 @@
+from functools import lru_cache
+
+METRICS = ("PASSENGER", "NET_INCOME", "OPERATING_REVENUE")
+
+# Column suffixes seen in the workbook for each metric, including the
+# misspelled ALASKA_OPERTING_REVENUE.
+METRIC_SUFFIXES = {
+    "PASSENGER": ("_PASSENGERS", "_PASSENGER"),
+    "NET_INCOME": ("_NET_INCOME",),
+    "OPERATING_REVENUE": (
+        "_OPERATING_REVENUES",
+        "_OPERATING_REVENUE",
+        "_OPERTING_REVENUE",
+    ),
+}
+
+# Infixes between the carrier name and the metric, e.g. DELTA_AIR_LINE_...
+CARRIER_SUFFIXES = (
+    "_AIR_LINES",
+    "_AIR_LINE",
+    "_AIRLINES",
+    "_AIRLINE",
+    "_AIRWAYS",
+    "_AIR",
+)
+
+
+def parse_column(col):
+    """Splits a wide column name into (airline, metric), or None."""
+    if not isinstance(col, str):
+        return None
+    for metric, suffixes in METRIC_SUFFIXES.items():
+        for suffix in suffixes:
+            if col.endswith(suffix) and len(col) > len(suffix):
+                name = col[: -len(suffix)]
+                for infix in CARRIER_SUFFIXES:
+                    if name.endswith(infix) and len(name) > len(infix):
+                        name = name[: -len(infix)]
+                        break
+                return name, metric
+    return None
+
+
+class ColumnCatalog:
+    """Maps (airline, metric) pairs to wide column names.
+
+    Column names are parsed once, so lookups are dictionary hits rather
+    than substring scans, and an airline only matches its own columns
+    (no "AIR" in "AIRTRAN" style collisions).
+    """
+
+    def __init__(self, columns):
+        self._lookup = {}
+        self._position = {}
+        for i, col in enumerate(columns):
+            parsed = parse_column(col)
+            if parsed is not None and parsed not in self._lookup:
+                self._lookup[parsed] = col
+                self._position[col] = i
+        self.airlines = sorted({airline for airline, _ in self._lookup})
+
+    @classmethod
+    def for_frame(cls, df):
+        """Returns the shared catalog for a DataFrame's columns."""
+        return _catalog_for_columns(tuple(df.columns))
+
+    def get(self, airline, metric, default=None):
+        return self._lookup.get((airline, _check_metric(metric)), default)
+
+    def columns(self, airlines, metric):
+        """Columns for the given airlines and metric, in frame order."""
+        metric = _check_metric(metric)
+        found = [
+            self._lookup[(a, metric)]
+            for a in airlines
+            if (a, metric) in self._lookup
+        ]
+        return sorted(set(found), key=self._position.__getitem__)
+
+    def complete_airlines(self, metrics=METRICS):
+        """Airlines that have a column for every one of ``metrics``."""
+        metrics = [_check_metric(m) for m in metrics]
+        return [
+            a
+            for a in self.airlines
+            if all((a, m) in self._lookup for m in metrics)
+        ]
+
+
+def _check_metric(metric):
+    if metric not in METRIC_SUFFIXES:
+        raise ValueError(
+            f"Unknown metric {metric!r}; expected one of {', '.join(METRICS)}"
+        )
+    return metric
+
+
+@lru_cache(maxsize=32)
+def _catalog_for_columns(columns):
+    return ColumnCatalog(columns)
@@ -0,0 +1,9 @@
+# Option values shared by the modules that use them and by the CLI, which
+# builds its parser from them without loading the analysis dependencies.
+
+# Chart export formats (sample.export).
+FORMATS = ("html", "json")
+# What render_figure does with a finished figure (sample.export).
+RENDER_MODES = ("interactive", "headless", "export-only")
+# Model selection criteria (sample.selection).
+CRITERIA = ("aic", "backtest")
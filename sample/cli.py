@@ -0,0 +1,212 @@
+"""Command line entry point for the airline analysis.
+
+    run-analysis                  # charts, forecasts and everything else
+    run-analysis plots            # charts only
+    run-analysis forecast         # forecasts (and optionally a backtest)
+    run-analysis score 2010 2019  # performance index for a year range
+    run-analysis serve            # JSON chart data over HTTP
+
+Only argparse and the option values in sample.choices are imported up
+front; each command imports the parts of the package it runs, so
+``--help`` never loads numpy or pandas and ``score`` never loads plotly
+or statsmodels.
+"""
+
+import argparse
+import sys
+from argparse import SUPPRESS
+
+from sample.choices import CRITERIA, FORMATS, RENDER_MODES
+
+
+def _defaults(top_level):
+    """Default for an option. Subcommands repeat the top-level options
+    with suppressed defaults, so a value given before the subcommand is
+    not overwritten by the subcommand's default."""
+    return (lambda value: value) if top_level else (lambda _: SUPPRESS)
+
+
+def _positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+
+def _profile_path(value):
+    if not value.endswith((".csv", ".json")):
+        raise argparse.ArgumentTypeError("must be a .csv or .json path")
+    return value
+
+
+def _add_source_options(parser, top_level=True):
+    default = _defaults(top_level)
+    parser.add_argument(
+        "--source", default=default(None), help="workbook path or URL"
+    )
+    parser.add_argument(
+        "--cache-dir", default=default(None), help="dataset cache directory"
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        default=default(False),
+        help="check a workbook URL for a newer workbook",
+    )
+
+
+def _add_run_options(parser, top_level=True):
+    default = _defaults(top_level)
+    _add_source_options(parser, top_level)
+    parser.add_argument("--output-dir", default=default("."))
+    parser.add_argument(
+        "--format",
+        dest="chart_format",
+        default=default("html"),
+        choices=FORMATS,
+    )
+    parser.add_argument(
+        "--render-mode", default=default(None), choices=RENDER_MODES
+    )
+    parser.add_argument(
+        "--workers",
+        dest="n_workers",
+        type=_positive_int,
+        default=default(None),
+    )
+    parser.add_argument(
+        "--incremental", action="store_true", default=default(False)
+    )
+    parser.add_argument(
+        "--profile",
+        type=_profile_path,
+        default=default(None),
+        help="write a stage profile (.csv/.json)",
+    )
+    parser.add_argument(
+        "--model-selection",
+        default=default(None),
+        choices=CRITERIA,
+        help="choose each forecast's smoothing model by aic or backtest",
+    )
+    parser.add_argument(
+        "--compact",
+        nargs="?",
+        const=True,
+        default=default(False),
+        choices=("float32", "int64"),
+        help="store the sheet as float32 (currency optionally int64)",
+    )
+
+
+def _source_kwargs(args):
+    kwargs = {}
+    if args.source:
+        kwargs["source"] = args.source
+    if args.cache_dir:
+        kwargs["cache_dir"] = args.cache_dir
+    if args.refresh:
+        kwargs["refresh"] = True
+    return kwargs
+
+
+def _run(args, stages):
+    from sample.core import run_analysis
+
+    kwargs = _source_kwargs(args)
+    run_analysis(
+        refresh_source=kwargs.pop("refresh", False),
+        output_dir=args.output_dir,
+        chart_format=args.chart_format,
+        render_mode=args.render_mode,
+        n_workers=args.n_workers,
+        incremental=args.incremental,
+        profile=args.profile,
+        dashboard=getattr(args, "dashboard", False),
+        backtest=getattr(args, "backtest", False),
+        stages=stages,
+        compact=args.compact,
+        model_selection=args.model_selection,
+        **kwargs,
+    )
+
+
+def run_all(args):
+    _run(args, ("plots", "forecast"))
+
+
+def run_plots(args):
+    _run(args, ("plots",))
+
+
+def run_forecast(args):
+    _run(args, ("forecast",))
+
+
+def run_score(args):
+    from sample.dataset import load_dataset
+    from sample.helpers import test_airline_performance_by_range
+
+    df = load_dataset(**_source_kwargs(args))
+    scores = test_airline_performance_by_range(df, args.start, args.end)
+    if scores is None:
+        return 1
+    print(scores.to_string())
+    return 0
+
+
+def run_serve(args):
+    from sample.dataset import load_dataset
+    from sample.service import serve
+
+    serve(load_dataset(**_source_kwargs(args)), args.host, args.port)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="run-analysis", description="Airline performance analysis."
+    )
+    _add_run_options(parser)
+    parser.add_argument("--dashboard", action="store_true")
+    parser.add_argument("--backtest", action="store_true")
+    parser.set_defaults(command=run_all)
+    commands = parser.add_subparsers(title="commands")
+
+    plots = commands.add_parser("plots", help="build and export the charts")
+    _add_run_options(plots, top_level=False)
+    plots.add_argument("--dashboard", action="store_true", default=SUPPRESS)
+    plots.set_defaults(command=run_plots)
+
+    forecast = commands.add_parser("forecast", help="fit the forecasts")
+    _add_run_options(forecast, top_level=False)
+    forecast.add_argument("--backtest", action="store_true", default=SUPPRESS)
+    forecast.set_defaults(command=run_forecast)
+
+    score = commands.add_parser(
+        "score", help="rank airlines by performance index"
+    )
+    _add_source_options(score, top_level=False)
+    score.add_argument("start", type=int, help="first year (2003-2023)")
+    score.add_argument("end", type=int, help="last year (2003-2023)")
+    score.set_defaults(command=run_score)
+
+    service = commands.add_parser(
+        "serve", help="serve chart data as JSON over HTTP"
+    )
+    _add_source_options(service, top_level=False)
+    service.add_argument("--host", default="127.0.0.1")
+    service.add_argument("--port", type=int, default=8050)
+    service.set_defaults(command=run_serve)
+    return parser
+
+
+def main(argv=None):
+    # Arguments are validated while parsing; errors raised by the analysis
+    # itself propagate with their tracebacks.
+    args = build_parser().parse_args(argv)
+    return args.command(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+import numpy as np
+import pandas as pd
+from sample.cache import memoize
+from sample.catalog import ColumnCatalog
+from sample.scoring import normalize
+
+FEATURES = (
+    "Passenger Growth",
+    "Net Margin",
+    "Revenue Volatility",
+    "Log Passengers",
+    "Log Revenue",
+    "Log Yield",
+)
+
+# Names for three clusters ordered by size, largest first.
+GROUP_NAMES = ("Legacy", "LCC", "Regional")
+
+
+def _metric_matrix(df, catalog, airlines, metric):
+    """(rows, airlines) float array; NaN where an airline lacks the metric."""
+    values = np.full((len(df), len(airlines)), np.nan)
+    for i, airline in enumerate(airlines):
+        col = catalog.get(airline, metric)
+        if col is not None:
+            values[:, i] = df[col].to_numpy(dtype=float)
+    return values
+
+
+def _log(values):
+    """Natural log of positive values, NaN elsewhere."""
+    values = np.asarray(values, dtype=float)
+    out = np.full(values.shape, np.nan)
+    np.log(values, out=out, where=values > 0)
+    return out
+
+
+def _slope(x, y):
+    """Least-squares slope of every column of ``y`` on ``x``, skipping NaN."""
+    mask = np.isfinite(y)
+    weight = mask.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_mean = (mask * x[:, None]).sum(axis=0) / weight
+        y_mean = np.nansum(y, axis=0) / weight
+        dx = np.where(mask, x[:, None] - x_mean, 0)
+        dy = np.where(mask, y - y_mean, 0)
+        return (dx * dy).sum(axis=0) / (dx**2).sum(axis=0)
+
+
+def airline_features(df):
+    """One row per airline describing its business model: yearly passenger
+    growth (log slope), net margin, quarterly revenue volatility, scale in
+    passengers and revenue, and revenue per passenger (yield).
+
+    Every feature is computed on the whole (quarters, airlines) block at
+    once, so the cost grows with the panel, not with a per-airline loop
+    of DataFrame operations. Missing metrics give NaN features.
+    """
+    catalog = ColumnCatalog.for_frame(df)
+    airlines = catalog.airlines
+    passengers = _metric_matrix(df, catalog, airlines, "PASSENGER")
+    revenue = _metric_matrix(df, catalog, airlines, "OPERATING_REVENUE")
+    income = _metric_matrix(df, catalog, airlines, "NET_INCOME")
+
+    years, year_codes = np.unique(df["Year"].to_numpy(), return_inverse=True)
+    yearly = np.zeros((len(years), len(airlines)))
+    np.add.at(yearly, year_codes, np.nan_to_num(passengers))
+    yearly[:, np.isnan(passengers).all(axis=0)] = np.nan
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        total_revenue = np.nansum(revenue, axis=0)
+        total_passengers = np.nansum(passengers, axis=0)
+        margin = np.nansum(income, axis=0) / total_revenue
+        changes = np.diff(_log(revenue), axis=0)
+        volatility = np.nanstd(
+            np.where(np.isfinite(changes), changes, np.nan), axis=0
+        )
+        features = np.column_stack(
+            [
+                _slope(years.astype(float), _log(yearly)),
+                margin,
+                volatility,
+                _log(total_passengers / len(years)),
+                _log(total_revenue / len(years)),
+                _log(total_revenue / total_passengers),
+            ]
+        )
+    features[~np.isfinite(features)] = np.nan
+    return pd.DataFrame(
+        features, index=pd.Index(airlines, name="Airline"), columns=FEATURES
+    )
+
+
+def standardize(features):
+    """Z-scores per feature; missing values land on the feature mean."""
+    return np.nan_to_num(normalize(features, "zscore"), nan=0.0)
+
+
+def _sq_distances(points, centers):
+    """Squared distances between (R, n, d) points and (R, k, d) centers."""
+    return (
+        np.einsum("rnd,rnd->rn", points, points)[:, :, None]
+        - 2 * np.einsum("rnd,rkd->rnk", points, centers)
+        + np.einsum("rkd,rkd->rk", centers, centers)[:, None, :]
+    ).clip(min=0)
+
+
+def _kmeans_plus_plus(X, k, restarts, rng):
+    """k-means++ seeding for every restart at once: (R, k, d) centers."""
+    n = len(X)
+    centers = np.empty((restarts, k, X.shape[1]))
+    centers[:, 0] = X[rng.integers(0, n, restarts)]
+    closest = ((X[None] - centers[:, :1]) ** 2).sum(axis=-1)
+    for j in range(1, k):
+        total = closest.sum(axis=1, keepdims=True)
+        prob = np.where(
+            total > 0, closest / np.where(total > 0, total, 1), 1 / n
+        )
+        pick = (prob.cumsum(axis=1) < rng.random((restarts, 1))).sum(axis=1)
+        centers[:, j] = X[np.minimum(pick, n - 1)]
+        closest = np.minimum(
+            closest, ((X[None] - centers[:, j, None]) ** 2).sum(axis=-1)
+        )
+    return centers
+
+
+def _fill_empty(X, labels, centers, distances):
+    """Gives each empty cluster the point farthest from its own center,
+    taken from a cluster with more than one member."""
+    k = len(centers)
+    for cluster in range(k):
+        sizes = np.bincount(labels, minlength=k)
+        if sizes[cluster]:
+            continue
+        own = distances[np.arange(len(X)), labels]
+        own[sizes[labels] < 2] = -1
+        point = int(np.argmax(own))
+        labels[point] = cluster
+        centers[cluster] = X[point]
+    return labels, centers
+
+
+def kmeans(X, k, restarts=10, batch_size=1024, max_iter=100, tol=1e-4, seed=0):
+    """Mini-batch K-Means with every restart run side by side.
+
+    Centers for all restarts live in one (restarts, k, features) array,
+    so each iteration is a handful of array operations however many
+    restarts there are. Each step assigns a random batch of
+    ``batch_size`` points and moves every center towards the mean of its
+    assigned points with a per-center rate of 1 / (points seen so far).
+    When the batch would cover the data every step is a full Lloyd update
+    instead. The restart with the lowest inertia on the full data wins.
+
+    Returns (centers, labels, inertia).
+    """
+    X = np.asarray(X, dtype=float)
+    n = len(X)
+    if not 0 < k <= n:
+        raise ValueError(f"Need between 1 and {n} clusters, got {k}")
+    rng = np.random.default_rng(seed)
+    centers = _kmeans_plus_plus(X, k, restarts, rng)
+    counts = np.zeros((restarts, k))
+    full = batch_size >= n
+    for _ in range(max_iter):
+        if full:
+            batch = np.broadcast_to(X, (restarts,) + X.shape)
+        else:
+            batch = X[rng.integers(0, n, (restarts, batch_size))]
+        labels = _sq_distances(batch, centers).argmin(axis=2)
+        onehot = (labels[:, :, None] == np.arange(k)).astype(float)
+        assigned = onehot.sum(axis=1)
+        sums = np.einsum("rbk,rbd->rkd", onehot, batch)
+        seen = assigned if full else counts + assigned
+        moved = (centers * (seen - assigned)[:, :, None] + sums) / np.maximum(
+            seen, 1
+        )[:, :, None]
+        moved = np.where(assigned[:, :, None] > 0, moved, centers)
+        shift = np.abs(moved - centers).max()
+        centers, counts = moved, seen
+        if shift < tol:
+            break
+
+    distances = _sq_distances(
+        np.broadcast_to(X, (restarts,) + X.shape), centers
+    )
+    labels = distances.argmin(axis=2)
+    inertia = np.take_along_axis(distances, labels[:, :, None], 2).sum(
+        axis=(1, 2)
+    )
+    best = int(np.argmin(inertia))
+    labels, best_centers = _fill_empty(
+        X, labels[best].copy(), centers[best].copy(), distances[best]
+    )
+    return best_centers, labels, float(inertia[best])
+
+
+@memoize
+def fit_clusters(features, k=3, restarts=10, batch_size=1024, seed=0):
+    """Cluster number per airline (the features' index), numbered by
+    falling mean log revenue so cluster 0 holds the largest carriers.
+
+    Cached under a hash of the feature values, so the clustering is only
+    recomputed when the panel changes what it describes.
+    """
+    _, labels, _ = kmeans(
+        standardize(features),
+        k,
+        restarts=restarts,
+        batch_size=batch_size,
+        seed=seed,
+    )
+    size = features["Log Revenue"].fillna(features["Log Passengers"])
+    size = size.groupby(labels).mean().fillna(-np.inf)
+    order = {
+        label: rank
+        for rank, label in enumerate(size.sort_values(ascending=False).index)
+    }
+    return pd.Series(
+        [order[label] for label in labels],
+        index=features.index,
+        name="Cluster",
+    )
+
+
+def cluster_airlines(df, k=3, restarts=10, batch_size=1024, seed=0):
+    """Data-driven cluster map ``{cluster: [airlines]}`` for the panel."""
+    clusters = fit_clusters(
+        airline_features(df),
+        k=k,
+        restarts=restarts,
+        batch_size=batch_size,
+        seed=seed,
+    )
+    return {
+        cluster: list(clusters.index[clusters == cluster])
+        for cluster in range(k)
+    }
+
+
+def named_groups(cluster_map, names=GROUP_NAMES):
+    """The cluster map keyed by group name (Legacy, LCC, Regional for three
+    clusters), falling back to ``Cluster <n>`` for other counts."""
+    if len(cluster_map) != len(names):
+        names = [f"Cluster {c}" for c in cluster_map]
+    return dict(zip(names, cluster_map.values()))
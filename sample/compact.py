@@ -0,0 +1,62 @@
+import numpy as np
+from sample.catalog import METRICS, ColumnCatalog
+
+CURRENCY_METRICS = ("NET_INCOME", "OPERATING_REVENUE")
+CURRENCY_DTYPES = ("float32", "int64")
+
+
+def metric_columns(df, metrics=METRICS):
+    catalog = ColumnCatalog.for_frame(df)
+    return [
+        col
+        for metric in metrics
+        for col in catalog.columns(catalog.airlines, metric)
+    ]
+
+
+def compact_frame(df, currency="float32", currency_scale=1):
+    """Returns the wide sheet in a compact in-memory layout.
+
+    Passenger counts become float32. Currency columns become float32 or,
+    with ``currency="int64"``, integers of ``value * currency_scale``
+    rounded, which keeps exact totals for figures too large for float32's
+    seven significant digits (the default scale of 1 stores whole
+    dollars, so the numbers keep their meaning). Year becomes int16 and
+    Quarter a categorical. Other columns are shared with ``df``, not
+    copied.
+    """
+    if currency not in CURRENCY_DTYPES:
+        raise ValueError(f"currency must be one of {CURRENCY_DTYPES}")
+    converted = {}
+    for col in metric_columns(df, ("PASSENGER",)):
+        converted[col] = df[col].astype(np.float32)
+    for col in metric_columns(df, CURRENCY_METRICS):
+        values = df[col]
+        if currency == "int64":
+            if values.isna().any():
+                raise ValueError(
+                    f"{col} has missing values; store currency as float32"
+                )
+            values = (values * currency_scale).round()
+        converted[col] = values.astype(currency)
+    if "Year" in df:
+        converted["Year"] = df["Year"].astype(np.int16)
+    if "Quarter" in df:
+        converted["Quarter"] = df["Quarter"].astype("category")
+    compact = df.copy(deep=False)
+    for col, values in converted.items():
+        compact[col] = values
+    return compact
+
+
+def is_compact(df, columns=None):
+    """True when none of the (metric) columns are stored as float64."""
+    columns = metric_columns(df) if columns is None else columns
+    return bool(columns) and not any(
+        df[col].dtype == np.float64 for col in columns
+    )
+
+
+def memory_mb(df):
+    """Deep memory use of a frame in megabytes."""
+    return df.memory_usage(deep=True).sum() / 2**20
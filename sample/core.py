@@ -1,29 +1,53 @@
+import os
 import warnings
+from contextlib import ExitStack
 
-import matplotlib.pyplot as plt
-import numpy as np
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from helpers import (
-    calc_recovery_rate,
-    calculate_mape,
+from sample import profiling
+from sample.backtest import backtest
+from sample.cache import memoize
+from sample.catalog import METRICS
+from sample.clustering import GROUP_NAMES, cluster_airlines, named_groups
+from sample.compact import compact_frame
+from sample.dataset import DATA_URL, DEFAULT_CACHE_DIR, load_dataset
+from sample.export import (
+    export_config,
+    figure_title,
+    get_render_mode,
+    render_figure,
+)
+from sample.export import render_mode as use_render_mode
+from sample.export import write_dashboard, write_figure
+from sample.facts import (
+    assign_clusters,
+    build_fact_table,
+    cluster_totals,
+    yearly_cluster_metric,
+)
+from sample.forecasting import run_forecasts
+from sample.helpers import (
     extract_columns,
     get_airlines_by_cluster,
     melt_for_plotting,
-    monte_carlo_forecast,
     normalize_columns,
-    perform_t_test,
-    plot_forecast,
-    smooth_forecast,
     test_airline_performance_by_range,
+    yearly_by_airline,
 )
-from scipy.stats import ttest_1samp, ttest_ind
-from sklearn.metrics import mean_absolute_error, mean_squared_error
-from statsmodels.tsa.holtwinters import ExponentialSmoothing
+from sample.incremental import RefreshState
+from sample.lazy import lazy_import
+from sample.pipeline import ExportPipeline
+from sample.profiling import stage
+from sample.resilience import ResilienceEngine
+from sample.selection import CRITERIA, select_models
+from sample.traces import prepare_xy
+from sample.volatility import VolatilityEngine
 
 warnings.filterwarnings("ignore")
 
+px = lazy_import("plotly.express")
+go = lazy_import("plotly.graph_objects")
+hw = lazy_import("statsmodels.tsa.holtwinters")
+
 
 def plot_passenger_growth_cluster(df, cluster_map, cluster_id):
     airlines = cluster_map[cluster_id]
@@ -32,10 +56,11 @@ def plot_passenger_growth_cluster(df, cluster_map, cluster_id):
 
     fig = go.Figure()
     for col in cols:
+        x, y, _ = prepare_xy(df_yearly["Year"], df_yearly[col])
         fig.add_trace(
             go.Scatter(
-                x=df_yearly["Year"],
-                y=df_yearly[col],
+                x=x,
+                y=y,
                 mode="lines+markers",
                 name=col.replace("_PASSENGER", ""),
             )
@@ -69,18 +94,19 @@ def plot_passenger_growth_cluster(df, cluster_map, cluster_id):
         yaxis_title="Avg Passengers",
         template="plotly_white",
     )
-    fig.show()
-    fig.write_html("Passenger Growth Over Time by Cluster {cluster_id}")
+    return render_figure(
+        fig, f"Passenger Growth Over Time by Cluster {cluster_id}"
+    )
 
 
 def plot_all_airlines_normalized(df, airlines):
     cols = extract_columns(df, airlines, "PASSENGER")
     df_yearly = df[["Year"] + cols].groupby("Year")[cols].mean().reset_index()
     df_norm = normalize_columns(df_yearly, cols)
+    df_norm.columns = df_norm.columns.str.replace("_PASSENGER", "")
     melted = melt_for_plotting(
         df_norm, "Year", "Airline", "Normalized_Passenger"
     )
-    melted["Airline"] = melted["Airline"].str.replace("_PASSENGER", "")
 
     fig = px.line(
         melted,
@@ -113,19 +139,15 @@ def plot_all_airlines_normalized(df, airlines):
         font=dict(color="purple"),
     )
 
-    fig.show()
-    fig.write_html(
-        "Normalized Passenger Growth Over Time by Individual Airline"
+    return render_figure(
+        fig, "Normalized Passenger Growth Over Time by Individual Airline"
     )
 
 
-def plot_market_share_clusters(df, cluster_map):
-    df_clustered = df[["Year"]].copy()
-    for c, airlines in cluster_map.items():
-        df_clustered[f"Cluster {c}"] = df[
-            extract_columns(df, airlines, "PASSENGER")
-        ].sum(axis=1)
-    df_clustered = df_clustered.groupby("Year").sum().reset_index()
+def plot_market_share_clusters(df, cluster_map, totals=None):
+    if totals is None:
+        totals = cluster_totals(build_fact_table(df, cluster_map))
+    df_clustered = yearly_cluster_metric(totals, "PASSENGER")
 
     fig = px.area(
         df_clustered,
@@ -134,19 +156,16 @@ def plot_market_share_clusters(df, cluster_map):
         title="Passenger Market Share Over Time by Cluster (Legacy, Low-cost, Regional)",
         template="plotly_white",
     )
-    fig.show()
-    fig.write_html(
-        "Passenger Market Share Over Time by Cluster (Legacy, Low-cost, Regional)"
+    return render_figure(
+        fig,
+        "Passenger Market Share Over Time by Cluster (Legacy, Low-cost, Regional)",
     )
 
 
-def plot_cluster_net_income(df, cluster_map):
-    df_income = df[["Year"]].copy()
-    for c, airlines in cluster_map.items():
-        df_income[f"Cluster {c}"] = df[
-            extract_columns(df, airlines, "NET_INCOME")
-        ].sum(axis=1)
-    df_income = df_income.groupby("Year").sum().reset_index()
+def plot_cluster_net_income(df, cluster_map, totals=None):
+    if totals is None:
+        totals = cluster_totals(build_fact_table(df, cluster_map))
+    df_income = yearly_cluster_metric(totals, "NET_INCOME")
 
     fig = px.area(
         df_income,
@@ -155,19 +174,15 @@ def plot_cluster_net_income(df, cluster_map):
         title="Net Income Over Time by Cluster (Legacy, Low-cost, Regional)",
         template="plotly_white",
     )
-    fig.show()
-    fig.write_html(
-        "Net Income Over Time by Cluster (Legacy, Low-cost, Regional)"
+    return render_figure(
+        fig, "Net Income Over Time by Cluster (Legacy, Low-cost, Regional)"
     )
 
 
-def plot_cluster_operating_revenue(df, cluster_map):
-    df_revenue = df[["Year"]].copy()
-    for c, airlines in cluster_map.items():
-        df_revenue[f"Cluster {c}"] = df[
-            extract_columns(df, airlines, "OPERATING_REVENUE")
-        ].sum(axis=1)
-    df_revenue = df_revenue.groupby("Year").sum().reset_index()
+def plot_cluster_operating_revenue(df, cluster_map, totals=None):
+    if totals is None:
+        totals = cluster_totals(build_fact_table(df, cluster_map))
+    df_revenue = yearly_cluster_metric(totals, "OPERATING_REVENUE")
 
     fig = px.area(
         df_revenue,
@@ -176,37 +191,16 @@ def plot_cluster_operating_revenue(df, cluster_map):
         title="Operating Revenue Over Time by Cluster (Legacy, Low-cost, Regional)",
         template="plotly_white",
     )
-    fig.show()
-    fig.write_html(
-        "Operating Revenue Over Time by Cluster (Legacy, Low-cost, Regional)"
+    return render_figure(
+        fig,
+        "Operating Revenue Over Time by Cluster (Legacy, Low-cost, Regional)",
     )
 
 
 def plot_net_income_airlines(df, cluster_map):
-    individual_income = {}
-
-    for cluster, airlines in cluster_map.items():
-        for airline in airlines:
-            income_col = next(
-                (
-                    col
-                    for col in df.columns
-                    if "NET_INCOME" in col and airline in col
-                ),
-                None,
-            )
-            if income_col:
-                airline_data = (
-                    df[["Year", income_col]]
-                    .groupby("Year")
-                    .sum()
-                    .reset_index()
-                )
-                airline_data.columns = ["Year", "Net Income"]
-                airline_data["Airline"] = airline
-                individual_income[airline] = airline_data
-
-    all_airline_income = pd.concat(individual_income.values())
+    all_airline_income = yearly_by_airline(
+        df, get_airlines_by_cluster(cluster_map), "NET_INCOME", "Net Income"
+    )
 
     fig = px.area(
         all_airline_income,
@@ -224,35 +218,16 @@ def plot_net_income_airlines(df, cluster_map):
         legend_title="Airline",
     )
 
-    fig.show()
-    fig.write_html("Net Income Trends by Individual Airline")
+    return render_figure(fig, "Net Income Trends by Individual Airline")
 
 
 def plot_operating_revenue_airlines(df, cluster_map):
-    individual_revenue = {}
-
-    for cluster, airlines in cluster_map.items():
-        for airline in airlines:
-            revenue_col = next(
-                (
-                    col
-                    for col in df.columns
-                    if "OPERATING_REVENUE" in col and airline in col
-                ),
-                None,
-            )
-            if revenue_col:
-                airline_data = (
-                    df[["Year", revenue_col]]
-                    .groupby("Year")
-                    .sum()
-                    .reset_index()
-                )
-                airline_data.columns = ["Year", "Operating Revenue"]
-                airline_data["Airline"] = airline
-                individual_revenue[airline] = airline_data
-
-    all_airline_revenue = pd.concat(individual_revenue.values())
+    all_airline_revenue = yearly_by_airline(
+        df,
+        get_airlines_by_cluster(cluster_map),
+        "OPERATING_REVENUE",
+        "Operating Revenue",
+    )
 
     fig = px.area(
         all_airline_revenue,
@@ -270,8 +245,7 @@ def plot_operating_revenue_airlines(df, cluster_map):
         legend_title="Airline",
     )
 
-    fig.show()
-    fig.write_html("Operating Revenue Trends by Individual Airline")
+    return render_figure(fig, "Operating Revenue Trends by Individual Airline")
 
 
 def plot_airline_performance_index(df, start_year, end_year):
@@ -287,81 +261,78 @@ def plot_airline_performance_index(df, start_year, end_year):
             template="plotly_white",
         )
         fig.update_traces(texttemplate="%{text:.2f}", textposition="outside")
-        fig.show()
-        fig.write_html("Performance Index by Individual Airline (2003 - 2023)")
+        return render_figure(
+            fig,
+            f"Performance Index by Individual Airline ({start_year}-{end_year})",
+        )
 
 
-def plot_market_share_volatility(df):
-    cols = [
-        col
-        for col in df.columns
-        if "PASSENGER" in col or "OPERATING_REVENUE" in col
-    ]
-    df_market = df[cols].fillna(0)
-    share_df = df_market.div(df_market.sum(axis=1), axis=0)
-    vol = share_df.std().sort_values(ascending=False).reset_index()
-    vol.columns = ["Metric", "Volatility"]
+def plot_market_share_volatility(df, window=8):
+    # Mean moving standard deviation of each carrier's share per metric
+    vol = VolatilityEngine(df, windows=(window,)).summary(window)
     fig = px.bar(
         vol,
         x="Volatility",
-        y="Metric",
+        y="Airline",
+        color="Metric",
         orientation="h",
+        barmode="group",
         title="Market Share Volatility",
+        labels={
+            "Volatility": f"Share volatility ({window}-quarter rolling std)"
+        },
         template="plotly_white",
     )
-    fig.show()
-    fig.write_html("Market Share Volatility")
-
-
-def plot_financial_resilience(df):
-    groups = {
-        "Group1_Net_Income": [
-            "AMERICAN_AIRLINE_NET_INCOME",
-            "DELTA_AIRLINE_NET_INCOME",
-            "SOUTHWEST_AIRLINE_NET_INCOME",
-            "UNITED_AIRLINE_NET_INCOME",
-        ],
-        "Group2_Net_Income": [
-            "FRONTIER_NET_INCOME",
-            "ALLEGIANT_NET_INCOME",
-            "SPIRIT_NET_INCOME",
-            "JETBLUE_NET_INCOME",
-        ],
-        "Group3_Net_Income": [
-            "SUN_COUNTRY_NET_INCOME",
-            "ALASKA_NET_INCOME",
-            "HAWAIIN_NET_INCOME",
-            "SKYWEST_NET_INCOME",
-        ],
+    return render_figure(fig, "Market Share Volatility")
+
+
+RESILIENCE_GROUPS = {
+    "Major Airlines": [
+        "AMERICAN_AIRLINE_NET_INCOME",
+        "DELTA_AIRLINE_NET_INCOME",
+        "SOUTHWEST_AIRLINE_NET_INCOME",
+        "UNITED_AIRLINE_NET_INCOME",
+    ],
+    "Low-Cost Carriers": [
+        "FRONTIER_NET_INCOME",
+        "ALLEGIANT_NET_INCOME",
+        "SPIRIT_NET_INCOME",
+        "JETBLUE_NET_INCOME",
+    ],
+    "Regional Airlines": [
+        "SUN_COUNTRY_NET_INCOME",
+        "ALASKA_NET_INCOME",
+        "HAWAIIN_NET_INCOME",
+        "SKYWEST_NET_INCOME",
+    ],
+}
+
+RESILIENCE_PERIODS = {"2008-2010": (2007, 2010), "2019-2022": (2018, 2022)}
+RESILIENCE_LABELS = {
+    "Legacy": "Major Airlines",
+    "LCC": "Low-Cost Carriers",
+    "Regional": "Regional Airlines",
+}
+
+
+def resilience_groups(df, groups):
+    """Net income columns per resilience label for named airline groups."""
+    return {
+        RESILIENCE_LABELS.get(name, name): extract_columns(
+            df, airlines, "NET_INCOME"
+        )
+        for name, airlines in groups.items()
     }
 
-    # Calculate totals per year for each group
-    for name, cols in groups.items():
-        df[name] = df[cols].sum(axis=1, min_count=1)
 
-    pre_crisis_2007 = df[df["Year"] == 2007][list(groups.keys())].mean()
-    recovery_2010 = df[df["Year"] == 2010][list(groups.keys())].mean()
-    pre_crisis_2018 = df[df["Year"] == 2018][list(groups.keys())].mean()
-    recovery_2022 = df[df["Year"] == 2022][list(groups.keys())].mean()
-
-    recovery_rate_2008_2010 = (
-        (recovery_2010 - pre_crisis_2007) / pre_crisis_2007
-    ) * 100
-    recovery_rate_2019_2022 = (
-        (recovery_2022 - pre_crisis_2018) / pre_crisis_2018
-    ) * 100
+def plot_financial_resilience(df, groups=None):
+    engine = ResilienceEngine(df, groups or RESILIENCE_GROUPS)
+    rates = engine.recovery_rates(list(RESILIENCE_PERIODS.values()))
 
     recovery_df = pd.DataFrame(
-        {
-            "Group": [
-                "Major Airlines",
-                "Low-Cost Carriers",
-                "Regional Airlines",
-            ],
-            "2008-2010": recovery_rate_2008_2010.values,
-            "2019-2022": recovery_rate_2019_2022.values,
-        }
+        rates.to_numpy().T, columns=list(RESILIENCE_PERIODS)
     )
+    recovery_df.insert(0, "Group", engine.labels)
 
     recovery_long = recovery_df.melt(
         id_vars="Group", var_name="Period", value_name="Recovery Rate"
@@ -388,19 +359,38 @@ def plot_financial_resilience(df):
         height=500,
     )
 
-    fig.show()
-    fig.write_html("Financial Resilience Comparison: 2008-2010 vs 2019-2022")
+    return render_figure(
+        fig, "Financial Resilience Comparison: 2008-2010 vs 2019-2022"
+    )
+
+
+# Additive trend and seasonality, used unless a series' model is selected.
+DEFAULT_CONFIG = {
+    "trend": "add",
+    "damped_trend": False,
+    "seasonal": "add",
+    "use_boxcox": False,
+}
 
 
-def smooth_forecast(series, steps=16):
-    model = ExponentialSmoothing(
+@memoize
+def smooth_forecast(series, steps=16, start_params=None, config=None):
+    """Fits Holt-Winters with ``config`` (a sample.selection
+    configuration, DEFAULT_CONFIG when None) and forecasts ``steps``."""
+    config = config or DEFAULT_CONFIG
+    model = hw.ExponentialSmoothing(
         series,
-        trend="add",
-        seasonal="add",
-        seasonal_periods=4,
-        use_boxcox=False,
+        trend=config["trend"],
+        damped_trend=config["damped_trend"],
+        seasonal=config["seasonal"],
+        seasonal_periods=4 if config["seasonal"] else None,
+        use_boxcox=config["use_boxcox"],
+    )
+    model_fit = model.fit(
+        optimized=True,
+        start_params=start_params,
+        use_brute=start_params is None,
     )
-    model_fit = model.fit(optimized=True)
     forecast = model_fit.forecast(steps)
     fitted = model_fit.fittedvalues
     fitted.index = series.index
@@ -411,7 +401,7 @@ def plot_combined_forecast(results, metric_name):
     fig = go.Figure()
     colors = {"Legacy": "blue", "LCC": "green", "Regional": "red"}
 
-    for group in ["Legacy", "LCC", "Regional"]:
+    for group in GROUP_NAMES:
         r = results[(metric_name, group)]
         fitted_dates = r["Fitted"].index
         forecast_len = len(r["Forecast"])
@@ -426,10 +416,12 @@ def plot_combined_forecast(results, metric_name):
         )
 
         # Add fitted and forecast lines
+        fitted_x, fitted_y, _ = prepare_xy(fitted_labels, r["Fitted"])
+        forecast_x, forecast_y, _ = prepare_xy(forecast_labels, r["Forecast"])
         fig.add_trace(
             go.Scatter(
-                x=fitted_labels,
-                y=r["Fitted"],
+                x=fitted_x,
+                y=fitted_y,
                 mode="lines",
                 name=f"{group} Fitted",
                 line=dict(color=colors[group], dash="solid"),
@@ -437,8 +429,8 @@ def plot_combined_forecast(results, metric_name):
         )
         fig.add_trace(
             go.Scatter(
-                x=forecast_labels,
-                y=r["Forecast"],
+                x=forecast_x,
+                y=forecast_y,
                 mode="lines",
                 name=f"{group} Forecast",
                 line=dict(color=colors[group], dash="dot"),
@@ -470,67 +462,86 @@ def plot_combined_forecast(results, metric_name):
         hovermode="x unified",
     )
 
-    fig.show()
+    return render_figure(
+        fig,
+        f"Forecasting Airline {metric_name} Growth (Legacy, LCC, Regional)",
+    )
 
 
-def run_passenger_revenue_forecasting(df):
-    forecast_horizon = 16
-    metrics = {
-        "Passengers": [
-            "Legacy_Passengers",
-            "LCC_Passengers",
-            "Regional_Passengers",
-        ],
-        "Revenue": ["Legacy_Revenue", "LCC_Revenue", "Regional_Revenue"],
+FORECAST_METRICS = {
+    "Passengers": [
+        "Legacy_Passengers",
+        "LCC_Passengers",
+        "Regional_Passengers",
+    ],
+    "Revenue": ["Legacy_Revenue", "LCC_Revenue", "Regional_Revenue"],
+}
+
+
+def forecast_series(df):
+    """Group series to forecast, keyed by (metric, group)."""
+    return {
+        (metric_name, group): df[col]
+        for metric_name, cols in FORECAST_METRICS.items()
+        for group, col in zip(GROUP_NAMES, cols)
     }
 
-    results = {}
 
-    print("\nEvaluation Metrics (Lower is better):\n")
-    for metric_name, cols in metrics.items():
-        print(f"--- {metric_name} ---")
-        for group, col in zip(["Legacy", "LCC", "Regional"], cols):
-            series = df[col]
-            fitted, forecast, model_fit = smooth_forecast(
-                series, forecast_horizon
-            )
+def select_configs(series_by_key, criterion, n_workers=None):
+    """Smoothing configuration chosen for each series by ``criterion``
+    (``"aic"`` or ``"backtest"``), searching every series together."""
+    with stage("forecast.selection"):
+        selections = select_models(
+            series_by_key, criterion, n_workers=n_workers
+        )
+    return {key: chosen["config"] for key, chosen in selections.items()}
 
-            common_index = fitted.index.intersection(series.index)
-            actual_trimmed = series.loc[common_index]
-            fitted_trimmed = fitted.loc[common_index]
 
-            mae = mean_absolute_error(actual_trimmed, fitted_trimmed)
-            rmse = mean_squared_error(
-                actual_trimmed, fitted_trimmed, squared=False
-            )
-            mape = calculate_mape(actual_trimmed, fitted_trimmed)
-
-            p_value = perform_t_test(actual_trimmed, fitted_trimmed)
-            residuals = (actual_trimmed - fitted_trimmed).dropna()
-            ci_lower, ci_upper = monte_carlo_forecast(forecast, residuals)
-
-            results[(metric_name, group)] = {
-                "Fitted": fitted_trimmed,
-                "Forecast": forecast,
-                "MAE": mae,
-                "RMSE": rmse,
-                "MAPE": mape,
-                "p_value": p_value,
-                "CI_Lower": ci_lower,
-                "CI_Upper": ci_upper,
-            }
+def run_passenger_revenue_forecasting(
+    df, n_workers=None, seed=0, refresh=None, model_selection=None
+):
+    forecast_horizon = 16
+    metrics = FORECAST_METRICS
+    series_by_key = forecast_series(df)
+    configs = None
+    if model_selection is not None:
+        configs = select_configs(series_by_key, model_selection, n_workers)
+    if refresh is None:
+        results = run_forecasts(
+            series_by_key,
+            smooth_forecast,
+            horizon=forecast_horizon,
+            n_workers=n_workers,
+            seed=seed,
+            configs=configs,
+        )
+    else:
+        results = refresh.forecasts(
+            series_by_key,
+            smooth_forecast,
+            forecast_horizon,
+            n_workers=n_workers,
+            seed=seed,
+            configs=configs,
+        )
 
+    print("\nEvaluation Metrics (Lower is better):\n")
+    for metric_name in metrics:
+        print(f"--- {metric_name} ---")
+        for group in GROUP_NAMES:
+            r = results[(metric_name, group)]
             print(
-                f"{group}: MAE={mae:.2f}, RMSE={rmse:.2f}, MAPE={mape:.2f}%, p-value={p_value:.4f}"
+                f"{group}: MAE={r['MAE']:.2f}, RMSE={r['RMSE']:.2f}, MAPE={r['MAPE']:.2f}%, p-value={r['p_value']:.4f}"
             )
         print()
 
-    for metric_name in metrics:
-        plot_combined_forecast(results, metric_name)
+    figures = [
+        plot_combined_forecast(results, metric_name) for metric_name in metrics
+    ]
 
     forecast_table = {}
     for metric_name in metrics:
-        for group in ["Legacy", "LCC", "Regional"]:
+        for group in GROUP_NAMES:
             forecast_table[f"{group}_{metric_name}"] = results[
                 (metric_name, group)
             ]["Forecast"]
@@ -538,116 +549,249 @@ def run_passenger_revenue_forecasting(df):
     forecast_df = pd.DataFrame(forecast_table)
     print("\nForecasted Values for 2024–2026:\n")
     print(forecast_df)
+    return results, figures
+
+
+def run_backtest(df, horizon=8, n_workers=None, window=None, step=4):
+    """Rolling-origin out-of-sample accuracy of smooth_forecast for every
+    (metric, group) and horizon, with one origin per year by default."""
+    series_by_key = forecast_series(df)
+    table = backtest(
+        series_by_key,
+        smooth_forecast,
+        horizon=horizon,
+        step=step,
+        window=window,
+        n_workers=n_workers,
+        # Explicit, so cached folds are keyed by the configuration used.
+        configs={key: DEFAULT_CONFIG for key in series_by_key},
+    )
+    print("\nRolling-origin backtest (out-of-sample):\n")
+    print(table.to_string(index=False))
+    return table
 
 
 # Main controller
-def run_analysis():
-    url = "https://drive.google.com/uc?export=download&id=1a1aWrDUc3Tdgxy_eMqDe_LRS7ehb-lfo"
-    df = pd.read_excel(url)
-
-    cluster_map = {
-        0: ["ALASKA", "AMERICAN", "DELTA", "SOUTHWEST", "UNITED"],
-        1: ["ALLEGIANT", "FRONTIER", "JETBLUE", "SPIRIT"],
-        2: ["SKYWEST", "HAWAIIN", "SUN_COUNTRY"],
-    }
+ANALYSIS_STAGES = ("plots", "forecast")
+
+
+def run_analysis(
+    source=DATA_URL,
+    cache_dir=DEFAULT_CACHE_DIR,
+    n_workers=None,
+    output_dir=".",
+    chart_format="html",
+    render_mode=None,
+    dashboard=False,
+    export_workers=4,
+    incremental=False,
+    state_dir=None,
+    backtest=False,
+    profile=None,
+    stages=ANALYSIS_STAGES,
+    compact=False,
+    cluster_map=None,
+    model_selection=None,
+    refresh_source=False,
+):
+    """Loads the workbook and runs the requested ``stages``: ``"plots"``
+    builds and exports the charts, ``"forecast"`` fits and evaluates the
+    forecasts. Returns the figures produced.
+
+    ``compact`` stores the sheet as float32/categoricals (see
+    sample.compact.compact_frame) to roughly halve its memory; pass
+    ``"int64"`` to keep currency columns as exact integers instead.
+
+    Airlines are grouped by K-Means over their business-model features
+    (sample.clustering) unless a ``cluster_map`` of three clusters,
+    largest carriers first, is given. The same grouping drives the
+    cluster charts, the Legacy/LCC/Regional forecasts and the resilience
+    comparison.
+
+    ``model_selection`` (``"aic"`` or ``"backtest"``) picks each forecast
+    series' smoothing configuration with sample.selection instead of the
+    fixed additive model; the choices are cached (see selection_cache).
+
+    ``refresh_source`` checks a workbook URL for a newer workbook instead
+    of reusing the downloaded copy.
+    """
+    unknown = set(stages) - set(ANALYSIS_STAGES)
+    if unknown:
+        raise ValueError(f"Unknown stages: {sorted(unknown)}")
+    if cluster_map is not None and len(cluster_map) != len(GROUP_NAMES):
+        raise ValueError(
+            f"cluster_map must have {len(GROUP_NAMES)} clusters, one per "
+            f"forecast group ({', '.join(GROUP_NAMES)}); got "
+            f"{len(cluster_map)}"
+        )
+    if model_selection not in (None, *CRITERIA):
+        raise ValueError(f"model_selection must be one of {CRITERIA}")
+    with ExitStack() as scope:
+        # The render mode and export defaults apply to this run only.
+        if render_mode is not None:
+            scope.enter_context(use_render_mode(render_mode))
+        if profile is not None:
+            # Stages inside worker processes are not collected, so profiled
+            # runs fit forecasts in-process unless told otherwise.
+            scope.callback(
+                profiling.configure_profiling,
+                enabled=profiling.profiling_enabled(),
+            )
+            profiling.configure_profiling(enabled=True)
+            profiling.reset()
+            if n_workers is None:
+                n_workers = 1
+        scope.enter_context(export_config(output_dir, chart_format))
+        if isinstance(source, pd.DataFrame):
+            df = source.copy()
+        else:
+            df = load_dataset(
+                source, cache_dir=cache_dir, refresh=refresh_source
+            )
+        if compact:
+            df = compact_frame(
+                df, currency="float32" if compact is True else compact
+            )
 
-    airlines = get_airlines_by_cluster(cluster_map)
-
-    # Build datetime index from Year and Quarter
-    df["Month"] = df["Quarter"].map({"Q1": 1, "Q2": 4, "Q3": 7, "Q4": 10})
-    df["Date_temp"] = pd.to_datetime(df[["Year", "Month"]].assign(DAY=1))
-    df = df.set_index("Date_temp")
-    df.index.name = "Date"
-    df = df.sort_index()
-
-    # Aggregate metrics
-    df["Legacy_Passengers"] = df[
-        [
-            "AMERICAN_PASSENGER",
-            "DELTA_PASSENGER",
-            "UNITED_PASSENGER",
-            "SOUTHWEST_PASSENGER",
-        ]
-    ].sum(axis=1)
-    df["LCC_Passengers"] = df[
-        [
-            "FRONTIER_PASSENGER",
-            "ALLEGIANT_PASSENGER",
-            "SPIRIT_PASSENGER",
-            "SUN_COUNTRY_PASSENGER",
-            "JETBLUE_PASSENGER",
-        ]
-    ].sum(axis=1)
-    df["Regional_Passengers"] = df[
-        ["ALASKA_PASSENGER", "HAWAIIN_PASSENGER", "SKYWEST_PASSENGER"]
-    ].sum(axis=1)
-
-    df["Legacy_Net_Income"] = df[
-        [
-            "AMERICAN_AIRLINE_NET_INCOME",
-            "DELTA_AIRLINE_NET_INCOME",
-            "UNITED_AIRLINE_NET_INCOME",
-            "SOUTHWEST_AIRLINE_NET_INCOME",
-        ]
-    ].sum(axis=1)
-    df["LCC_Net_Income"] = df[
-        [
-            "FRONTIER_NET_INCOME",
-            "ALLEGIANT_NET_INCOME",
-            "SPIRIT_NET_INCOME",
-            "SUN_COUNTRY_NET_INCOME",
-            "JETBLUE_NET_INCOME",
-        ]
-    ].sum(axis=1)
-    df["Regional_Net_Income"] = df[
-        ["ALASKA_NET_INCOME", "HAWAIIN_NET_INCOME", "SKYWEST_NET_INCOME"]
-    ].sum(axis=1)
-
-    df["Legacy_Revenue"] = df[
-        [
-            "AMERICAN_AIRLINE_OPERATING_REVENUE",
-            "DELTA_AIR_LINE_OPERATING_REVENUE",
-            "UNITED_AIRLINE_OPERATING_REVENUE",
-            "SOUTHWEST_AIRLINE_OPERATING_REVENUE",
-        ]
-    ].sum(axis=1)
-    df["LCC_Revenue"] = df[
-        [
-            "FRONTIER_OPERATING_REVENUE",
-            "ALLEGIANT_OPERATING_REVENUE",
-            "SPIRIT_OPERATING_REVENUE",
-            "SUN_COUNTRY_OPERATING_REVENUE",
-            "JETBLUE_OPERATING_REVENUE",
+        if cluster_map is None:
+            with stage("clustering"):
+                cluster_map = cluster_airlines(df, k=len(GROUP_NAMES))
+        forecast_groups = named_groups(cluster_map)
+
+        airlines = get_airlines_by_cluster(cluster_map)
+
+        # Build datetime index from Year and Quarter
+        df["Month"] = df["Quarter"].map({"Q1": 1, "Q2": 4, "Q3": 7, "Q4": 10})
+        df["Date_temp"] = pd.to_datetime(df[["Year", "Month"]].assign(DAY=1))
+        df = df.set_index("Date_temp")
+        df.index.name = "Date"
+        df = df.sort_index()
+
+        # Incremental mode only recomputes what changed since the last run
+        refresh = None
+        plan = None
+        if incremental:
+            refresh = RefreshState(
+                state_dir or os.path.join(cache_dir, "refresh")
+            )
+            plan = refresh.plan(
+                df, {"clusters": cluster_map, "groups": forecast_groups}
+            )
+            print(f"\nIncremental refresh: {plan}\n")
+
+        # Aggregate metrics: every cluster/group series comes from the fact table
+        with stage("aggregates"):
+            if refresh is None:
+                facts = build_fact_table(df, cluster_map)
+                totals = cluster_totals(facts)
+                group_totals = cluster_totals(
+                    assign_clusters(facts, forecast_groups)
+                )
+            else:
+                totals = refresh.totals("clusters", df, cluster_map)
+                group_totals = refresh.totals("groups", df, forecast_groups)
+            aggregate_names = {
+                "PASSENGER": "Passengers",
+                "NET_INCOME": "Net_Income",
+                "OPERATING_REVENUE": "Revenue",
+            }
+            for (group, metric), series in group_totals.items():
+                df[f"{group}_{aggregate_names[metric]}"] = series.reindex(
+                    df.index, fill_value=0
+                ).to_numpy()
+
+        # Visualization section: (metrics each chart depends on, plot, args)
+        charts = [
+            (
+                ("PASSENGER",),
+                plot_passenger_growth_cluster,
+                (df, cluster_map, c),
+            )
+            for c in cluster_map
         ]
-    ].sum(axis=1)
-    df["Regional_Revenue"] = df[
-        [
-            "ALASKA_OPERTING_REVENUE",
-            "HAWAIIN_OPERATING_REVENUE",
-            "SKYWEST_OPERATING_REVENUE",
+        charts += [
+            (("PASSENGER",), plot_all_airlines_normalized, (df, airlines)),
+            (
+                ("PASSENGER",),
+                plot_market_share_clusters,
+                (df, cluster_map, totals),
+            ),
+            (
+                ("NET_INCOME",),
+                plot_cluster_net_income,
+                (df, cluster_map, totals),
+            ),
+            (
+                ("OPERATING_REVENUE",),
+                plot_cluster_operating_revenue,
+                (df, cluster_map, totals),
+            ),
+            (("NET_INCOME",), plot_net_income_airlines, (df, cluster_map)),
+            (
+                ("OPERATING_REVENUE",),
+                plot_operating_revenue_airlines,
+                (df, cluster_map),
+            ),
+            (METRICS, plot_airline_performance_index, (df, 2003, 2023)),
+            (
+                ("PASSENGER", "OPERATING_REVENUE"),
+                plot_market_share_volatility,
+                (df,),
+            ),
+            (
+                ("NET_INCOME",),
+                plot_financial_resilience,
+                (df, resilience_groups(df, forecast_groups)),
+            ),
         ]
-    ].sum(axis=1)
-
-    # Visualization section
-    plot_passenger_growth_cluster(df, cluster_map, 0)
-    plot_passenger_growth_cluster(df, cluster_map, 1)
-    plot_passenger_growth_cluster(df, cluster_map, 2)
-    plot_all_airlines_normalized(df, airlines)
-    plot_market_share_clusters(df, cluster_map)
-    plot_cluster_net_income(df, cluster_map)
-    plot_cluster_operating_revenue(df, cluster_map)
-    plot_net_income_airlines(df, cluster_map)
-    plot_operating_revenue_airlines(df, cluster_map)
-    plot_airline_performance_index(df, 2003, 2023)
-    plot_market_share_volatility(df)
-    plot_financial_resilience(df)
-
-    # Forecasting + Evaluation + Interactive plotting
-    run_passenger_revenue_forecasting(df)
-
-    print(
-        "\nAll plots and forecast evaluations are complete. Interactive plots + p-values + Monte Carlo simulation included.\n"
-    )
+        pipeline = ExportPipeline(max_workers=export_workers)
+        for metrics, plot, args in charts:
+            if "plots" in stages and (plan is None or plan.affects(metrics)):
+                pipeline.add(plot, *args)
+
+        if get_render_mode() == "interactive":
+            figures = [fig for fig in pipeline.build() if fig is not None]
+        elif pipeline.tasks:
+            report = pipeline.run()
+            figures = pipeline.figures
+            print("\nChart export timings (seconds):\n")
+            print(report.to_string(index=False))
+        else:
+            figures = []
+
+        # Forecasting + Evaluation + Interactive plotting
+        if "forecast" in stages:
+            with stage("forecasting"):
+                _, forecast_figures = run_passenger_revenue_forecasting(
+                    df,
+                    n_workers=n_workers,
+                    refresh=refresh,
+                    model_selection=model_selection,
+                )
+            if get_render_mode() == "export-only":
+                for fig in forecast_figures:
+                    write_figure(fig, figure_title(fig))
+            figures += forecast_figures
+        if backtest:
+            with stage("backtest"):
+                run_backtest(df, n_workers=n_workers)
+
+        if dashboard:
+            with stage("dashboard"):
+                write_dashboard(
+                    {figure_title(fig): fig for fig in figures},
+                    os.path.join(output_dir, "dashboard.html"),
+                )
+        if refresh is not None:
+            refresh.save()
+        if profile is not None:
+            paths = profiling.write_report(profile)
+            print(f"\nStage profile written to {', '.join(paths)}\n")
+
+        print(
+            "\nAll plots and forecast evaluations are complete. Interactive plots + p-values + Monte Carlo simulation included.\n"
+        )
+        return figures
 
 
 if __name__ == "__main__":
@@ -0,0 +1,201 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pandas as pd
+from sample.profiling import stage
+
+DATA_URL = "https://drive.google.com/uc?export=download&id=1a1aWrDUc3Tdgxy_eMqDe_LRS7ehb-lfo"
+DEFAULT_CACHE_DIR = os.environ.get(
+    "AIRLINE_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "airline_analysis"),
+)
+MANIFEST = "manifest.json"
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """Returns the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fetch_workbook(url, cache_dir=DEFAULT_CACHE_DIR, refresh=False):
+    """Downloads the workbook at ``url`` and returns its local path.
+
+    Each URL is kept in its own file, named after a hash of the URL. A
+    downloaded copy is reused as is unless ``refresh`` is set; refreshing
+    sends the copy's ETag/Last-Modified, so the workbook is only fetched
+    again when the server has a newer one.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    name = hashlib.sha256(url.encode()).hexdigest()[:16]
+    path = os.path.join(cache_dir, f"workbook-{name}.xlsx")
+    headers_path = f"{path}.headers.json"
+    if os.path.exists(path) and not refresh:
+        return path
+
+    headers = {}
+    if os.path.exists(path) and os.path.exists(headers_path):
+        with open(headers_path) as fh:
+            validators = json.load(fh)
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+    tmp = path + ".part"
+    with stage("dataset.download"):
+        request = urllib.request.Request(url, headers=headers)
+        try:
+            with urllib.request.urlopen(request) as response:
+                with open(tmp, "wb") as fh:
+                    shutil.copyfileobj(response, fh)
+                validators = {
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                }
+        except urllib.error.HTTPError as error:
+            if error.code != 304:
+                raise
+            return path
+    os.replace(tmp, path)
+    with open(headers_path, "w") as fh:
+        json.dump(validators, fh)
+    return path
+
+
+def _source_digest(path, cache_dir):
+    """Content hash of the source, skipping the re-hash when size and
+    mtime match the last recorded stat."""
+    stat = os.stat(path)
+    stem = _source_stem(path)
+    index_path = os.path.join(cache_dir, f"{stem}.json")
+    if os.path.exists(index_path):
+        with open(index_path) as fh:
+            index = json.load(fh)
+        if (
+            index.get("size") == stat.st_size
+            and index.get("mtime_ns") == stat.st_mtime_ns
+        ):
+            return index["digest"]
+
+    digest = file_digest(path)
+    with open(index_path, "w") as fh:
+        json.dump(
+            {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "digest": digest,
+            },
+            fh,
+        )
+    return digest
+
+
+def _source_stem(path):
+    """Cache name of a source file: its name plus a hash of its absolute
+    path, so same-named workbooks in different directories keep separate
+    stat indexes and column caches."""
+    name = os.path.splitext(os.path.basename(path))[0].replace(" ", "_")
+    where = hashlib.sha256(os.path.abspath(path).encode()).hexdigest()
+    return f"{name}-{where[:12]}"
+
+
+def _write_columnar(df, target):
+    """Writes each column as a standalone .npy file so it can be
+    memory-mapped on load."""
+    tmp = tempfile.mkdtemp(dir=os.path.dirname(target))
+    columns = []
+    for i, col in enumerate(df.columns):
+        values = df[col]
+        entry = {"name": str(col), "file": f"{i}.npy"}
+        if values.dtype.kind in "biufcM":
+            array = values.to_numpy()
+        else:
+            missing = values.isna().to_numpy()
+            array = values.where(~missing, "").to_numpy(dtype=str)
+            if missing.any():
+                entry["mask"] = f"{i}.mask.npy"
+                np.save(os.path.join(tmp, entry["mask"]), missing)
+        np.save(os.path.join(tmp, entry["file"]), array)
+        columns.append(entry)
+
+    with open(os.path.join(tmp, MANIFEST), "w") as fh:
+        json.dump({"columns": columns, "rows": len(df)}, fh)
+
+    if os.path.exists(target):
+        shutil.rmtree(target)
+    os.replace(tmp, target)
+
+
+def _read_columnar(target, mmap=True):
+    with open(os.path.join(target, MANIFEST)) as fh:
+        manifest = json.load(fh)
+
+    data = {}
+    for entry in manifest["columns"]:
+        array = np.load(
+            os.path.join(target, entry["file"]),
+            mmap_mode="r" if mmap else None,
+        )
+        if array.dtype.kind == "U":
+            values = pd.Series(array, dtype=object)
+            if "mask" in entry:
+                mask = np.load(os.path.join(target, entry["mask"]))
+                values[mask] = np.nan
+            array = values.to_numpy()
+        data[entry["name"]] = array
+    return pd.DataFrame(data, copy=False)
+
+
+def _prune_stale(cache_dir, stem, digest):
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if (
+            name.startswith(f"{stem}@")
+            and not name.startswith(f"{stem}@{digest}")
+            and os.path.isdir(path)
+        ):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def load_dataset(
+    source=DATA_URL,
+    cache_dir=DEFAULT_CACHE_DIR,
+    sheet_name=0,
+    mmap=True,
+    refresh=False,
+):
+    """Loads the airline workbook through a columnar cache.
+
+    The first load of a given file parses the Excel sheet and stores it as
+    per-column .npy arrays keyed by the file's content hash. Later loads
+    memory-map those arrays instead of re-parsing. Editing the source file
+    changes its hash, which rebuilds the cache and drops the stale copy.
+    A URL ``source`` is downloaded once; ``refresh`` checks it for a newer
+    workbook (see fetch_workbook).
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    if source.startswith(("http://", "https://")):
+        source = fetch_workbook(source, cache_dir, refresh=refresh)
+
+    stem = _source_stem(source)
+    digest = _source_digest(source, cache_dir)
+    target = os.path.join(cache_dir, f"{stem}@{digest[:16]}-{sheet_name}")
+
+    if not os.path.exists(os.path.join(target, MANIFEST)):
+        with stage("dataset.parse"):
+            df = pd.read_excel(source, sheet_name=sheet_name)
+            _write_columnar(df, target)
+        _prune_stale(cache_dir, stem, digest[:16])
+
+    with stage("dataset.read_cache"):
+        return _read_columnar(target, mmap=mmap)
@@ -0,0 +1,192 @@
+import html
+import os
+import re
+from contextlib import contextmanager
+
+from sample.choices import FORMATS, RENDER_MODES
+from sample.lazy import lazy_import
+from sample.profiling import stage
+from sample.traces import compact_figure
+
+PLOTLY_JS = "plotly.min.js"
+UNSAFE_CHARS = re.compile(r'[<>:"/\\|?*]')
+
+
+def _check_render_mode(mode, source="render mode"):
+    if mode not in RENDER_MODES:
+        raise ValueError(
+            f"Unknown {source} {mode!r}; expected one of "
+            f"{', '.join(RENDER_MODES)}"
+        )
+    return mode
+
+
+_settings = {
+    "output_dir": ".",
+    "format": "html",
+    "mode": _check_render_mode(
+        os.environ.get("AIRLINE_RENDER_MODE", "interactive"),
+        "AIRLINE_RENDER_MODE",
+    ),
+}
+_bundles = set()
+
+go = lazy_import("plotly.graph_objects")
+offline = lazy_import("plotly.offline")
+
+DASHBOARD_TEMPLATE = """<html>
+<head>
+<meta charset="utf-8" />
+<title>{title}</title>
+<script src="{plotly_js}"></script>
+<style>
+body {{ font-family: sans-serif; margin: 0 auto; max-width: 1100px; }}
+section {{ margin: 2em 0; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+{sections}
+</body>
+</html>
+"""
+
+
+def configure_export(output_dir=None, fmt=None):
+    """Sets the default output directory and format for write_figure."""
+    if output_dir is not None:
+        _settings["output_dir"] = output_dir
+    if fmt is not None:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown export format {fmt!r}")
+        _settings["format"] = fmt
+
+
+@contextmanager
+def export_config(output_dir=None, fmt=None):
+    """Temporarily changes the defaults set by configure_export."""
+    previous = _settings["output_dir"], _settings["format"]
+    try:
+        configure_export(output_dir, fmt)
+        yield
+    finally:
+        _settings["output_dir"], _settings["format"] = previous
+
+
+def set_render_mode(mode):
+    """Chooses what render_figure does with a finished figure.
+
+    ``interactive`` shows and writes it, ``headless`` only writes it and
+    ``export-only`` does neither, leaving the caller to batch-write the
+    returned figures.
+    """
+    _settings["mode"] = _check_render_mode(mode)
+
+
+def get_render_mode():
+    return _settings["mode"]
+
+
+@contextmanager
+def render_mode(mode):
+    """Temporarily switches the render mode."""
+    previous = get_render_mode()
+    set_render_mode(mode)
+    try:
+        yield
+    finally:
+        _settings["mode"] = previous
+
+
+def figure_title(fig):
+    return fig.layout.title.text or "Untitled"
+
+
+def render_figure(fig, title=None):
+    """Shows and/or writes a figure per the render mode, then returns it."""
+    mode = _settings["mode"]
+    if mode == "interactive":
+        fig.show()
+    if mode != "export-only":
+        write_figure(fig, title or figure_title(fig))
+    return fig
+
+
+def resolve_output(output_dir=None, fmt=None):
+    """Fills in the configured output directory and format."""
+    return output_dir or _settings["output_dir"], fmt or _settings["format"]
+
+
+def chart_filename(title, fmt="html"):
+    """File name for a chart title, with path-unsafe characters replaced."""
+    return f"{UNSAFE_CHARS.sub('-', title).strip()}.{fmt}"
+
+
+def ensure_plotlyjs(output_dir):
+    """Writes the shared plotly.js bundle into ``output_dir`` once."""
+    path = os.path.join(output_dir, PLOTLY_JS)
+    key = os.path.abspath(path)
+    if key in _bundles and os.path.exists(path):
+        return path
+
+    header = f"plotly.js v{offline.get_plotlyjs_version()}"
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as fh:
+            current = header in fh.read(256)
+    else:
+        current = False
+    if not current:
+        os.makedirs(output_dir, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write(offline.get_plotlyjs())
+    _bundles.add(key)
+    return path
+
+
+def write_figure(fig, title, output_dir=None, fmt=None):
+    """Writes a figure as a small HTML page or a JSON figure spec.
+
+    HTML pages load plotly.js from a shared ``plotly.min.js`` next to them
+    instead of inlining the multi-megabyte bundle. What is written is a
+    compacted copy (see sample.traces.compact_figure); ``fig`` keeps its
+    full arrays.
+    """
+    output_dir, fmt = resolve_output(output_dir, fmt)
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, chart_filename(title, fmt))
+
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}")
+    with stage(f"export.write_{fmt}"):
+        fig = compact_figure(go.Figure(fig))
+        if fmt == "json":
+            fig.write_json(path)
+        else:
+            ensure_plotlyjs(output_dir)
+            fig.write_html(path, include_plotlyjs=PLOTLY_JS, full_html=True)
+    return path
+
+
+def write_dashboard(figures, path, title="Airline Analysis Dashboard"):
+    """Combines ``{title: figure}`` into one page sharing a single bundle."""
+    output_dir = os.path.dirname(path) or "."
+    ensure_plotlyjs(output_dir)
+
+    sections = []
+    for i, (chart_title, fig) in enumerate(figures.items()):
+        div = compact_figure(go.Figure(fig)).to_html(
+            full_html=False, include_plotlyjs=False, div_id=f"chart-{i}"
+        )
+        sections.append(
+            f"<section>\n<h2>{html.escape(chart_title)}</h2>\n{div}\n</section>"
+        )
+
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write(
+            DASHBOARD_TEMPLATE.format(
+                title=html.escape(title),
+                plotly_js=PLOTLY_JS,
+                sections="\n".join(sections),
+            )
+        )
+    return path
@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+from sample.catalog import METRICS, ColumnCatalog
+from sample.compact import is_compact
+
+QUARTER_MONTH = {"Q1": 1, "Q2": 4, "Q3": 7, "Q4": 10}
+
+
+def frame_dates(df):
+    """Quarter-start dates for each row, from the index or Year/Quarter."""
+    if isinstance(df.index, pd.DatetimeIndex):
+        return df.index
+    if isinstance(df.index, pd.PeriodIndex):
+        return df.index.to_timestamp()
+    month = df["Quarter"].map(QUARTER_MONTH)
+    return pd.DatetimeIndex(
+        pd.to_datetime(
+            pd.DataFrame({"year": df["Year"], "month": month, "day": 1})
+        )
+    )
+
+
+def build_fact_table(df, cluster_map, metrics=METRICS, compact=None):
+    """Reshapes the wide workbook into one long (date, airline, cluster,
+    metric, value) table.
+
+    Airlines, clusters and metrics are categoricals built straight from
+    integer codes, so the table costs one float column plus a few small
+    integer columns regardless of how many carriers there are. A compact
+    table (the default for frames from ``compact_frame``) stores dates as
+    a categorical of the quarters as well, and values as float32 unless
+    some columns hold integers (``currency="int64"``), whose exact totals
+    float64 keeps.
+    """
+    catalog = ColumnCatalog.for_frame(df)
+    airlines = catalog.airlines
+    pairs = [
+        (a, m, catalog.get(airline, metric))
+        for m, metric in enumerate(metrics)
+        for a, airline in enumerate(airlines)
+        if catalog.get(airline, metric) is not None
+    ]
+
+    n_rows = len(df)
+    columns = [col for _, _, col in pairs]
+    if compact is None:
+        compact = is_compact(df, columns)
+    exact = any(df[col].dtype.kind in "iu" for col in columns)
+    dtype = np.float32 if compact and not exact else float
+    values = df[columns].to_numpy(dtype=dtype)
+    dates = frame_dates(df)
+    if compact and dates.is_unique:
+        date = pd.Categorical.from_codes(
+            np.tile(np.arange(n_rows), len(pairs)), dates
+        )
+    else:
+        date = np.tile(dates.to_numpy(), len(pairs))
+
+    facts = pd.DataFrame(
+        {
+            "date": date,
+            "airline": pd.Categorical.from_codes(
+                np.repeat([a for a, _, _ in pairs], n_rows), airlines
+            ),
+            "metric": pd.Categorical.from_codes(
+                np.repeat([m for _, m, _ in pairs], n_rows), list(metrics)
+            ),
+            "value": values.ravel(order="F"),
+        }
+    )
+    return assign_clusters(facts, cluster_map)
+
+
+def assign_clusters(facts, cluster_map):
+    """Returns ``facts`` with its cluster column rebuilt from ``cluster_map``.
+
+    Only the airline categories are mapped, so regrouping the table under
+    a different cluster map costs a single integer take.
+    """
+    clusters = list(cluster_map)
+    lookup = {
+        airline: i
+        for i, airlines in enumerate(cluster_map.values())
+        for airline in airlines
+    }
+    category_codes = np.array(
+        [lookup.get(a, -1) for a in facts["airline"].cat.categories]
+    )
+    codes = category_codes[facts["airline"].cat.codes.to_numpy()]
+    return facts.assign(cluster=pd.Categorical.from_codes(codes, clusters))[
+        ["date", "airline", "cluster", "metric", "value"]
+    ]
+
+
+def cluster_totals(facts):
+    """Sums every (cluster, metric) series in one groupby pass.
+
+    Returns a frame indexed by date with (cluster, metric) columns.
+    """
+    grouped = facts.groupby(["cluster", "metric", "date"], observed=True)[
+        "value"
+    ].sum()
+    totals = grouped.unstack(["cluster", "metric"]).fillna(0)
+    if isinstance(totals.index, pd.CategoricalIndex):
+        totals.index = pd.DatetimeIndex(np.asarray(totals.index), name="date")
+        totals = totals.sort_index()
+    return totals
+
+
+def yearly_cluster_metric(totals, metric):
+    """Per-year sums of one metric with a ``Cluster {c}`` column per
+    cluster, matching the layout the cluster area charts plot."""
+    frame = totals.xs(metric, axis=1, level="metric")
+    frame = frame.groupby(frame.index.year).sum()
+    frame.columns = [f"Cluster {c}" for c in frame.columns]
+    frame.index.name = "Year"
+    return frame.reset_index()
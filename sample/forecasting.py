@@ -0,0 +1,137 @@
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sample.helpers import calculate_mape, monte_carlo_forecast, perform_t_test
+from sample.lazy import lazy_import
+from sample.profiling import stage
+
+metrics = lazy_import("sklearn.metrics")
+
+
+def series_seed(seed, key):
+    """Seed for one series, derived from the run seed and the series key so
+    it does not depend on task order or on which worker runs it."""
+    return np.random.SeedSequence([seed, zlib.crc32(repr(key).encode())])
+
+
+def warm_start_params(model_fit):
+    """Fitted Holt-Winters parameters in the order ``fit(start_params=...)``
+    expects: smoothing level/trend/seasonal, initial level/trend, damping,
+    initial seasons, dropping the ones the model does not estimate."""
+    params = model_fit.params
+    model = model_fit.model
+    values = [params["smoothing_level"]]
+    if model.has_trend:
+        values.append(params["smoothing_trend"])
+    if model.has_seasonal:
+        values.append(params["smoothing_seasonal"])
+    values.append(params["initial_level"])
+    if model.has_trend:
+        values.append(params["initial_trend"])
+    if model.damped_trend:
+        values.append(params["damping_trend"])
+    if model.has_seasonal:
+        values.extend(params["initial_seasons"])
+    return [float(v) for v in values]
+
+
+def evaluate_forecast(
+    series, forecaster, horizon, seed=None, start_params=None, config=None
+):
+    """Fits one series and scores it: MAE/RMSE/MAPE, t-test, Monte Carlo CI.
+
+    ``start_params`` (from a previous fit's ``Params``) warm-starts the
+    optimiser instead of running its grid search; ``config`` (see
+    sample.selection) is passed on to the forecaster when given.
+    """
+    kwargs = {}
+    if start_params is not None:
+        kwargs["start_params"] = start_params
+    if config is not None:
+        kwargs["config"] = config
+    with stage("forecast.fit"):
+        fitted, forecast, model_fit = forecaster(series, horizon, **kwargs)
+
+    common_index = fitted.index.intersection(series.index)
+    actual_trimmed = series.loc[common_index]
+    fitted_trimmed = fitted.loc[common_index]
+
+    mae = metrics.mean_absolute_error(actual_trimmed, fitted_trimmed)
+    rmse = np.sqrt(metrics.mean_squared_error(actual_trimmed, fitted_trimmed))
+    mape = calculate_mape(actual_trimmed, fitted_trimmed)
+
+    p_value = perform_t_test(actual_trimmed, fitted_trimmed)
+    residuals = (actual_trimmed - fitted_trimmed).dropna()
+    with stage("forecast.monte_carlo"):
+        ci_lower, ci_upper = monte_carlo_forecast(
+            forecast, residuals, seed=seed
+        )
+
+    return {
+        "Fitted": fitted_trimmed,
+        "Forecast": forecast,
+        "MAE": mae,
+        "RMSE": rmse,
+        "MAPE": mape,
+        "p_value": p_value,
+        "CI_Lower": ci_lower,
+        "CI_Upper": ci_upper,
+        "Params": warm_start_params(model_fit),
+    }
+
+
+def _evaluate_task(task):
+    return evaluate_forecast(*task)
+
+
+def parallel_map(func, tasks, n_workers=None):
+    """Maps ``func`` over ``tasks`` in a process pool, preserving order.
+
+    ``n_workers=1`` runs in-process, which is also what a single task does.
+    """
+    tasks = list(tasks)
+    n_workers = n_workers or os.cpu_count() or 1
+    if n_workers == 1 or len(tasks) <= 1:
+        return [func(task) for task in tasks]
+
+    chunksize = max(1, len(tasks) // (n_workers * 4))
+    with ProcessPoolExecutor(max_workers=min(n_workers, len(tasks))) as pool:
+        return list(pool.map(func, tasks, chunksize=chunksize))
+
+
+def run_forecasts(
+    series_by_key,
+    forecaster,
+    horizon=16,
+    n_workers=None,
+    seed=0,
+    start_params=None,
+    configs=None,
+):
+    """Fits and evaluates every series in parallel.
+
+    ``series_by_key`` maps a key such as ``(metric, group)`` to a series and
+    the result maps the same keys to the evaluation dict. ``forecaster`` must
+    be a module-level function ``(series, horizon) -> (fitted, forecast,
+    model_fit)`` so it can be sent to worker processes. Each series gets its
+    own seed from ``seed`` and its key, so results are identical for any
+    worker count. ``start_params`` and ``configs`` optionally map keys to
+    warm-start parameters and smoothing configurations.
+    """
+    start_params = start_params or {}
+    configs = configs or {}
+    keys = list(series_by_key)
+    tasks = [
+        (
+            series_by_key[key],
+            forecaster,
+            horizon,
+            series_seed(seed, key),
+            start_params.get(key),
+            configs.get(key),
+        )
+        for key in keys
+    ]
+    return dict(zip(keys, parallel_map(_evaluate_task, tasks, n_workers)))
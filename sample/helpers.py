@@ -2,12 +2,22 @@ import warnings
 
 import numpy as np
 import pandas as pd
-import plotly.graph_objects as go
-from scipy.stats import ttest_ind
-from statsmodels.tsa.holtwinters import ExponentialSmoothing
+from sample.cache import memoize
+from sample.catalog import ColumnCatalog
+from sample.clustering import GROUP_NAMES
+from sample.export import render_figure
+from sample.lazy import lazy_import
+from sample.ranges import performance_index
+from sample.resilience import ResilienceEngine
+from sample.scoring import composite_score, normalize
+from sample.traces import prepare_xy
 
 warnings.filterwarnings("ignore")
 
+go = lazy_import("plotly.graph_objects")
+stats = lazy_import("scipy.stats")
+hw = lazy_import("statsmodels.tsa.holtwinters")
+
 
 def classify_airline(name):
     low_cost = ["SPIRIT", "FRONTIER", "ALLEGIANT", "JETBLUE"]
@@ -25,26 +35,21 @@ def classify_airline(name):
 
 def extract_airlines(df):
     """Extract unique airline names based on known suffixes."""
-    keywords = ["PASSENGER", "NET_INCOME", "OPERATING_REVENUE"]
-    airlines = set()
-    for col in df.columns:
-        for key in keywords:
-            if key in col:
-                name = (
-                    col.replace(f"_{key}", "")
-                    .replace("_AIRLINE", "")
-                    .replace("_AIR", "")
-                    .upper()
-                )
-                airlines.add(name)
-    return sorted(airlines)
-
-
-def classify_airlines_df(df):
+    return ColumnCatalog.for_frame(df).airlines
+
+
+def classify_airlines_df(df, groups=None):
+    """Airline types, from named ``groups`` (e.g. the clustering's
+    Legacy/LCC/Regional) when given, else from the fixed carrier lists."""
     airlines = extract_airlines(df)
-    return pd.DataFrame(
-        {"Airline": airlines, "Type": [classify_airline(a) for a in airlines]}
-    )
+    if groups is None:
+        types = [classify_airline(a) for a in airlines]
+    else:
+        group_of = {
+            a: name for name, members in groups.items() for a in members
+        }
+        types = [group_of.get(a, "Unknown") for a in airlines]
+    return pd.DataFrame({"Airline": airlines, "Type": types})
 
 
 def get_airlines_by_cluster(cluster_map):
@@ -52,53 +57,62 @@ def get_airlines_by_cluster(cluster_map):
 
 
 def extract_columns(df, airlines, keyword):
-    return [
-        col
-        for col in df.columns
-        if any(airline in col and keyword in col for airline in airlines)
-    ]
+    return ColumnCatalog.for_frame(df).columns(airlines, keyword)
 
 
 def normalize_columns(df, columns):
-    df_norm = df.copy()
-    for col in columns:
-        min_val = df_norm[col].min()
-        max_val = df_norm[col].max()
-        df_norm[col] = (
-            (df_norm[col] - min_val) / (max_val - min_val)
-            if max_val != min_val
-            else 0
-        )
+    # Shallow copy: only the rescaled columns get new storage, normalised
+    # as one block in place. Constant columns become 0.
+    df_norm = df.copy(deep=False)
+    columns = list(columns)
+    block = df_norm[columns].to_numpy(dtype=float, copy=True)
+    df_norm[columns] = normalize(block, out=block)
     return df_norm
 
 
 def melt_for_plotting(df, id_vars, var_name, value_name):
-    return df.melt(id_vars=id_vars, var_name=var_name, value_name=value_name)
+    """Long format for plotting. The variable column is a categorical in
+    column order, so each name is stored once rather than once per row."""
+    long = df.melt(id_vars=id_vars, var_name=var_name, value_name=value_name)
+    names = long[var_name]
+    long[var_name] = pd.Categorical(names, categories=pd.unique(names))
+    return long
+
+
+def yearly_by_airline(df, airlines, metric, value_name):
+    """Long (Year, value, Airline) table of yearly sums of one metric,
+    built from a single groupby over the airlines' columns."""
+    catalog = ColumnCatalog.for_frame(df)
+    names = {}
+    for airline in airlines:
+        col = catalog.get(airline, metric)
+        if col and col not in names:
+            names[col] = airline
+    yearly = df[["Year", *names]].groupby("Year")[list(names)].sum()
+    long = melt_for_plotting(
+        yearly.rename(columns=names).reset_index(),
+        "Year",
+        "Airline",
+        value_name,
+    )
+    return long[["Year", value_name, "Airline"]]
 
 
+@memoize
 def calc_recovery_rate(df, year_before, year_after, net_income_cols):
-    pre = df[df["Year"] == year_before][net_income_cols].mean()
-    post = df[df["Year"] == year_after][net_income_cols].mean()
-    return ((post - pre) / pre) * 100
+    engine = ResilienceEngine(df, {col: [col] for col in net_income_cols})
+    rates = engine.recovery_rates([(year_before, year_after)])
+    return rates.iloc[0].rename(None)
 
 
+@memoize
 def calculate_performance(df, airlines):
+    catalog = ColumnCatalog.for_frame(df)
     summary = []
     for airline in airlines:
-        p_col = next(
-            (c for c in df.columns if "PASSENGER" in c and airline in c), None
-        )
-        r_col = next(
-            (
-                c
-                for c in df.columns
-                if "OPERATING_REVENUE" in c and airline in c
-            ),
-            None,
-        )
-        i_col = next(
-            (c for c in df.columns if "NET_INCOME" in c and airline in c), None
-        )
+        p_col = catalog.get(airline, "PASSENGER")
+        r_col = catalog.get(airline, "OPERATING_REVENUE")
+        i_col = catalog.get(airline, "NET_INCOME")
 
         if p_col and r_col and i_col:
             summary.append(
@@ -112,20 +126,17 @@ def calculate_performance(df, airlines):
     return pd.DataFrame(summary)
 
 
-def normalize_performance(perf_df):
-    for metric in [
+def normalize_performance(perf_df, weights=None):
+    metrics = [
         "Total Revenue",
         "Total Net Income",
         "Avg Passenger Growth Rate",
-    ]:
-        min_val = perf_df[metric].min()
-        max_val = perf_df[metric].max()
-        perf_df[f"{metric} (Normalized)"] = (perf_df[metric] - min_val) / (
-            max_val - min_val
-        )
-    perf_df["Overall Score"] = perf_df[
-        [col for col in perf_df.columns if "Normalized" in col]
-    ].mean(axis=1)
+    ]
+    perf_df = perf_df.copy()
+    normalized, score = composite_score(perf_df[metrics], weights)
+    for m, metric in enumerate(metrics):
+        perf_df[f"{metric} (Normalized)"] = normalized[:, m]
+    perf_df["Overall Score"] = score
     return perf_df.sort_values(
         by="Overall Score", ascending=False
     ).reset_index(drop=True)
@@ -136,70 +147,37 @@ def test_airline_performance_by_range(df, start_year, end_year):
         print("Please enter a year range between 2003 and 2023.")
         return None
 
-    airlines = extract_airlines(df)
-    performance_summary = []
-    df_range = df[(df["Year"] >= start_year) & (df["Year"] <= end_year)]
-
-    for airline in airlines:
-        p_col = next(
-            (
-                col
-                for col in df.columns
-                if "PASSENGER" in col and airline in col
-            ),
-            None,
-        )
-        r_col = next(
-            (
-                col
-                for col in df.columns
-                if "OPERATING_REVENUE" in col and airline in col
-            ),
-            None,
-        )
-        i_col = next(
-            (
-                col
-                for col in df.columns
-                if "NET_INCOME" in col and airline in col
-            ),
-            None,
+    return performance_index(df).score(start_year, end_year)
+
+
+@memoize
+def smooth_forecast(series, metric_name, forecast_horizon=8, config=None):
+    """Fits Exponential Smoothing Model and returns fitted values and forecast.
+
+    ``config`` is a dict of ExponentialSmoothing options (see
+    sample.selection), ``"aic"`` or ``"backtest"`` to select one for the
+    series automatically, or None for the metric's default.
+    """
+    if config in ("aic", "backtest"):
+        # Imported here: selection reaches back into helpers via forecasting.
+        from sample.selection import select_model
+
+        config = select_model(series, criterion=config)["config"]
+    if config is not None:
+        model = hw.ExponentialSmoothing(
+            series,
+            trend=config["trend"],
+            damped_trend=config["damped_trend"],
+            seasonal=config["seasonal"],
+            seasonal_periods=4 if config["seasonal"] else None,
+            use_boxcox=config["use_boxcox"],
         )
-
-        if p_col and r_col and i_col:
-            performance_summary.append(
-                {
-                    "Airline": airline,
-                    "Revenue": df_range[r_col].sum(),
-                    "Net Income": df_range[i_col].sum(),
-                    "Passengers": df_range[p_col].sum(),
-                }
-            )
-
-    year_df = pd.DataFrame(performance_summary)
-    for metric in ["Revenue", "Net Income", "Passengers"]:
-        min_val = year_df[metric].min()
-        max_val = year_df[metric].max()
-        year_df[f"{metric} (Norm)"] = (year_df[metric] - min_val) / (
-            max_val - min_val
-        )
-
-    year_df["Performance Score"] = year_df[
-        [col for col in year_df.columns if "Norm" in col]
-    ].mean(axis=1)
-    return year_df.sort_values(
-        by="Performance Score", ascending=False
-    ).reset_index(drop=True)
-
-
-def smooth_forecast(series, metric_name, forecast_horizon=8):
-    """Fits Exponential Smoothing Model and returns fitted values and forecast."""
-    if metric_name == "Net Income":
-        model = ExponentialSmoothing(
+    elif metric_name == "Net Income":
+        model = hw.ExponentialSmoothing(
             series, trend="add", seasonal="add", seasonal_periods=4
         )
     else:
-        model = ExponentialSmoothing(
+        model = hw.ExponentialSmoothing(
             series, trend="add", seasonal="mul", seasonal_periods=4
         )
     model_fit = model.fit()
@@ -212,22 +190,28 @@ def plot_forecast(results, metric_name):
     """Plots Actual vs Forecast for a given metric."""
     fig = go.Figure()
 
-    for group in ["Legacy", "LCC", "Regional"]:
-        fitted = results[(metric_name, group)]["Fitted"]
-        forecast = results[(metric_name, group)]["Forecast"]
+    for group in GROUP_NAMES:
+        fitted_x, fitted_y, _ = prepare_xy(
+            results[(metric_name, group)]["Fitted"].index,
+            results[(metric_name, group)]["Fitted"],
+        )
+        forecast_x, forecast_y, _ = prepare_xy(
+            results[(metric_name, group)]["Forecast"].index,
+            results[(metric_name, group)]["Forecast"],
+        )
 
         fig.add_trace(
             go.Scatter(
-                x=fitted.index,
-                y=fitted,
+                x=fitted_x,
+                y=fitted_y,
                 mode="lines",
                 name=f"{group} (Actual)",
             )
         )
         fig.add_trace(
             go.Scatter(
-                x=forecast.index,
-                y=forecast,
+                x=forecast_x,
+                y=forecast_y,
                 mode="lines",
                 name=f"{group} (Forecast)",
                 line=dict(dash="dash"),
@@ -243,7 +227,7 @@ def plot_forecast(results, metric_name):
         width=1000,
         height=600,
     )
-    fig.show()
+    return render_figure(fig, f"{metric_name} Forecast by Airline Group")
 
 
 # --- Helper: MAPE ---
@@ -251,21 +235,94 @@ def calculate_mape(actual, predicted):
     return np.mean(np.abs((actual - predicted) / actual)) * 100
 
 
-def monte_carlo_forecast(forecast, residuals, n_simulations=1000):
-    steps = len(forecast)
-    simulations = np.array(
-        [
-            forecast.values
-            + np.random.choice(residuals, size=steps, replace=True)
-            for _ in range(n_simulations)
-        ]
+def monte_carlo_forecast(
+    forecast, residuals, n_simulations=1000, seed=None, chunk_size=None
+):
+    """Returns 95% bands from forecast + bootstrapped residuals."""
+    ci_lower, ci_upper = monte_carlo_batch(
+        np.asarray(forecast, dtype=float)[None, :],
+        [residuals],
+        n_simulations=n_simulations,
+        seed=seed,
+        chunk_size=chunk_size,
+    )
+    return ci_lower[0], ci_upper[0]
+
+
+def monte_carlo_batch(
+    forecasts, residuals, n_simulations=1000, seed=None, chunk_size=None
+):
+    """Bootstrapped 95% bands for many series at once.
+
+    ``forecasts`` is (n_series, steps) and ``residuals`` holds one residual
+    array per series (lengths may differ). All resamples are drawn in one
+    ``Generator.integers`` call. With ``chunk_size`` set, simulations are
+    drawn ``chunk_size`` at a time and only a per-step count of how often
+    each residual was drawn is kept, so memory stays at
+    O(n_series * steps * n_residuals) however many simulations are run.
+    Every simulated value is a forecast plus one observed residual, so
+    those counts give exact percentiles.
+    """
+    forecasts = np.atleast_2d(np.asarray(forecasts, dtype=float))
+    n_series, steps = forecasts.shape
+    lengths = np.array([len(r) for r in residuals])
+    pool = np.zeros((n_series, lengths.max()))
+    for i, r in enumerate(residuals):
+        pool[i, : lengths[i]] = np.asarray(r, dtype=float)
+
+    rng = np.random.default_rng(seed)
+    rows = np.arange(n_series)[None, :, None]
+
+    if chunk_size is None or chunk_size >= n_simulations:
+        draws = rng.integers(
+            0, lengths[:, None], size=(n_simulations, n_series, steps)
+        )
+        simulations = forecasts[None] + pool[rows, draws]
+        ci_lower = np.percentile(simulations, 2.5, axis=0)
+        ci_upper = np.percentile(simulations, 97.5, axis=0)
+        return ci_lower, ci_upper
+
+    width = pool.shape[1]
+    offsets = (
+        np.arange(n_series)[:, None] * steps + np.arange(steps)[None, :]
+    ) * width
+    counts = np.zeros(n_series * steps * width, dtype=np.int64)
+    for start in range(0, n_simulations, chunk_size):
+        size = min(chunk_size, n_simulations - start)
+        draws = rng.integers(0, lengths[:, None], size=(size, n_series, steps))
+        counts += np.bincount(
+            (offsets[None] + draws).ravel(), minlength=counts.size
+        )
+    counts = counts.reshape(n_series, steps, width)
+    return (
+        _percentile_from_counts(forecasts, pool, lengths, counts, 2.5),
+        _percentile_from_counts(forecasts, pool, lengths, counts, 97.5),
+    )
+
+
+def _percentile_from_counts(forecasts, pool, lengths, counts, q):
+    """np.percentile (linear interpolation) over a residual count sketch."""
+    padded = np.where(
+        np.arange(pool.shape[1])[None, :] < lengths[:, None], pool, np.inf
     )
-    ci_lower = np.percentile(simulations, 2.5, axis=0)
-    ci_upper = np.percentile(simulations, 97.5, axis=0)
-    return ci_lower, ci_upper
+    order = np.argsort(padded, axis=1)
+    ordered = np.take_along_axis(padded, order, axis=1)
+    cumulative = np.cumsum(
+        np.take_along_axis(counts, order[:, None, :], axis=2), axis=2
+    )
+
+    n_total = cumulative[..., -1:]
+    rank = (n_total - 1) * q / 100
+    below = np.floor(rank)
+    lo = (cumulative <= below).sum(axis=2)
+    hi = (cumulative <= np.minimum(below + 1, n_total - 1)).sum(axis=2)
+    rows = np.arange(len(pool))[:, None]
+    frac = (rank - below)[..., 0]
+    value = ordered[rows, lo] + frac * (ordered[rows, hi] - ordered[rows, lo])
+    return forecasts + value
 
 
 # --- Helper: Hypothesis Test ---
 def perform_t_test(actual, forecasted):
-    t_stat, p_val = ttest_ind(actual, forecasted)
+    t_stat, p_val = stats.ttest_ind(actual, forecasted)
     return p_val
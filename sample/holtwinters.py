@@ -0,0 +1,226 @@
+import numpy as np
+import pandas as pd
+from sample.catalog import ColumnCatalog
+from sample.facts import frame_dates
+
+SEASONAL = ("add", "mul")
+
+# Coarse grid each smoothing parameter starts from before the local search.
+GRID = np.linspace(0.05, 0.95, 7)
+
+
+def initial_states(values, seasonal="add", seasonal_periods=4):
+    """Simple initialisation (as statsmodels' ``legacy-initial``): level
+    is the first season's mean, trend the mean per-step change between
+    the first two seasons, seasons the first season's deviations."""
+    m = seasonal_periods
+    first = values[:, :m]
+    level = first.mean(axis=1)
+    trend = (values[:, m : 2 * m] - first).mean(axis=1) / m
+    if seasonal == "mul":
+        seasons = first / level[:, None]
+    else:
+        seasons = first - level[:, None]
+    return level, trend, seasons
+
+
+def smooth(values, alpha, beta, gamma, level, trend, seasons, seasonal="add"):
+    """Runs the additive-trend Holt-Winters recursions for a batch.
+
+    ``values`` is (..., n) and the parameters and initial level/trend are
+    broadcast to the leading shape (seasons to (..., m)), so many series
+    and many parameter candidates are smoothed in one pass over time.
+    Returns the one-step fitted values and the final level, trend and
+    the seasonal factors used for the next ``m`` forecast steps.
+    """
+    shape = np.broadcast_shapes(
+        values.shape[:-1], np.shape(alpha), np.shape(level)
+    )
+    n, m = values.shape[-1], seasons.shape[-1]
+    level = np.broadcast_to(level, shape).astype(float)
+    trend = np.broadcast_to(trend, shape).astype(float)
+    season = np.empty(shape + (n + m,))
+    season[..., :m] = seasons
+    fitted = np.empty(shape + (n,))
+    mul = seasonal == "mul"
+
+    for t in range(n):
+        y = values[..., t]
+        s = season[..., t]
+        base = level + trend
+        if mul:
+            fitted[..., t] = base * s
+            new_level = alpha * y / s + (1 - alpha) * base
+            season[..., t + m] = gamma * y / base + (1 - gamma) * s
+        else:
+            fitted[..., t] = base + s
+            new_level = alpha * (y - s) + (1 - alpha) * base
+            season[..., t + m] = gamma * (y - base) + (1 - gamma) * s
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        level = new_level
+    # statsmodels forecasts step m with the season before the last
+    # observation's update; follow it so forecasts agree.
+    ahead = np.concatenate(
+        [season[..., n : n + m - 1], season[..., n - 1 : n]], axis=-1
+    )
+    return fitted, level, trend, ahead
+
+
+class HoltWintersBatch:
+    """Holt-Winters (additive trend, additive or multiplicative seasonal)
+    fitted to many aligned series at once.
+
+    ``values`` is a (series, periods) array. ``fit`` chooses each series'
+    smoothing parameters by minimising its in-sample SSE: a coarse grid
+    evaluated for every series in one batched pass, then a local search
+    that refines all unconverged series together, halving each series'
+    step until it is below ``tol``. The recursions match statsmodels'
+    ``ExponentialSmoothing`` for the same parameters and initial states.
+    """
+
+    def __init__(self, values, seasonal="add", seasonal_periods=4):
+        values = np.asarray(values, dtype=float)
+        if values.ndim == 1:
+            values = values[None, :]
+        if seasonal not in SEASONAL:
+            raise ValueError(f"seasonal must be one of {SEASONAL}")
+        if values.ndim != 2 or values.shape[1] < 2 * seasonal_periods:
+            raise ValueError("Need a 2-D array with two full seasons")
+        if not np.isfinite(values).all():
+            raise ValueError("Series must not contain missing values")
+        if seasonal == "mul" and (values <= 0).any():
+            raise ValueError("Multiplicative seasonality needs positive data")
+        self.values = values
+        self.seasonal = seasonal
+        self.seasonal_periods = seasonal_periods
+        self.initial = initial_states(values, seasonal, seasonal_periods)
+
+    def _sse(self, params, rows):
+        """SSE per (series, candidate) for the series in ``rows`` and
+        params of shape (len(rows), C, 3)."""
+        values = self.values[rows, None, :]
+        level, trend, seasons = (state[rows] for state in self.initial)
+        fitted, *_ = smooth(
+            values,
+            params[..., 0],
+            params[..., 1],
+            params[..., 2],
+            level[:, None],
+            trend[:, None],
+            seasons[:, None, :],
+            self.seasonal,
+        )
+        with np.errstate(invalid="ignore", over="ignore"):
+            sse = ((values - fitted) ** 2).sum(axis=-1)
+        return np.where(np.isfinite(sse), sse, np.inf)
+
+    def _optimize(self, step=0.05, tol=1e-4, max_iter=200):
+        rows = np.arange(len(self.values))
+        grid = np.stack(np.meshgrid(GRID, GRID, GRID), axis=-1).reshape(-1, 3)
+        sse = self._sse(np.broadcast_to(grid, (len(rows),) + grid.shape), rows)
+        best = grid[sse.argmin(axis=1)]
+        best_sse = sse.min(axis=1)
+
+        # Each round tries the 3x3x3 neighbourhood of every unconverged
+        # series' best point, moving to the best neighbour or, when none
+        # improves, halving that series' step.
+        offsets = np.stack(
+            np.meshgrid(*[(-1.0, 0.0, 1.0)] * 3), axis=-1
+        ).reshape(-1, 3)
+        step = np.full(len(rows), step)
+        for _ in range(max_iter):
+            active = rows[step >= tol]
+            if not len(active):
+                break
+            candidates = np.clip(
+                best[active, None, :] + step[active, None, None] * offsets,
+                0,
+                1,
+            )
+            sse = self._sse(candidates, active)
+            pick = sse.argmin(axis=1)
+            new_sse = sse[np.arange(len(active)), pick]
+            improved = new_sse < best_sse[active]
+            moved = active[improved]
+            best[moved] = candidates[improved, pick[improved]]
+            best_sse[moved] = new_sse[improved]
+            step[active[~improved]] /= 2
+        return best
+
+    def fit(self, smoothing=None):
+        """Fits every series; ``smoothing`` optionally fixes (alpha, beta,
+        gamma), as one triple or one per series, instead of optimising."""
+        if smoothing is None:
+            params = self._optimize()
+        else:
+            params = np.broadcast_to(
+                np.asarray(smoothing, dtype=float), (len(self.values), 3)
+            ).copy()
+        self.params = params
+        fitted, self.level, self.trend, self.season = smooth(
+            self.values,
+            params[:, 0],
+            params[:, 1],
+            params[:, 2],
+            *self.initial,
+            self.seasonal,
+        )
+        self.fittedvalues = fitted
+        self.sse = ((self.values - fitted) ** 2).sum(axis=1)
+        return self
+
+    def forecast(self, steps):
+        """(series, steps) out-of-sample forecasts."""
+        h = np.arange(1, steps + 1)
+        base = self.level[:, None] + h * self.trend[:, None]
+        seasons = self.season[:, (h - 1) % self.seasonal_periods]
+        return base * seasons if self.seasonal == "mul" else base + seasons
+
+
+def future_index(index, steps):
+    """The ``steps`` quarter starts after a quarterly DatetimeIndex."""
+    freq = pd.infer_freq(index) if len(index) >= 3 else None
+    return pd.date_range(index[-1], periods=steps + 1, freq=freq or "QS")[1:]
+
+
+def fit_frame(frame, steps=16, seasonal="add", seasonal_periods=4):
+    """Fits every column of a quarterly frame in one batch.
+
+    Returns ``(fitted, forecast, model)`` with the fitted values indexed
+    like ``frame`` and the forecasts on the following quarters.
+    """
+    model = HoltWintersBatch(
+        frame.to_numpy(dtype=float).T, seasonal, seasonal_periods
+    ).fit()
+    fitted = pd.DataFrame(
+        model.fittedvalues.T, index=frame.index, columns=frame.columns
+    )
+    forecast = pd.DataFrame(
+        model.forecast(steps).T,
+        index=future_index(frame.index, steps),
+        columns=frame.columns,
+    )
+    return fitted, forecast, model
+
+
+def forecast_airlines(df, metric, steps=16, seasonal=None):
+    """Fitted values and forecasts of ``metric`` for every airline in the
+    workbook, as ``(fitted, forecast)`` frames with one column per airline.
+
+    Airlines with gaps in the metric are left out. ``seasonal`` defaults
+    to additive for net income (which can be negative) and multiplicative
+    otherwise, as helpers.smooth_forecast does.
+    """
+    if seasonal is None:
+        seasonal = "add" if metric == "NET_INCOME" else "mul"
+    catalog = ColumnCatalog.for_frame(df)
+    airlines = [
+        airline
+        for airline in catalog.airlines
+        if catalog.get(airline, metric) is not None
+    ]
+    frame = df[[catalog.get(airline, metric) for airline in airlines]]
+    frame = frame.set_axis(airlines, axis=1).set_axis(frame_dates(df))
+    frame = frame.sort_index().dropna(axis=1)
+    fitted, forecast, _ = fit_frame(frame, steps, seasonal)
+    return fitted, forecast
@@ -0,0 +1,281 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from sample.catalog import METRICS, ColumnCatalog, parse_column
+from sample.facts import build_fact_table, cluster_totals, frame_dates
+from sample.forecasting import run_forecasts
+
+STATE_FILE = "state.json"
+TOTALS_FILE = "totals.pkl"
+FORECASTS_FILE = "forecasts.pkl"
+
+
+def row_keys(df):
+    """``YYYYQn`` label for each row."""
+    return [f"{y}{q}" for y, q in zip(df["Year"], df["Quarter"])]
+
+
+def array_digest(*arrays):
+    digest = hashlib.sha1()
+    for array in arrays:
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+
+def series_digest(series):
+    return array_digest(
+        series.index.asi8, series.to_numpy(dtype=float, na_value=np.nan)
+    )
+
+
+class RefreshPlan:
+    """What changed since the last run.
+
+    ``revised_columns`` had values edited on rows seen before,
+    ``appended_columns`` have data on rows that are new this run and
+    ``removed_columns`` were in the last run's workbook but not this one.
+    """
+
+    def __init__(
+        self,
+        full,
+        new_rows=(),
+        revised_columns=(),
+        appended_columns=(),
+        removed_columns=(),
+    ):
+        self.full = full
+        self.new_rows = list(new_rows)
+        self.revised_columns = list(revised_columns)
+        self.appended_columns = list(appended_columns)
+        self.removed_columns = list(removed_columns)
+        self.changed_columns = sorted(
+            set(self.revised_columns)
+            | set(self.appended_columns)
+            | set(self.removed_columns)
+        )
+        self.changed = {
+            parse_column(col)
+            for col in self.changed_columns
+            if parse_column(col) is not None
+        }
+        self.changed_metrics = {metric for _, metric in self.changed}
+
+    def affects(self, metrics):
+        return self.full or bool(self.changed_metrics.intersection(metrics))
+
+    def __repr__(self):
+        if self.full:
+            return "RefreshPlan(full)"
+        return (
+            f"RefreshPlan(new_rows={self.new_rows}, "
+            f"changed_columns={self.changed_columns})"
+        )
+
+
+class RefreshState:
+    """Aggregates, forecasts and fingerprints persisted between runs.
+
+    ``plan`` compares a fresh workbook with the fingerprints from the
+    previous run, ``totals`` and ``forecasts`` recompute only the cluster
+    series and fits that plan touches (warm-starting changed fits from
+    their previous smoothing parameters), and ``save`` writes everything
+    back for the next quarter.
+    """
+
+    def __init__(self, state_dir):
+        self.state_dir = state_dir
+        self.state = self._load_json(STATE_FILE)
+        self.saved_totals = self._load_pickle(TOTALS_FILE) or {}
+        self.saved_forecasts = self._load_pickle(FORECASTS_FILE) or {}
+        self.plan_ = None
+        self.refitted = []
+        self._next = {}
+        self._next_totals = {}
+
+    def _path(self, name):
+        return os.path.join(self.state_dir, name)
+
+    def _load_json(self, name):
+        if not os.path.exists(self._path(name)):
+            return None
+        with open(self._path(name)) as fh:
+            return json.load(fh)
+
+    def _load_pickle(self, name):
+        if self.state is None or not os.path.exists(self._path(name)):
+            return None
+        return pd.read_pickle(self._path(name))
+
+    def plan(self, df, groupings=None):
+        """Diffs ``df`` against the last run.
+
+        ``groupings`` maps a name to the cluster map used for that name's
+        totals; a changed map forces a full refresh.
+        """
+        catalog = ColumnCatalog.for_frame(df)
+        columns = [
+            catalog.get(a, m)
+            for a in catalog.airlines
+            for m in METRICS
+            if catalog.get(a, m) is not None
+        ]
+        keys = row_keys(df)
+        groupings = {
+            name: {str(c): list(a) for c, a in cmap.items()}
+            for name, cmap in (groupings or {}).items()
+        }
+        digests = {}
+        self._next.update(rows=keys, groupings=groupings, columns=digests)
+
+        previous = self.state
+        position = {key: i for i, key in enumerate(keys)}
+        full = (
+            previous is None
+            or previous.get("groupings") != groupings
+            or any(key not in position for key in previous["rows"])
+        )
+
+        old_idx = [] if full else [position[k] for k in previous["rows"]]
+        old_keys = set() if full else set(previous["rows"])
+        new_idx = [i for i, key in enumerate(keys) if key not in old_keys]
+
+        revised, appended, removed = [], [], []
+        if not full:
+            removed = sorted(set(previous.get("columns", {})) - set(columns))
+        for col in columns:
+            values = df[col].to_numpy(dtype=float, na_value=np.nan)
+            digests[col] = array_digest(values)
+            if full:
+                continue
+            old_digest = array_digest(values[old_idx])
+            if previous.get("columns", {}).get(col) != old_digest:
+                revised.append(col)
+            if new_idx and not np.isnan(values[new_idx]).all():
+                appended.append(col)
+
+        if full:
+            self.plan_ = RefreshPlan(True, keys, columns)
+        else:
+            self.plan_ = RefreshPlan(
+                False, [keys[i] for i in new_idx], revised, appended, removed
+            )
+        return self.plan_
+
+    def totals(self, name, df, cluster_map):
+        """Cluster totals for ``df``, recomputing only changed series."""
+        plan = self.plan_
+        previous = self.saved_totals.get(name)
+        if plan is None or plan.full or previous is None:
+            totals = cluster_totals(build_fact_table(df, cluster_map))
+        else:
+            cluster_of = {
+                airline: cluster
+                for cluster, airlines in cluster_map.items()
+                for airline in airlines
+            }
+            affected = {
+                (cluster_of[airline], metric)
+                for airline, metric in plan.changed
+                if airline in cluster_of
+            }
+            dates = frame_dates(df).unique().sort_values().rename("date")
+            totals = previous.reindex(dates, fill_value=0)
+            if affected:
+                clusters = {cluster for cluster, _ in affected}
+                metrics = tuple(
+                    m for m in METRICS if any(m == a for _, a in affected)
+                )
+                fresh = cluster_totals(
+                    build_fact_table(
+                        df,
+                        {c: cluster_map[c] for c in clusters},
+                        metrics=metrics,
+                    )
+                )
+                for key in affected:
+                    totals[key] = fresh[key].reindex(dates, fill_value=0)
+        self._next_totals[name] = totals
+        return totals
+
+    def forecasts(
+        self,
+        series_by_key,
+        forecaster,
+        horizon,
+        n_workers=None,
+        seed=0,
+        configs=None,
+    ):
+        """Forecast results, refitting only series whose data or model
+        configuration changed."""
+        previous = self.state or {}
+        same_setup = (
+            previous.get("horizon") == horizon and previous.get("seed") == seed
+        )
+        configs = configs or {}
+        digests = {}
+        used_configs = {}
+        stale = {}
+        start_params = {}
+        for key, series in series_by_key.items():
+            name = "|".join(map(str, key))
+            used_configs[name] = configs.get(key)
+            digests[name] = series_digest(series)
+            # Parameters only fit the model layout they were fitted with.
+            same_model = (
+                previous.get("configs", {}).get(name) == used_configs[name]
+            )
+            cached = (
+                same_setup
+                and same_model
+                and key in self.saved_forecasts
+                and previous.get("series", {}).get(name) == digests[name]
+            )
+            if not cached:
+                stale[key] = series
+                if same_model and name in previous.get("params", {}):
+                    start_params[key] = previous["params"][name]
+
+        fresh = run_forecasts(
+            stale,
+            forecaster,
+            horizon=horizon,
+            n_workers=n_workers,
+            seed=seed,
+            start_params=start_params,
+            configs={key: configs[key] for key in stale if key in configs},
+        )
+        results = {
+            key: fresh[key] if key in fresh else self.saved_forecasts[key]
+            for key in series_by_key
+        }
+        self._next.update(
+            horizon=horizon,
+            seed=seed,
+            series=digests,
+            configs=used_configs,
+            params={
+                "|".join(map(str, key)): result["Params"]
+                for key, result in results.items()
+            },
+        )
+        self.saved_forecasts = results
+        self.refitted = list(fresh)
+        return results
+
+    def save(self):
+        os.makedirs(self.state_dir, exist_ok=True)
+        totals = {**self.saved_totals, **self._next_totals}
+        pd.to_pickle(totals, self._path(TOTALS_FILE))
+        pd.to_pickle(self.saved_forecasts, self._path(FORECASTS_FILE))
+        state = {**(self.state or {}), **self._next}
+        with open(self._path(STATE_FILE), "w") as fh:
+            json.dump(state, fh)
+        self.state = state
+        self.saved_totals = totals
+        self._next = {}
+        self._next_totals = {}
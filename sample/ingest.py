@@ -0,0 +1,150 @@
+import pandas as pd
+from sample.catalog import METRICS
+
+# Carrier codes as reported in UNIQUE_CARRIER, mapped to the airline names
+# used in the workbook's column headers (including its HAWAIIN spelling).
+CARRIER_CODES = {
+    "AA": "AMERICAN",
+    "DL": "DELTA",
+    "UA": "UNITED",
+    "WN": "SOUTHWEST",
+    "AS": "ALASKA",
+    "F9": "FRONTIER",
+    "G4": "ALLEGIANT",
+    "NK": "SPIRIT",
+    "B6": "JETBLUE",
+    "SY": "SUN_COUNTRY",
+    "HA": "HAWAIIN",
+    "OO": "SKYWEST",
+}
+
+# Value columns taken from each extract and the metric they feed.
+SOURCES = {
+    "t100": {"PASSENGERS": "PASSENGER"},
+    "form41": {"OP_REVENUES": "OPERATING_REVENUE", "NET_INCOME": "NET_INCOME"},
+}
+
+CARRIER_FIELDS = ("UNIQUE_CARRIER", "CARRIER", "OP_UNIQUE_CARRIER")
+KEYS = ["airline", "Year", "Quarter"]
+
+
+def _header(path):
+    """Maps normalised (upper-case, unquoted) header names to the raw ones."""
+    raw = pd.read_csv(path, nrows=0).columns
+    return {str(col).strip().strip('"').upper(): col for col in raw}
+
+
+def _pick(header, candidates, path):
+    for name in candidates:
+        if name in header:
+            return header[name]
+    raise ValueError(f"{path} has none of the columns {list(candidates)}")
+
+
+def read_extract(path, value_columns, carriers=None, chunksize=500_000):
+    """Sums one BTS extract to (airline, Year, Quarter) totals.
+
+    The file is read ``chunksize`` rows at a time and only the carrier,
+    period and value columns are parsed, so memory stays bounded by the
+    chunk plus the (small) running totals. Rows for carriers outside
+    ``carriers`` are dropped. Quarters come from QUARTER, or from MONTH
+    for monthly extracts.
+    """
+    carriers = CARRIER_CODES if carriers is None else carriers
+    header = _header(path)
+    carrier_col = _pick(header, CARRIER_FIELDS, path)
+    year_col = _pick(header, ("YEAR",), path)
+    if "QUARTER" in header:
+        period_col, monthly = header["QUARTER"], False
+    else:
+        period_col, monthly = _pick(header, ("MONTH",), path), True
+    values = {
+        _pick(header, (col,), path): m for col, m in value_columns.items()
+    }
+
+    totals = None
+    reader = pd.read_csv(
+        path,
+        usecols=[carrier_col, year_col, period_col, *values],
+        dtype={carrier_col: str},
+        chunksize=chunksize,
+    )
+    for chunk in reader:
+        airline = chunk[carrier_col].str.strip().map(carriers)
+        keep = airline.notna()
+        if not keep.any():
+            continue
+        period = chunk.loc[keep, period_col].astype(int)
+        if monthly:
+            period = (period - 1) // 3 + 1
+        part = (
+            chunk.loc[keep, list(values)]
+            .rename(columns=values)
+            .apply(pd.to_numeric, errors="coerce")
+            .groupby(
+                [
+                    airline[keep],
+                    chunk.loc[keep, year_col].astype(int),
+                    "Q" + period.astype(str),
+                ]
+            )
+            .sum(min_count=1)
+        )
+        part.index.names = KEYS
+        totals = part if totals is None else totals.add(part, fill_value=0)
+
+    if totals is None:
+        index = pd.MultiIndex.from_arrays([[], [], []], names=KEYS)
+        return pd.DataFrame(columns=list(values.values()), index=index)
+    return totals
+
+
+def to_wide(totals):
+    """Pivots (airline, Year, Quarter) totals into the workbook layout:
+    Year, Quarter and one ``<AIRLINE>_<METRIC>`` column per pair."""
+    wide = totals.unstack("airline").sort_index()
+    airlines = [
+        a for a in CARRIER_CODES.values() if a in wide.columns.levels[1]
+    ]
+    airlines += sorted(set(wide.columns.levels[1]) - set(airlines))
+    columns = [
+        (metric, airline)
+        for airline in airlines
+        for metric in METRICS
+        if (metric, airline) in wide.columns
+    ]
+    wide = wide[columns]
+    wide.columns = [f"{airline}_{metric}" for metric, airline in columns]
+    return wide.reset_index()
+
+
+def ingest(
+    t100_paths=(),
+    form41_paths=(),
+    carriers=None,
+    chunksize=500_000,
+    output=None,
+):
+    """Builds the quarterly per-airline table from raw BTS extracts.
+
+    ``t100_paths`` are T-100 segment (or market) CSVs supplying
+    PASSENGERS, ``form41_paths`` are Form 41 Schedule P-1.2 CSVs supplying
+    OP_REVENUES and NET_INCOME. Zipped or gzipped CSVs work as well. The
+    result has the same Year/Quarter/<AIRLINE>_<METRIC> columns as the
+    workbook; ``output`` optionally saves it as .xlsx for load_dataset.
+    """
+    parts = [
+        read_extract(path, SOURCES[kind], carriers, chunksize)
+        for kind, paths in (("t100", t100_paths), ("form41", form41_paths))
+        for path in ([paths] if isinstance(paths, str) else paths)
+    ]
+    if not parts:
+        raise ValueError("No BTS extracts given")
+
+    totals = parts[0]
+    for part in parts[1:]:
+        totals = totals.add(part, fill_value=0)
+    wide = to_wide(totals)
+    if output is not None:
+        wide.to_excel(output, index=False)
+    return wide
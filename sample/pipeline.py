@@ -0,0 +1,160 @@
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+from sample.export import (
+    chart_filename,
+    ensure_plotlyjs,
+    figure_title,
+    render_mode,
+    resolve_output,
+    write_figure,
+)
+from sample.profiling import stage
+
+EXECUTORS = {"thread": ThreadPoolExecutor, "process": ProcessPoolExecutor}
+REPORT_COLUMNS = [
+    "chart",
+    "path",
+    "build_seconds",
+    "write_seconds",
+    "payload_bytes",
+]
+
+
+def _build_chart(func, args, kwargs):
+    start = time.perf_counter()
+    with stage(f"plot.{func.__name__}"):
+        fig = func(*args, **kwargs)
+    return fig, time.perf_counter() - start
+
+
+def _claim(claims, name, fmt):
+    """Reserves ``name``'s file for this run; a second claim is an error."""
+    path = os.path.join(claims, chart_filename(name, fmt))
+    try:
+        os.close(os.open(path, os.O_CREAT | os.O_EXCL))
+    except FileExistsError:
+        raise ValueError(f"Duplicate chart name {name!r}") from None
+
+
+def _write_chart(name, fig, build_seconds, output_dir, fmt):
+    start = time.perf_counter()
+    path = write_figure(fig, name, output_dir, fmt)
+    return {
+        "chart": name,
+        "path": path,
+        "build_seconds": build_seconds,
+        "write_seconds": time.perf_counter() - start,
+        "payload_bytes": os.path.getsize(path),
+    }
+
+
+def _process_task(task):
+    """Builds and writes one chart inside a worker process."""
+    name, func, args, kwargs, output_dir, fmt, claims = task
+    with render_mode("export-only"):
+        fig, build_seconds = _build_chart(func, args, kwargs)
+    if fig is None:
+        return None
+    name = name or figure_title(fig)
+    _claim(claims, name, fmt)
+    return _write_chart(name, fig, build_seconds, output_dir, fmt)
+
+
+class ExportPipeline:
+    """Collects plot_* calls and builds/writes their charts concurrently.
+
+    Each task is a figure-returning function plus its arguments. Figures are
+    built with rendering switched to export-only and written by a bounded
+    pool. File names come from the task name (or the figure title), so
+    they are the same whatever order the workers finish in. Two charts
+    resolving to the same file raise ValueError instead of racing to
+    write it.
+
+    The thread executor builds figures in the calling process and keeps
+    them in ``figures``. The process executor builds and writes each chart
+    in a worker, which parallelises figure construction too but only
+    returns timings.
+    """
+
+    def __init__(
+        self, output_dir=None, fmt=None, max_workers=4, executor="thread"
+    ):
+        if executor not in EXECUTORS:
+            raise ValueError(f"Unknown executor {executor!r}")
+        self.output_dir, self.fmt = resolve_output(output_dir, fmt)
+        self.max_workers = max_workers
+        self.executor = executor
+        self.tasks = []
+        self.figures = []
+        self.report = None
+
+    def add(self, func, *args, name=None, **kwargs):
+        if name is not None and name in [t[0] for t in self.tasks]:
+            raise ValueError(f"Duplicate chart name {name!r}")
+        self.tasks.append((name, func, args, kwargs))
+        return self
+
+    def build(self):
+        """Calls every task in order under the current render mode."""
+        self.figures = [
+            _build_chart(func, args, kwargs)[0]
+            for _, func, args, kwargs in self.tasks
+        ]
+        return self.figures
+
+    def run(self):
+        """Builds and writes every chart; returns per-chart timings and
+        the size of each written file."""
+        if self.fmt == "html":
+            ensure_plotlyjs(self.output_dir)
+
+        with tempfile.TemporaryDirectory() as claims:
+            if self.executor == "process":
+                tasks = [
+                    task + (self.output_dir, self.fmt, claims)
+                    for task in self.tasks
+                ]
+                with ProcessPoolExecutor(self.max_workers) as pool:
+                    rows = list(pool.map(_process_task, tasks))
+                self.figures = []
+            else:
+                rows = self._run_threaded(claims)
+
+        self.report = pd.DataFrame(
+            [row for row in rows if row is not None],
+            columns=REPORT_COLUMNS,
+        )
+        return self.report
+
+    def _run_threaded(self, claims):
+        with render_mode("export-only"):
+            built = [
+                _build_chart(func, args, kwargs)
+                for _, func, args, kwargs in self.tasks
+            ]
+        self.figures = [fig for fig, _ in built if fig is not None]
+        charts = [
+            (name or figure_title(fig), fig, seconds)
+            for (name, *_), (fig, seconds) in zip(self.tasks, built)
+            if fig is not None
+        ]
+        for name, *_ in charts:
+            _claim(claims, name, self.fmt)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [
+                pool.submit(
+                    _write_chart,
+                    name,
+                    fig,
+                    seconds,
+                    self.output_dir,
+                    self.fmt,
+                )
+                for name, fig, seconds in charts
+            ]
+            return [future.result() for future in futures]
@@ -0,0 +1,209 @@
+import cProfile
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+TRUTHY = ("1", "true", "yes", "on")
+REPORT_COLUMNS = ["stage", "count", "wall_seconds", "cpu_seconds", "peak_mb"]
+
+_settings = {
+    "enabled": os.environ.get("AIRLINE_PROFILE", "").lower() in TRUTHY,
+    "memory": os.environ.get("AIRLINE_PROFILE_MEMORY", "1").lower() in TRUTHY,
+    "profile_stage": os.environ.get("AIRLINE_PROFILE_STAGE") or None,
+}
+_stats = {}
+_lock = threading.Lock()
+_local = threading.local()
+_profile = {"profiler": None, "active": False}
+_tracing = {"stages": 0, "owned": False}
+
+
+def configure_profiling(enabled=None, memory=None, profile_stage=None):
+    """Turns stage timing on or off (also AIRLINE_PROFILE=1).
+
+    ``memory`` tracks peak allocations per stage with tracemalloc, which
+    slows allocation-heavy code, so it can be switched off
+    (AIRLINE_PROFILE_MEMORY=0). ``profile_stage`` names one stage to run
+    under cProfile (AIRLINE_PROFILE_STAGE).
+    """
+    if enabled is not None:
+        _settings["enabled"] = enabled
+    if memory is not None:
+        _settings["memory"] = memory
+    if profile_stage is not None:
+        _settings["profile_stage"] = profile_stage or None
+
+
+def profiling_enabled():
+    return _settings["enabled"]
+
+
+def reset():
+    """Clears collected stage statistics and the stage profile."""
+    with _lock:
+        _stats.clear()
+    _profile["profiler"] = None
+
+
+def _memory_stack():
+    if not hasattr(_local, "memory"):
+        _local.memory = []
+    return _local.memory
+
+
+def _enter_memory():
+    with _lock:
+        if _tracing["stages"] == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing["owned"] = True
+        _tracing["stages"] += 1
+    current, peak = tracemalloc.get_traced_memory()
+    stack = _memory_stack()
+    if stack:
+        # Keep the enclosing stage's peak before resetting the counter.
+        stack[-1] = max(stack[-1], peak)
+    tracemalloc.reset_peak()
+    stack.append(current)
+    return current
+
+
+def _exit_memory(start):
+    _, peak = tracemalloc.get_traced_memory()
+    stack = _memory_stack()
+    peak = max(peak, stack.pop())
+    if stack:
+        stack[-1] = max(stack[-1], peak)
+    with _lock:
+        _tracing["stages"] -= 1
+        if _tracing["stages"] == 0 and _tracing["owned"]:
+            # Tracing slows every allocation; only keep it on inside stages.
+            tracemalloc.stop()
+            _tracing["owned"] = False
+    return max(peak - start, 0)
+
+
+def _start_profile(name):
+    if name != _settings["profile_stage"] or _profile["active"]:
+        return None
+    if _profile["profiler"] is None:
+        _profile["profiler"] = cProfile.Profile()
+    _profile["active"] = True
+    _profile["profiler"].enable()
+    return _profile["profiler"]
+
+
+def _stop_profile(profiler):
+    if profiler is not None:
+        profiler.disable()
+        _profile["active"] = False
+
+
+def _record(name, wall, cpu, peak):
+    with _lock:
+        entry = _stats.setdefault(
+            name,
+            {"count": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "peak": 0},
+        )
+        entry["count"] += 1
+        entry["wall_seconds"] += wall
+        entry["cpu_seconds"] += cpu
+        entry["peak"] = max(entry["peak"], peak)
+
+
+@contextmanager
+def stage(name):
+    """Times the enclosed block as ``name``: call count, wall and CPU
+    seconds (of the calling thread) and peak traced memory.
+
+    When profiling is off this only checks a flag. Stages run inside
+    worker processes are not collected, and memory peaks are process-wide,
+    so they are approximate for stages running in parallel threads.
+    """
+    if not _settings["enabled"]:
+        yield
+        return
+
+    memory = _settings["memory"]
+    start_bytes = _enter_memory() if memory else 0
+    profiler = _start_profile(name)
+    wall, cpu = time.perf_counter(), time.thread_time()
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - wall
+        cpu = time.thread_time() - cpu
+        _stop_profile(profiler)
+        peak = _exit_memory(start_bytes) if memory else 0
+        _record(name, wall, cpu, peak)
+
+
+def profiled(name=None):
+    """Decorator form of ``stage``; the stage defaults to the function's
+    qualified name."""
+
+    def decorate(func):
+        label = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _settings["enabled"]:
+                return func(*args, **kwargs)
+            with stage(label):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    if callable(name):
+        func, name = name, None
+        return decorate(func)
+    return decorate
+
+
+def report():
+    """Collected statistics, slowest stage first."""
+    with _lock:
+        rows = [
+            {
+                "stage": name,
+                "count": entry["count"],
+                "wall_seconds": entry["wall_seconds"],
+                "cpu_seconds": entry["cpu_seconds"],
+                "peak_mb": entry["peak"] / 2**20,
+            }
+            for name, entry in _stats.items()
+        ]
+    frame = pd.DataFrame(rows, columns=REPORT_COLUMNS)
+    return frame.sort_values(
+        "wall_seconds", ascending=False, ignore_index=True
+    )
+
+
+def write_report(path):
+    """Writes the report as .json or .csv (by extension). A cProfile of
+    the chosen stage, if one ran, goes next to it as ``<stage>.pstats``.
+    Returns the paths written."""
+    frame = report()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if path.endswith(".json"):
+        with open(path, "w") as fh:
+            json.dump(frame.to_dict(orient="records"), fh, indent=2)
+    elif path.endswith(".csv"):
+        frame.to_csv(path, index=False)
+    else:
+        raise ValueError("Profile report must be a .json or .csv path")
+
+    paths = [path]
+    if _profile["profiler"] is not None:
+        stage_name = _settings["profile_stage"].replace(":", "-")
+        pstats_path = os.path.join(
+            os.path.dirname(path) or ".", f"{stage_name}.pstats"
+        )
+        _profile["profiler"].dump_stats(pstats_path)
+        paths.append(pstats_path)
+    return paths
@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+from sample.cache import ResultCache, content_hash
+from sample.catalog import ColumnCatalog
+from sample.scoring import combine, normalize
+
+# Score metrics in output column order.
+SCORE_METRICS = {
+    "Revenue": "OPERATING_REVENUE",
+    "Net Income": "NET_INCOME",
+    "Passengers": "PASSENGER",
+}
+
+
+def _score_columns(df):
+    """Airlines with every score metric and their columns, metric-major."""
+    catalog = ColumnCatalog.for_frame(df)
+    airlines = catalog.complete_airlines(SCORE_METRICS.values())
+    columns = [
+        catalog.get(airline, metric)
+        for metric in SCORE_METRICS.values()
+        for airline in airlines
+    ]
+    return airlines, columns
+
+
+class PerformanceIndex:
+    """Prefix sums of yearly revenue, net income and passengers.
+
+    ``prefix[k]`` holds the totals of every (metric, airline) for all years
+    before ``first_year + k``, so the total over any [start, end] window is
+    one subtraction and scoring a window costs O(airlines) with no
+    DataFrame filtering.
+    """
+
+    def __init__(self, df):
+        self.airlines, columns = _score_columns(df)
+
+        yearly = df.groupby("Year")[columns].sum()
+        self.first_year = int(yearly.index.min())
+        self.last_year = int(yearly.index.max())
+        yearly = yearly.reindex(
+            range(self.first_year, self.last_year + 1), fill_value=0
+        )
+        values = yearly.to_numpy(dtype=float).reshape(
+            len(yearly), len(SCORE_METRICS), len(self.airlines)
+        )
+        self.prefix = np.concatenate(
+            [np.zeros((1,) + values.shape[1:]), np.cumsum(values, axis=0)]
+        )
+
+    def _bounds(self, years):
+        return np.clip(
+            np.asarray(years) - self.first_year, 0, len(self.prefix) - 1
+        )
+
+    def window_sums(self, starts, ends):
+        """(windows, metrics, airlines) totals for inclusive year windows."""
+        lo = self._bounds(starts)
+        hi = self._bounds(np.asarray(ends) + 1)
+        return self.prefix[hi] - self.prefix[lo]
+
+    def score_windows(self, windows, weights=None):
+        """Scores every (start_year, end_year) window in one pass.
+
+        Returns a long frame with one row per (window, airline): the raw
+        totals, their min-max normalised values (0 where every airline
+        ties) and the ``weights``-weighted mean of those, equal by default,
+        as ``Performance Score``.
+        """
+        windows = np.asarray(windows, dtype=int).reshape(-1, 2)
+        sums = self.window_sums(windows[:, 0], windows[:, 1])
+        norm = normalize(sums, axis=2)
+        score = combine(norm, weights, axis=1)
+
+        n_windows, n_airlines = len(windows), len(self.airlines)
+        frame = {
+            "Start Year": np.repeat(windows[:, 0], n_airlines),
+            "End Year": np.repeat(windows[:, 1], n_airlines),
+            "Airline": np.tile(self.airlines, n_windows),
+        }
+        for m, label in enumerate(SCORE_METRICS):
+            frame[label] = sums[:, m, :].ravel()
+        for m, label in enumerate(SCORE_METRICS):
+            frame[f"{label} (Norm)"] = norm[:, m, :].ravel()
+        frame["Performance Score"] = score.ravel()
+        return pd.DataFrame(frame)
+
+    def score(self, start_year, end_year, weights=None):
+        """Ranked scores for one window, as test_airline_performance_by_range
+        returns them."""
+        scores = self.score_windows([(start_year, end_year)], weights)
+        return (
+            scores.drop(columns=["Start Year", "End Year"])
+            .sort_values(by="Performance Score", ascending=False)
+            .reset_index(drop=True)
+        )
+
+
+def rolling_windows(length, first_year=2003, last_year=2023):
+    """Every ``length``-year window between the two years, inclusive."""
+    starts = np.arange(first_year, last_year - length + 2)
+    return np.column_stack([starts, starts + length - 1])
+
+
+# PerformanceIndex per frame contents, in memory only.
+_indexes = ResultCache(maxsize=16)
+
+
+def performance_index(df):
+    """The shared PerformanceIndex of ``df``'s current contents.
+
+    Indexes are keyed by a hash of the Year and score columns only, so a
+    repeat query skips the rest of the frame, and a frame changed in
+    place gets a fresh index.
+    """
+    _, columns = _score_columns(df)
+    key = content_hash(
+        "performance_index",
+        columns,
+        *(df[col].to_numpy() for col in ["Year", *columns]),
+    )
+    found, index = _indexes.get(key)
+    if not found:
+        index = PerformanceIndex(df)
+        _indexes.put(key, index)
+    return index
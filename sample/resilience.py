@@ -0,0 +1,101 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+from sample.catalog import ColumnCatalog
+
+
+class ResilienceEngine:
+    """Recovery rates for many groups and many (pre-crisis, recovery) year
+    pairs from one year-indexed array.
+
+    ``groups`` maps a label to the columns summed into that group. Group
+    totals are built with one matrix product, averaged per year in one
+    scatter-add, and every rate afterwards is an array lookup.
+    """
+
+    def __init__(self, df, groups):
+        self.labels = list(groups)
+        columns = list(
+            dict.fromkeys(c for cols in groups.values() for c in cols)
+        )
+        position = {col: i for i, col in enumerate(columns)}
+        membership = np.zeros((len(columns), len(self.labels)))
+        for g, cols in enumerate(groups.values()):
+            membership[[position[c] for c in cols], g] = 1
+
+        values = df[columns].to_numpy(dtype=float)
+        present = ~np.isnan(values)
+        totals = np.where(present, values, 0) @ membership
+        # Like sum(axis=1, min_count=1): a row with no data is missing.
+        reported = (present @ membership) > 0
+
+        years = df["Year"].to_numpy(dtype=int)
+        self.first_year = int(years.min())
+        n_years = int(years.max()) - self.first_year + 1
+        year_idx = years - self.first_year
+        sums = np.zeros((n_years, len(self.labels)))
+        counts = np.zeros((n_years, len(self.labels)))
+        np.add.at(sums, year_idx, np.where(reported, totals, 0))
+        np.add.at(counts, year_idx, reported)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.yearly_mean = sums / counts
+
+    @classmethod
+    def for_groupings(cls, df, groupings, metric="NET_INCOME"):
+        """Builds groups from ``{grouping: {group: [airlines]}}``; labels
+        become ``(grouping, group)``."""
+        catalog = ColumnCatalog.for_frame(df)
+        groups = {
+            (name, group): catalog.columns(airlines, metric)
+            for name, grouping in groupings.items()
+            for group, airlines in grouping.items()
+        }
+        return cls(df, groups)
+
+    def _year_values(self, years):
+        idx = np.asarray(years, dtype=int) - self.first_year
+        inside = (idx >= 0) & (idx < len(self.yearly_mean))
+        values = self.yearly_mean[np.clip(idx, 0, len(self.yearly_mean) - 1)]
+        return np.where(inside[:, None], values, np.nan)
+
+    def recovery_rates(self, pairs):
+        """Percentage change of the yearly mean from each pre-crisis year to
+        its recovery year; rows are pairs, columns are group labels."""
+        pairs = np.asarray(pairs, dtype=int).reshape(-1, 2)
+        pre = self._year_values(pairs[:, 0])
+        post = self._year_values(pairs[:, 1])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rates = (post - pre) / pre * 100
+        index = pd.MultiIndex.from_arrays(
+            [pairs[:, 0], pairs[:, 1]], names=["Pre Year", "Recovery Year"]
+        )
+        return pd.DataFrame(
+            rates,
+            index=index,
+            columns=pd.Index(self.labels, tupleize_cols=False),
+        )
+
+    def sweep(self, pre_years, recovery_years):
+        """Tidy rates for every pre-crisis year before every recovery year."""
+        pairs = [
+            (pre, post)
+            for pre, post in itertools.product(pre_years, recovery_years)
+            if pre < post
+        ]
+        rates = self.recovery_rates(pairs)
+        n_groups = len(self.labels)
+        group = np.empty(len(pairs) * n_groups, dtype=object)
+        group[:] = self.labels * len(pairs)
+        return pd.DataFrame(
+            {
+                "Pre Year": np.repeat(
+                    rates.index.get_level_values(0), n_groups
+                ),
+                "Recovery Year": np.repeat(
+                    rates.index.get_level_values(1), n_groups
+                ),
+                "Group": group,
+                "Recovery Rate": rates.to_numpy().ravel(),
+            }
+        )
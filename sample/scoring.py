@@ -0,0 +1,79 @@
+import warnings
+
+import numpy as np
+
+METHODS = ("minmax", "zscore", "robust")
+
+
+def _centre_and_scale(values, method, axis):
+    """Per-slice (centre, scale) of ``method``, ignoring NaN."""
+    if method == "minmax":
+        low = np.nanmin(values, axis=axis, keepdims=True)
+        return low, np.nanmax(values, axis=axis, keepdims=True) - low
+    if method == "zscore":
+        return (
+            np.nanmean(values, axis=axis, keepdims=True),
+            np.nanstd(values, axis=axis, keepdims=True),
+        )
+    if method == "robust":
+        q1, median, q3 = np.nanpercentile(
+            values, [25, 50, 75], axis=axis, keepdims=True
+        )
+        return median, q3 - q1
+    raise ValueError(f"method must be one of {', '.join(METHODS)}")
+
+
+def normalize(values, method="minmax", axis=0, out=None):
+    """Normalises every slice of ``values`` along ``axis`` at once.
+
+    ``minmax`` maps each slice onto [0, 1], ``zscore`` subtracts the mean
+    and divides by the standard deviation, ``robust`` subtracts the median
+    and divides by the interquartile range. NaN is ignored by the
+    reductions and stays NaN; slices with no spread normalise to 0.
+    Pass ``out=values`` (a float array) to normalise in place.
+    """
+    values = np.asarray(values, dtype=float)
+    with warnings.catch_warnings():
+        # All-NaN slices: their statistics are NaN and so is the result.
+        warnings.simplefilter("ignore", RuntimeWarning)
+        centre, scale = _centre_and_scale(values, method, axis)
+    # A constant slice is all zeros once centred; dividing by 1 keeps it.
+    scale[scale == 0] = 1
+    out = np.subtract(values, centre, out=out)
+    return np.divide(out, scale, out=out)
+
+
+def combine(normalized, weights=None, axis=1):
+    """Weighted mean of normalised metrics along ``axis``.
+
+    Missing (NaN) metrics drop out of each mean and the remaining weights
+    are rescaled; rows with no metric at all score NaN. ``weights``
+    default to equal.
+    """
+    normalized = np.asarray(normalized, dtype=float)
+    n_metrics = normalized.shape[axis]
+    weights = np.ones(n_metrics) if weights is None else weights
+    weights = np.asarray(weights, dtype=float)
+    if weights.shape != (n_metrics,):
+        raise ValueError(f"Expected {n_metrics} weights, got {weights.size}")
+    shape = [1] * normalized.ndim
+    shape[axis] = n_metrics
+    weights = weights.reshape(shape)
+
+    valid = ~np.isnan(normalized)
+    total = np.where(valid, normalized, 0) * weights
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return total.sum(axis=axis) / (valid * weights).sum(axis=axis)
+
+
+def composite_score(values, weights=None, method="minmax", axis=0):
+    """Normalises each metric across ``axis`` and combines them.
+
+    ``values`` is a (rows, metrics) block, e.g. airlines by metrics when
+    ``axis`` is 0. Returns the normalised block and one score per row.
+    """
+    values = np.asarray(values, dtype=float)
+    if values.ndim != 2:
+        raise ValueError("composite_score expects a 2-D (rows, metrics) block")
+    normalized = normalize(values, method, axis=axis)
+    return normalized, combine(normalized, weights, axis=1 - axis)
@@ -0,0 +1,263 @@
+import itertools
+import math
+import os
+
+import numpy as np
+import pandas as pd
+from sample.backtest import rolling_origins
+from sample.cache import ResultCache, content_hash
+from sample.choices import CRITERIA
+from sample.forecasting import parallel_map
+from sample.lazy import lazy_import
+
+hw = lazy_import("statsmodels.tsa.holtwinters")
+
+SEASONAL_PERIODS = 4
+
+# (trend, damped_trend) pairs; a damped trend needs a trend to damp.
+TRENDS = ((None, False), ("add", False), ("add", True))
+SEASONALS = (None, "add", "mul")
+
+# Candidates this far above the best quick-fit AIC have essentially no
+# support and are not refitted.
+AIC_GAP = 10.0
+
+# In memory unless AIRLINE_SELECTION_CACHE names a directory for them.
+selection_cache = ResultCache(
+    directory=os.environ.get("AIRLINE_SELECTION_CACHE")
+)
+
+
+def candidate_configs(series):
+    """Every trend/damping/seasonal/Box-Cox combination the series
+    supports; multiplicative seasonality and Box-Cox need positive data."""
+    positive = bool((np.asarray(series, dtype=float) > 0).all())
+    return [
+        {
+            "trend": trend,
+            "damped_trend": damped,
+            "seasonal": seasonal,
+            "use_boxcox": boxcox,
+        }
+        for (trend, damped), seasonal, boxcox in itertools.product(
+            TRENDS, SEASONALS, (False, True)
+        )
+        if positive or (seasonal != "mul" and not boxcox)
+    ]
+
+
+def config_name(config):
+    """Short label such as ``Ad,M,bc`` (trend, seasonal, Box-Cox)."""
+    trend = {None: "N", "add": "A"}[config["trend"]]
+    trend += "d" if config["damped_trend"] else ""
+    seasonal = {None: "N", "add": "A", "mul": "M"}[config["seasonal"]]
+    return ",".join([trend, seasonal] + ["bc"] * config["use_boxcox"])
+
+
+def n_params(config):
+    """Estimated parameters: smoothing, damping, initial states, lambda."""
+    k = 2
+    if config["trend"]:
+        k += 2 + config["damped_trend"]
+    if config["seasonal"]:
+        k += 1 + SEASONAL_PERIODS
+    return k + config["use_boxcox"]
+
+
+def fit_config(series, config, steps=16, use_brute=True):
+    """Fits one configuration; returns (fitted, forecast, model_fit)."""
+    model = hw.ExponentialSmoothing(
+        series,
+        trend=config["trend"],
+        damped_trend=config["damped_trend"],
+        seasonal=config["seasonal"],
+        seasonal_periods=SEASONAL_PERIODS if config["seasonal"] else None,
+        use_boxcox=config["use_boxcox"],
+    )
+    model_fit = model.fit(optimized=True, use_brute=use_brute)
+    return model_fit.fittedvalues, model_fit.forecast(steps), model_fit
+
+
+def aic(series, fitted, config):
+    """AIC from original-scale residuals, so Box-Cox fits compare fairly
+    with untransformed ones."""
+    resid = np.asarray(series, dtype=float) - np.asarray(fitted, dtype=float)
+    n = len(resid)
+    return n * np.log(np.sum(resid**2) / n) + 2 * n_params(config)
+
+
+def _aic_task(task):
+    series, config, use_brute = task
+    try:
+        fitted, _, _ = fit_config(series, config, 1, use_brute=use_brute)
+    except (ValueError, np.linalg.LinAlgError):
+        return np.inf
+    score = aic(series, fitted, config)
+    return score if np.isfinite(score) else np.inf
+
+
+def _backtest_task(task):
+    """Mean absolute error over the given folds and horizons."""
+    series, config, folds, horizon = task
+    errors = []
+    for start, origin in folds:
+        try:
+            _, forecast, _ = fit_config(
+                series.iloc[start:origin], config, horizon, use_brute=False
+            )
+        except (ValueError, np.linalg.LinAlgError):
+            return np.inf
+        actual = series.iloc[origin : origin + horizon].to_numpy(dtype=float)
+        errors.append(np.abs(actual - forecast.to_numpy()[: len(actual)]))
+    score = float(np.mean(np.concatenate(errors)))
+    return score if np.isfinite(score) else np.inf
+
+
+def _prune(scores, margin):
+    """Survivors of one round: at most the better half, and only those
+    within ``margin`` (relative) of the best score."""
+    finite = {name: s for name, s in scores.items() if np.isfinite(s)}
+    if not finite:
+        return list(scores)[:1]
+    best = min(finite.values())
+    ranked = sorted(finite, key=finite.get)[: math.ceil(len(finite) / 2)]
+    return [
+        name for name in ranked if finite[name] <= best + margin * abs(best)
+    ]
+
+
+def _call(task):
+    func, args = task
+    return func(args)
+
+
+def select_model(
+    series,
+    criterion="aic",
+    horizon=4,
+    initial=None,
+    rounds=3,
+    margin=0.25,
+    n_workers=None,
+    cache=None,
+):
+    """Chooses a smoothing configuration for ``series``.
+
+    ``criterion="aic"`` first fits every candidate quickly (no grid
+    search), drops the clearly worse ones and refits only the survivors
+    properly. ``criterion="backtest"`` scores candidates by rolling-origin
+    MAE using successive halving: each round adds more (earlier) folds
+    and keeps only the better half of the candidates that are within
+    ``margin`` of the best. Candidates in a round are fitted in parallel.
+
+    The choice is cached (in ``selection_cache`` by default, on disk when
+    AIRLINE_SELECTION_CACHE is set) under a hash of the series' contents
+    and the search settings, so later runs skip the search until the data
+    changes. Returns a dict with the chosen ``config``, its ``name`` and a
+    ``scores`` table of every round.
+    """
+    return select_models(
+        {None: series},
+        criterion,
+        horizon,
+        initial,
+        rounds,
+        margin,
+        n_workers,
+        cache,
+    )[None]
+
+
+def select_models(
+    series_by_key,
+    criterion="aic",
+    horizon=4,
+    initial=None,
+    rounds=3,
+    margin=0.25,
+    n_workers=None,
+    cache=None,
+):
+    """select_model for every series in ``series_by_key``, by key.
+
+    The searches advance in lockstep, so each round fits the candidates
+    of every series still searching in one pool.
+    """
+    if criterion not in CRITERIA:
+        raise ValueError(f"criterion must be one of {CRITERIA}")
+    store = cache or selection_cache
+    selections, searches = {}, {}
+    for key, series in series_by_key.items():
+        cache_key = content_hash(
+            "select_model", series, criterion, horizon, initial, rounds, margin
+        )
+        found, selections[key] = store.get(cache_key)
+        if not found:
+            search = _search(
+                series, criterion, horizon, initial, rounds, margin
+            )
+            searches[key] = (cache_key, search)
+
+    pending = {key: next(search) for key, (_, search) in searches.items()}
+    while pending:
+        scores = iter(
+            parallel_map(
+                _call,
+                [
+                    (func, args)
+                    for func, tasks in pending.values()
+                    for args in tasks
+                ],
+                n_workers,
+            )
+        )
+        for key, (_, tasks) in list(pending.items()):
+            cache_key, search = searches[key]
+            try:
+                pending[key] = search.send(
+                    list(itertools.islice(scores, len(tasks)))
+                )
+            except StopIteration as done:
+                del pending[key]
+                selections[key] = done.value
+                store.put(cache_key, done.value)
+    return selections
+
+
+def _search(series, criterion, horizon, initial, rounds, margin):
+    """One selection as a generator: each round yields ``(task function,
+    tasks)``, is sent back their scores, and the selection is returned."""
+    configs = {config_name(c): c for c in candidate_configs(series)}
+    alive = list(configs)
+    history = []
+    if criterion == "aic":
+        for stage, use_brute in enumerate((False, True), 1):
+            tasks = [(series, configs[n], use_brute) for n in alive]
+            scores = dict(zip(alive, (yield _aic_task, tasks)))
+            history += [(stage, n, s) for n, s in scores.items()]
+            if stage == 1:
+                best = min(scores.values())
+                alive = [n for n, s in scores.items() if s <= best + AIC_GAP]
+    else:
+        first = len(series) // 2 if initial is None else initial
+        folds = rolling_origins(len(series), first)[::-1]
+        per_round = max(1, len(folds) // 2 ** (rounds - 1))
+        for stage in range(1, rounds + 1):
+            used = folds[: per_round * 2 ** (stage - 1)]
+            tasks = [(series, configs[n], used, horizon) for n in alive]
+            scores = dict(zip(alive, (yield _backtest_task, tasks)))
+            history += [(stage, n, s) for n, s in scores.items()]
+            if stage < rounds:
+                alive = _prune(scores, margin)
+            if len(alive) == 1:
+                break
+
+    name = min(alive, key=scores.get)
+    return {
+        "config": configs[name],
+        "name": name,
+        "criterion": criterion,
+        "scores": pd.DataFrame(
+            history, columns=["Stage", "Candidate", "Score"]
+        ),
+    }
@@ -0,0 +1,398 @@
+"""Asyncio HTTP service answering chart requests with JSON figure data.
+
+    GET /health
+    GET /charts                                   chart names, carriers, years
+    GET /charts/cluster-passengers?cluster=0&start=2005&end=2015
+    GET /charts/net-income?start=2010&airlines=DELTA,SPIRIT
+    GET /charts/revenue?end=2019
+    GET /charts/performance-index?start=2010&end=2019
+    GET /charts/forecast?metric=Revenue
+
+Figures are ``{"data": [...], "layout": {...}}`` dicts that plotly.js can
+render directly. They are built from aggregates computed once at
+startup, on an executor so the event loop never blocks on pandas or
+model fitting, and identical requests share one cached answer.
+"""
+
+import asyncio
+import json
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+from sample.catalog import ColumnCatalog
+from sample.clustering import cluster_airlines, named_groups
+from sample.facts import assign_clusters, build_fact_table, cluster_totals
+from sample.ranges import performance_index
+
+FORECAST_HORIZON = 16
+FORECAST_METRICS = {"Passengers": "PASSENGER", "Revenue": "OPERATING_REVENUE"}
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+}
+
+
+def _values(values):
+    """JSON-safe list: NaN becomes null."""
+    return [
+        None if v is None or (isinstance(v, float) and np.isnan(v)) else v
+        for v in np.asarray(values, dtype=object).tolist()
+    ]
+
+
+def _figure(traces, title, **layout):
+    return {
+        "data": traces,
+        "layout": {
+            "title": {"text": title},
+            "template": "plotly_white",
+            **layout,
+        },
+    }
+
+
+class DashboardData:
+    """Aggregates behind every chart the service answers, computed once.
+
+    Yearly per-carrier passenger means and net income and revenue sums,
+    the performance index prefix sums and the Legacy/LCC/Regional group
+    series for forecasting. Requests only slice these.
+    """
+
+    def __init__(self, df, cluster_map=None):
+        catalog = ColumnCatalog.for_frame(df)
+        self.airlines = catalog.airlines
+        self.cluster_map = cluster_map or cluster_airlines(df)
+        self.groups = named_groups(self.cluster_map)
+
+        self.yearly = {}
+        for metric, how in (
+            ("PASSENGER", "mean"),
+            ("NET_INCOME", "sum"),
+            ("OPERATING_REVENUE", "sum"),
+        ):
+            names = {
+                catalog.get(a, metric): a
+                for a in self.airlines
+                if catalog.get(a, metric)
+            }
+            frame = df[["Year", *names]].groupby("Year")[list(names)]
+            self.yearly[metric] = frame.agg(how).rename(columns=names)
+        years = self.yearly["PASSENGER"].index
+        self.first_year, self.last_year = int(years.min()), int(years.max())
+
+        self.index = performance_index(df)
+        facts = build_fact_table(df, self.cluster_map)
+        self.group_totals = cluster_totals(assign_clusters(facts, self.groups))
+        self._forecasts = {}
+
+    def years(self, start=None, end=None):
+        start = self.first_year if start is None else start
+        end = self.last_year if end is None else end
+        if not self.first_year <= start <= end <= self.last_year:
+            raise ValueError(
+                f"Years must satisfy {self.first_year} <= start <= end "
+                f"<= {self.last_year}"
+            )
+        return start, end
+
+    def _yearly(self, metric, airlines, start, end):
+        start, end = self.years(start, end)
+        frame = self.yearly[metric].loc[start:end]
+        if airlines is not None:
+            unknown = sorted(set(airlines) - set(frame.columns))
+            if unknown:
+                raise ValueError(f"Unknown airlines: {', '.join(unknown)}")
+            frame = frame[list(airlines)]
+        return frame
+
+    def _area(self, metric, title, airlines, start, end):
+        frame = self._yearly(metric, airlines, start, end)
+        traces = [
+            {
+                "type": "scatter",
+                "mode": "lines",
+                "stackgroup": "one",
+                "name": airline,
+                "x": frame.index.tolist(),
+                "y": _values(frame[airline]),
+            }
+            for airline in frame.columns
+        ]
+        return _figure(traces, title, xaxis={"title": {"text": "Year"}})
+
+    def cluster_passengers(self, cluster, start=None, end=None):
+        if cluster not in self.cluster_map:
+            raise ValueError(f"Unknown cluster {cluster}")
+        airlines = [
+            a
+            for a in self.cluster_map[cluster]
+            if a in self.yearly["PASSENGER"]
+        ]
+        frame = self._yearly("PASSENGER", airlines, start, end)
+        traces = [
+            {
+                "type": "scatter",
+                "mode": "lines+markers",
+                "name": airline,
+                "x": frame.index.tolist(),
+                "y": _values(frame[airline]),
+            }
+            for airline in frame.columns
+        ]
+        return _figure(
+            traces, f"Passenger Growth Over Time by Cluster {cluster}"
+        )
+
+    def net_income(self, airlines=None, start=None, end=None):
+        return self._area(
+            "NET_INCOME",
+            "Net Income Trends by Individual Airline",
+            airlines,
+            start,
+            end,
+        )
+
+    def revenue(self, airlines=None, start=None, end=None):
+        return self._area(
+            "OPERATING_REVENUE",
+            "Operating Revenue Trends by Individual Airline",
+            airlines,
+            start,
+            end,
+        )
+
+    def performance(self, start=None, end=None):
+        start, end = self.years(start, end)
+        scores = self.index.score(start, end)
+        trace = {
+            "type": "bar",
+            "x": scores["Airline"].tolist(),
+            "y": _values(scores["Performance Score"]),
+            "text": [f"{s:.2f}" for s in scores["Performance Score"]],
+            "textposition": "outside",
+        }
+        return _figure(
+            [trace],
+            f"Performance Index by Individual Airline ({start}-{end})",
+        )
+
+    def forecast(self, metric_name):
+        """History and Holt-Winters forecast of each group's total."""
+        if metric_name not in FORECAST_METRICS:
+            raise ValueError(
+                f"metric must be one of {', '.join(FORECAST_METRICS)}"
+            )
+        if metric_name not in self._forecasts:
+            # The charting module only loads once a forecast is requested.
+            from sample.core import smooth_forecast
+
+            traces = []
+            for group in self.groups:
+                series = self.group_totals[
+                    (group, FORECAST_METRICS[metric_name])
+                ]
+                _, forecast, _ = smooth_forecast(series, FORECAST_HORIZON)
+                for name, part, dash in (
+                    (f"{group} Actual", series, None),
+                    (f"{group} Forecast", forecast, "dash"),
+                ):
+                    traces.append(
+                        {
+                            "type": "scatter",
+                            "mode": "lines",
+                            "name": name,
+                            "x": part.index.strftime("%Y-%m-%d").tolist(),
+                            "y": _values(part),
+                            "line": {"dash": dash} if dash else {},
+                        }
+                    )
+            self._forecasts[metric_name] = _figure(
+                traces,
+                f"Forecasting Airline {metric_name} Growth "
+                "(Legacy, LCC, Regional)",
+            )
+        return self._forecasts[metric_name]
+
+    def describe(self):
+        return {
+            "charts": sorted(CHARTS),
+            "airlines": self.airlines,
+            "clusters": {str(c): a for c, a in self.cluster_map.items()},
+            "years": [self.first_year, self.last_year],
+            "forecast_metrics": list(FORECAST_METRICS),
+        }
+
+
+def _int(query, name):
+    value = query.get(name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer") from None
+
+
+def _airlines(query):
+    value = query.get("airlines")
+    return None if not value else [a for a in value.split(",") if a]
+
+
+# Chart name -> (builder on DashboardData, query -> keyword arguments)
+CHARTS = {
+    "cluster-passengers": (
+        DashboardData.cluster_passengers,
+        lambda q: {
+            "cluster": _int(q, "cluster") or 0,
+            "start": _int(q, "start"),
+            "end": _int(q, "end"),
+        },
+    ),
+    "net-income": (
+        DashboardData.net_income,
+        lambda q: {
+            "airlines": _airlines(q),
+            "start": _int(q, "start"),
+            "end": _int(q, "end"),
+        },
+    ),
+    "revenue": (
+        DashboardData.revenue,
+        lambda q: {
+            "airlines": _airlines(q),
+            "start": _int(q, "start"),
+            "end": _int(q, "end"),
+        },
+    ),
+    "performance-index": (
+        DashboardData.performance,
+        lambda q: {"start": _int(q, "start"), "end": _int(q, "end")},
+    ),
+    "forecast": (
+        DashboardData.forecast,
+        lambda q: {"metric_name": q.get("metric", "Passengers")},
+    ),
+}
+
+
+class DashboardService:
+    """Serves DashboardData over HTTP/1.1 (one request per connection).
+
+    Building the aggregates and every chart runs on ``executor`` (a
+    thread pool by default). Answers are kept in an LRU of ``cache_size``
+    entries keyed by chart and parameters; concurrent identical requests
+    wait on the same pending computation instead of repeating it.
+    """
+
+    def __init__(self, df, cluster_map=None, executor=None, cache_size=256):
+        self._df = df
+        self._cluster_map = cluster_map
+        self.executor = executor or ThreadPoolExecutor(max_workers=4)
+        self.cache_size = cache_size
+        self.data = None
+        self._answers = OrderedDict()
+
+    async def prepare(self):
+        if self.data is None:
+            loop = asyncio.get_running_loop()
+            self.data = await loop.run_in_executor(
+                self.executor, DashboardData, self._df, self._cluster_map
+            )
+            self._df = None
+        return self.data
+
+    async def _compute(self, key, func, *args):
+        future = self._answers.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.executor, func, *args)
+            self._answers[key] = future
+            while len(self._answers) > self.cache_size:
+                self._answers.popitem(last=False)
+        else:
+            self._answers.move_to_end(key)
+        try:
+            return await asyncio.shield(future)
+        except Exception:
+            if self._answers.get(key) is future:
+                del self._answers[key]
+            raise
+
+    async def respond(self, method, target):
+        """(status, payload) for one request."""
+        if method != "GET":
+            return 405, {"error": "Only GET is supported"}
+        url = urlsplit(target)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        parts = [p for p in url.path.split("/") if p]
+        data = await self.prepare()
+        try:
+            if parts == ["health"]:
+                return 200, {"status": "ok"}
+            if parts == ["charts"]:
+                return 200, data.describe()
+            if len(parts) == 2 and parts[0] == "charts" and parts[1] in CHARTS:
+                builder, arguments = CHARTS[parts[1]]
+                kwargs = arguments(query)
+                key = (parts[1], tuple(sorted(kwargs.items(), key=str)))
+                key = json.dumps(key, default=str)
+                return 200, await self._compute(
+                    key, lambda: builder(data, **kwargs)
+                )
+        except ValueError as exc:
+            return 400, {"error": str(exc)}
+        return 404, {"error": f"No route for {url.path}"}
+
+    async def handle(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+            try:
+                method, target, _ = request_line.decode("latin-1").split()
+            except ValueError:
+                status, payload = 400, {"error": "Malformed request line"}
+            else:
+                try:
+                    status, payload = await self.respond(method, target)
+                except Exception as exc:
+                    status, payload = 500, {"error": str(exc)}
+            body = json.dumps(payload).encode()
+            writer.write(
+                f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Access-Control-Allow-Origin: *\r\n"
+                "Connection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    async def start(self, host="127.0.0.1", port=8050):
+        """Prepares the aggregates and starts listening; returns the
+        asyncio server (port 0 picks a free port)."""
+        await self.prepare()
+        return await asyncio.start_server(self.handle, host, port)
+
+
+def serve(df, host="127.0.0.1", port=8050, cluster_map=None):
+    """Runs the service until interrupted."""
+
+    async def main():
+        server = await DashboardService(df, cluster_map).start(host, port)
+        address = server.sockets[0].getsockname()
+        print(f"Serving airline charts on http://{address[0]}:{address[1]}")
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(main())
@@ -0,0 +1,166 @@
+import base64
+import os
+
+import numpy as np
+
+_settings = {
+    "max_points": int(os.environ.get("AIRLINE_MAX_POINTS", 2000)),
+    "digits": int(os.environ.get("AIRLINE_TRACE_DIGITS", 6)),
+}
+
+# Per-point trace attributes that must stay aligned with x and y.
+POINT_ARRAYS = ("text", "hovertext", "customdata", "ids")
+INT_DTYPES = (np.int8, np.int16, np.int32)
+LINE_TRACES = ("scatter", "scattergl")
+
+
+def configure_traces(max_points=None, digits=None):
+    """Sets the point budget per trace above which line traces are
+    downsampled (0 disables it) and the significant digits kept."""
+    if max_points is not None:
+        _settings["max_points"] = max_points
+    if digits is not None:
+        _settings["digits"] = digits
+
+
+def lttb(x, y, n_out):
+    """Indices of ``n_out`` points chosen by Largest-Triangle-Three-Buckets.
+
+    The first and last points are kept; every bucket in between keeps the
+    point forming the largest triangle with the point kept before it and
+    the mean of the next bucket, which preserves peaks and troughs that
+    plain striding drops.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        nxt = slice(hi, edges[b + 2] if b + 2 < len(edges) else n)
+        mean_x, mean_y = x[nxt].mean(), y[nxt].mean()
+        ax, ay = x[keep[b]], y[keep[b]]
+        area = np.abs(
+            (ax - mean_x) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (mean_y - ay)
+        )
+        keep[b + 1] = lo + int(np.nanargmax(area)) if hi > lo else lo
+    return keep
+
+
+def round_significant(values, digits):
+    """Rounds to ``digits`` significant digits; zeros and NaN pass through."""
+    values = np.asarray(values, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        exponent = np.floor(np.log10(np.abs(values)))
+        scale = 10.0 ** (
+            digits - 1 - np.where(np.isfinite(exponent), exponent, 0)
+        )
+        return np.where(
+            np.isfinite(exponent), np.round(values * scale) / scale, values
+        )
+
+
+def typed_array(values, digits=None):
+    """Numeric values as a plotly typed array (``{"dtype", "bdata"}``).
+
+    Integers use the smallest integer type that holds them (float64 past
+    int32); floats are
+    rounded to ``digits`` significant digits and sent as float32 when that
+    keeps them (up to 7 digits), else float64.
+    """
+    digits = _settings["digits"] if digits is None else digits
+    values = np.asarray(values)
+    if values.dtype.kind in "iub":
+        values = values.astype(np.int64)
+        lo, hi = (values.min(), values.max()) if values.size else (0, 0)
+        for dtype in INT_DTYPES:
+            info = np.iinfo(dtype)
+            if info.min <= lo and hi <= info.max:
+                values = values.astype(dtype)
+                break
+        else:
+            # plotly.js has no 64-bit integer arrays.
+            values = values.astype(np.float64)
+    else:
+        values = round_significant(values, digits)
+        if digits <= 7:
+            values = values.astype(np.float32)
+    data = np.ascontiguousarray(values.astype(values.dtype.newbyteorder("<")))
+    return {
+        "dtype": data.dtype.str[1:],
+        "bdata": base64.b64encode(data.tobytes()).decode("ascii"),
+    }
+
+
+def _numeric(values):
+    return values is not None and np.asarray(values).dtype.kind in "iubf"
+
+
+def _as_array(values):
+    if values is None or isinstance(values, (dict, str)):
+        return None
+    return np.asarray(values)
+
+
+def prepare_xy(x, y, max_points=None):
+    """Downsamples (x, y) to the point budget with LTTB, ready to pass to
+    a trace constructor. Returns (x, y) as arrays and the kept indices;
+    encoding is left to write time (compact_figure)."""
+    max_points = _settings["max_points"] if max_points is None else max_points
+    x, y = np.asarray(x), np.asarray(y)
+    keep = np.arange(len(y))
+    if max_points and len(y) > max_points and _numeric(y):
+        if x.dtype.kind == "M":
+            axis = x.astype("datetime64[ns]").astype(np.int64)
+        elif _numeric(x):
+            axis = x
+        else:
+            # Category labels sit evenly spaced along the axis.
+            axis = np.arange(len(x))
+        keep = lttb(axis, y, max_points)
+        x, y = x[keep], y[keep]
+    return x, y, keep
+
+
+def _attribute(trace, name):
+    return _as_array(trace[name]) if name in trace else None
+
+
+def compact_figure(fig, max_points=None, digits=None):
+    """Shrinks a built figure's payload in place and returns it.
+
+    Line traces longer than the point budget are downsampled with LTTB,
+    except filled or stacked ones (whose shapes depend on every trace
+    sharing its points) and ones carrying other per-point arrays that
+    would fall out of step. Numeric x/y arrays of every trace are rounded
+    and typed-array encoded.
+    """
+    for trace in fig.data:
+        x, y = _attribute(trace, "x"), _attribute(trace, "y")
+        line = (
+            trace.type in LINE_TRACES
+            and x is not None
+            and y is not None
+            and len(x) == len(y)
+            and all(_attribute(trace, name) is None for name in POINT_ARRAYS)
+        )
+        if line:
+            shaped = trace.fill not in (None, "none") or trace.stackgroup
+            budget = 0 if shaped else max_points
+            x, y, keep = prepare_xy(x, y, budget)
+            if len(keep) < len(trace.y):
+                trace.x, trace.y = x, y
+        for name, values in (("x", x), ("y", y)):
+            if values is not None and _numeric(values):
+                trace[name] = typed_array(values, digits)
+    return fig
+
+
+def payload_bytes(fig):
+    """Size of the figure's JSON as sent to the browser."""
+    return len(fig.to_json().encode())
@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+from sample.catalog import ColumnCatalog
+from sample.facts import frame_dates
+
+VOLATILITY_METRICS = ("PASSENGER", "OPERATING_REVENUE")
+WINDOWS = (4, 8, 12)
+
+
+class RollingStd:
+    """Sliding-window sample standard deviations of many series for several
+    window lengths at once.
+
+    Each observation updates a running mean and sum of squared deviations
+    per (window, series) with Welford's add step, and once a window is
+    full also removes the observation leaving it, so every update is
+    O(series x windows) no matter how long the windows are. Only the last
+    ``max(windows)`` observations are kept.
+    """
+
+    def __init__(self, n_series, windows=WINDOWS):
+        self.windows = np.array(sorted(set(windows)))
+        if self.windows[0] < 2:
+            raise ValueError("Rolling windows need at least 2 observations")
+        shape = (len(self.windows), n_series)
+        self.count = 0
+        self._mean = np.zeros(shape)
+        self._m2 = np.zeros(shape)
+        self._history = np.zeros((self.windows[-1], n_series))
+
+    def update(self, x):
+        """Adds one observation per series; returns the (windows, series)
+        standard deviations, NaN for windows not yet full."""
+        x = np.asarray(x, dtype=float)
+        sliding = (self.count >= self.windows)[:, None]
+        oldest = self._history[
+            (self.count - self.windows) % len(self._history)
+        ]
+        n = np.minimum(self.count + 1, self.windows)[:, None]
+
+        # Growing windows: plain Welford add.
+        grow_mean = self._mean + (x - self._mean) / n
+        grow_m2 = self._m2 + (x - self._mean) * (x - grow_mean)
+        # Full windows: swap the oldest observation for the new one.
+        slide_mean = self._mean + (x - oldest) / n
+        slide_m2 = self._m2 + (x - oldest) * (
+            x - slide_mean + oldest - self._mean
+        )
+        self._mean = np.where(sliding, slide_mean, grow_mean)
+        self._m2 = np.where(sliding, slide_m2, grow_m2)
+
+        self._history[self.count % len(self._history)] = x
+        self.count += 1
+        full = (self.count >= self.windows)[:, None]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            std = np.sqrt(np.maximum(self._m2, 0) / (n - 1))
+        return np.where(full, std, np.nan)
+
+
+def market_shares(values):
+    """Row shares of a (quarters, carriers) array; missing values count as
+    zero and quarters with no total give zero shares."""
+    values = np.nan_to_num(np.asarray(values, dtype=float))
+    totals = values.sum(axis=1, keepdims=True)
+    return np.divide(
+        values, totals, out=np.zeros_like(values), where=totals != 0
+    )
+
+
+class VolatilityEngine:
+    """Rolling market-share volatility for every carrier and metric.
+
+    Shares are taken within each metric (a carrier's passengers over all
+    passengers, its revenue over all revenue) and fed quarter by quarter
+    through one ``RollingStd`` per metric covering every window length.
+    ``append`` feeds later quarters without revisiting earlier ones.
+    """
+
+    def __init__(self, df, metrics=VOLATILITY_METRICS, windows=WINDOWS):
+        catalog = ColumnCatalog.for_frame(df)
+        self.metrics = tuple(metrics)
+        self.windows = tuple(sorted(set(windows)))
+        self.airlines = {}
+        self._columns = {}
+        self._rolling = {}
+        for metric in self.metrics:
+            airlines = [a for a in catalog.airlines if catalog.get(a, metric)]
+            self.airlines[metric] = airlines
+            self._columns[metric] = [catalog.get(a, metric) for a in airlines]
+            self._rolling[metric] = RollingStd(len(airlines), self.windows)
+        self.frame = None
+        self.append(df)
+
+    def append(self, df):
+        """Adds the quarters in ``df`` (after those seen so far) and
+        returns their rolling volatility. Carriers missing from ``df``
+        count as zero; carriers not seen at construction are ignored."""
+        blocks = {}
+        for metric in self.metrics:
+            shares = market_shares(
+                df.reindex(columns=self._columns[metric]).to_numpy()
+            )
+            rolling = self._rolling[metric]
+            out = np.stack([rolling.update(row) for row in shares])
+            for w, window in enumerate(self.windows):
+                blocks[(metric, window)] = pd.DataFrame(
+                    out[:, w], columns=self.airlines[metric]
+                )
+        new = pd.concat(blocks, axis=1, names=["Metric", "Window", "Airline"])
+        new.index = frame_dates(df).rename("Date")
+        self.frame = (
+            new if self.frame is None else pd.concat([self.frame, new])
+        )
+        return new
+
+    def volatility(self, metric, window):
+        """Rolling share volatility over time, one column per carrier."""
+        columns = self.frame.columns
+        selected = (columns.get_level_values("Metric") == metric) & (
+            columns.get_level_values("Window") == window
+        )
+        frame = self.frame.loc[:, selected]
+        frame.columns = columns[selected].get_level_values("Airline")
+        return frame
+
+    def summary(self, window):
+        """Mean rolling volatility per metric and carrier, most volatile
+        first."""
+        mean = self.frame.xs(window, axis=1, level="Window").mean()
+        return (
+            mean.rename("Volatility")
+            .reset_index()
+            .sort_values("Volatility", ascending=False, ignore_index=True)
+        )
@@ -13,7 +13,7 @@ setup(
     install_requires=["pandas", "plotly", "openpyxl"],
     entry_points={
         "console_scripts": [
-            "run-analysis=sample.core:run_analysis",
+            "run-analysis=sample.cli:main",
         ],
     },
     python_requires=">=3.7",
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+PASSENGER_COLUMNS = [
+    "AMERICAN_PASSENGER",
+    "DELTA_PASSENGER",
+    "UNITED_PASSENGER",
+    "SOUTHWEST_PASSENGER",
+    "ALASKA_PASSENGER",
+    "FRONTIER_PASSENGER",
+    "ALLEGIANT_PASSENGER",
+    "SPIRIT_PASSENGER",
+    "JETBLUE_PASSENGER",
+    "SUN_COUNTRY_PASSENGER",
+    "HAWAIIN_PASSENGER",
+    "SKYWEST_PASSENGER",
+]
+NET_INCOME_COLUMNS = [
+    "AMERICAN_AIRLINE_NET_INCOME",
+    "DELTA_AIRLINE_NET_INCOME",
+    "UNITED_AIRLINE_NET_INCOME",
+    "SOUTHWEST_AIRLINE_NET_INCOME",
+    "ALASKA_NET_INCOME",
+    "FRONTIER_NET_INCOME",
+    "ALLEGIANT_NET_INCOME",
+    "SPIRIT_NET_INCOME",
+    "JETBLUE_NET_INCOME",
+    "SUN_COUNTRY_NET_INCOME",
+    "HAWAIIN_NET_INCOME",
+    "SKYWEST_NET_INCOME",
+]
+REVENUE_COLUMNS = [
+    "AMERICAN_AIRLINE_OPERATING_REVENUE",
+    "DELTA_AIR_LINE_OPERATING_REVENUE",
+    "UNITED_AIRLINE_OPERATING_REVENUE",
+    "SOUTHWEST_AIRLINE_OPERATING_REVENUE",
+    "ALASKA_OPERTING_REVENUE",
+    "FRONTIER_OPERATING_REVENUE",
+    "ALLEGIANT_OPERATING_REVENUE",
+    "SPIRIT_OPERATING_REVENUE",
+    "JETBLUE_OPERATING_REVENUE",
+    "SUN_COUNTRY_OPERATING_REVENUE",
+    "HAWAIIN_OPERATING_REVENUE",
+    "SKYWEST_OPERATING_REVENUE",
+]
+
+
+@pytest.fixture
+def wide_df():
+    """Synthetic workbook with the same column names as the real sheet."""
+    rng = np.random.default_rng(0)
+    years = np.repeat(np.arange(2003, 2024), 4)
+    quarters = np.tile(["Q1", "Q2", "Q3", "Q4"], 21)
+    t = np.arange(len(years))
+    season = np.tile([0.9, 1.05, 1.1, 0.95], 21)
+
+    data = {"Year": years, "Quarter": quarters}
+    for i, col in enumerate(PASSENGER_COLUMNS):
+        base = 5e6 * (i + 1)
+        data[col] = base * (1 + 0.01 * t) * season + rng.normal(0, 1e4, t.size)
+    for i, col in enumerate(NET_INCOME_COLUMNS):
+        data[col] = 1e8 * (i + 1) * np.sin(t / 6 + i) + rng.normal(
+            0, 1e6, t.size
+        )
+    for i, col in enumerate(REVENUE_COLUMNS):
+        base = 1e9 * (i + 1)
+        data[col] = base * (1 + 0.015 * t) * season + rng.normal(
+            0, 1e6, t.size
+        )
+    return pd.DataFrame(data)
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sample import backtest as harness
+from sample import core
+from sample.backtest import backtest, backtest_errors, rolling_origins
+
+
+def _series_by_key(wide_df):
+    index = pd.date_range("2003-01-01", periods=len(wide_df), freq="QS")
+    return {
+        ("Passengers", "Legacy"): pd.Series(
+            wide_df["DELTA_PASSENGER"].to_numpy(), index=index
+        ),
+        ("Revenue", "LCC"): pd.Series(
+            wide_df["SPIRIT_OPERATING_REVENUE"].to_numpy(), index=index
+        ),
+    }
+
+
+def test_rolling_origins():
+    assert rolling_origins(10, 6, step=2) == [(0, 6), (0, 8)]
+    assert rolling_origins(10, 6, window=4) == [
+        (2, 6),
+        (3, 7),
+        (4, 8),
+        (5, 9),
+    ]
+    with pytest.raises(ValueError):
+        rolling_origins(10, 10)
+    with pytest.raises(ValueError):
+        rolling_origins(10, 4, window=6)
+
+
+def test_folds_are_out_of_sample(wide_df):
+    series_by_key = _series_by_key(wide_df)
+    errors = backtest_errors(
+        series_by_key, core.smooth_forecast, horizon=4, initial=76, step=2
+    )
+    fold = errors[
+        (errors["key"] == ("Passengers", "Legacy"))
+        & (errors["Origin"] == pd.Timestamp("2021-10-01"))
+    ]
+    # Origin 2021Q4 is the last training point of a 76-quarter fold.
+    assert list(fold["Horizon"]) == [1, 2, 3, 4]
+    assert (fold["Train Size"] == 76).all()
+    _, forecast, _ = core.smooth_forecast(
+        series_by_key[("Passengers", "Legacy")].iloc[:76], 4
+    )
+    np.testing.assert_allclose(fold["Forecast"], forecast.to_numpy())
+
+
+def test_backtest_table_is_same_serial_and_parallel(wide_df):
+    series_by_key = _series_by_key(wide_df)
+    options = dict(horizon=3, initial=78, step=2)
+    serial = backtest(
+        series_by_key, core.smooth_forecast, n_workers=1, **options
+    )
+    pooled = backtest(
+        series_by_key, core.smooth_forecast, n_workers=2, **options
+    )
+    pd.testing.assert_frame_equal(serial, pooled)
+
+    assert list(serial.columns) == [
+        "Metric",
+        "Group",
+        "Horizon",
+        "Folds",
+        "MAE",
+        "RMSE",
+        "MAPE",
+    ]
+    assert len(serial) == 2 * 3
+    # Origins at 78, 80, 82: the last fold only has two points to score.
+    assert list(serial["Folds"][:3]) == [3, 3, 2]
+    assert (serial["RMSE"] >= serial["MAE"]).all()
+
+
+def test_batched_backtest_with_sliding_window(wide_df):
+    table = backtest(
+        _series_by_key(wide_df), horizon=4, initial=60, window=40, step=4
+    )
+    assert len(table) == 2 * 4
+    assert (table["Folds"] == [6, 6, 6, 6, 6, 6, 6, 6]).all()
+    assert table["MAPE"].lt(20).all()
+
+
+def test_pooled_backtests_share_fold_fits_on_disk(
+    wide_df, tmp_path, monkeypatch
+):
+    series_by_key = _series_by_key(wide_df)
+    directory = str(tmp_path / "folds")
+    options = dict(horizon=3, initial=78, step=2, cache_dir=directory)
+    first = backtest(
+        series_by_key, core.smooth_forecast, n_workers=2, **options
+    )
+    # Two series with three folds each, fitted and stored by the workers.
+    assert len(list(tmp_path.glob("folds/*/*.pkl"))) == 6
+
+    # A fresh process (no fold caches in memory) finds every fold on disk.
+    monkeypatch.setattr(harness, "_fold_caches", {})
+    again = backtest(
+        series_by_key, core.smooth_forecast, n_workers=1, **options
+    )
+    pd.testing.assert_frame_equal(again, first)
+    cache = harness._fold_caches[directory]
+    assert (cache.hits, cache.misses) == (6, 0)
+
+    # Another configuration is fitted rather than served the cached folds.
+    damped = {**core.DEFAULT_CONFIG, "damped_trend": True}
+    backtest(
+        series_by_key,
+        core.smooth_forecast,
+        n_workers=1,
+        configs={key: damped for key in series_by_key},
+        **options,
+    )
+    assert (cache.hits, cache.misses) == (6, 6)
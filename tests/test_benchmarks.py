@@ -0,0 +1,34 @@
+from benchmarks import run
+from benchmarks.synthetic import make_dataset
+from sample.catalog import METRICS, ColumnCatalog
+
+
+def test_synthetic_dataset_matches_workbook_format():
+    df = make_dataset(n_carriers=20, n_quarters=40)
+    assert df.shape == (40, 2 + 20 * len(METRICS))
+    assert list(df["Quarter"][:5]) == ["Q1", "Q2", "Q3", "Q4", "Q1"]
+    catalog = ColumnCatalog.for_frame(df)
+    assert len(catalog.complete_airlines(METRICS)) == 20
+    assert "HAWAIIN" in catalog.airlines
+    assert (df.filter(like="_PASSENGER") > 0).all().all()
+
+
+def test_every_benchmark_runs(monkeypatch):
+    monkeypatch.setitem(run.SCALES, "tiny", (6, 40))
+    results = run.run(scales=("tiny",), repeat=1)
+    assert set(results) == set(run.BENCHMARKS)
+    assert all(r["tiny"] > 0 for r in results.values())
+
+
+def test_compare_flags_regressions():
+    baseline = {"a": {"small": 1.0, "large": 2.0}, "b": {"small": 1.0}}
+    results = {"a": {"small": 1.2, "large": 3.0}, "c": {"small": 9.0}}
+    report = run.compare(results, baseline, threshold=0.25)
+    assert list(report["benchmark"]) == ["a", "a"]
+    assert list(report["regressed"]) == [False, True]
+
+
+def test_import_benchmarks_use_the_process_scale():
+    results = run.run_imports(("sample.cli",), repeat=1)
+    assert list(results) == ["import sample.cli"]
+    assert results["import sample.cli"]["process"] >= 0
@@ -0,0 +1,62 @@
+import os
+
+import numpy as np
+import pandas as pd
+from sample.cache import ResultCache, content_hash, memoize
+
+
+def test_content_hash_depends_on_values_not_identity(wide_df):
+    assert content_hash(wide_df) == content_hash(wide_df.copy())
+    changed = wide_df.copy()
+    changed.loc[0, "DELTA_PASSENGER"] += 1
+    assert content_hash(wide_df) != content_hash(changed)
+    assert content_hash(np.arange(3)) != content_hash(np.arange(3.0))
+
+
+def test_memoize_uses_memory_then_disk_tier(tmp_path):
+    calls = []
+    cache = ResultCache(maxsize=2, directory=str(tmp_path))
+
+    @memoize(cache=cache)
+    def total(series, scale=1):
+        calls.append(1)
+        return series.sum() * scale
+
+    series = pd.Series([1.0, 2.0, 3.0])
+    assert total(series) == total(series.copy()) == 6.0
+    assert total(series, scale=2) == 12.0
+    assert len(calls) == 2 and cache.hits == 1
+
+    fresh = ResultCache(directory=str(tmp_path))
+    total_again = memoize(total.uncached, cache=fresh)
+    assert total_again(series, scale=2) == 12.0
+    assert len(calls) == 2 and fresh.hits == 1
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(maxsize=1, directory=str(tmp_path), max_bytes=3000)
+    for i in range(5):
+        cache.put(f"{i:02d}key", np.zeros(100) + i)
+    files = [f for _, _, fs in os.walk(tmp_path) for f in fs]
+    assert 0 < len(files) < 5
+    assert cache.get("04key")[0]
+    assert not cache.get("00key")[0]
+
+
+def test_memoized_results_are_copies():
+    cache = ResultCache()
+
+    @memoize(cache=cache)
+    def fit(values):
+        frame = pd.DataFrame({"x": values})
+        return frame, np.asarray(values) * 2, {"mean": frame["x"].mean()}
+
+    frame, doubled, stats = fit([1.0, 2.0])
+    frame["x"] = 0.0
+    frame.columns = ["y"]
+    doubled[:] = 0
+    again, doubled_again, stats_again = fit([1.0, 2.0])
+    assert cache.hits == 1
+    assert list(again.columns) == ["x"] and again["x"].tolist() == [1, 2]
+    assert doubled_again.tolist() == [2.0, 4.0]
+    assert stats_again == stats
@@ -0,0 +1,53 @@
+import pytest
+from sample import helpers
+from sample.catalog import ColumnCatalog, parse_column
+
+
+def test_parse_column_handles_irregular_names():
+    assert parse_column("DELTA_AIR_LINE_OPERATING_REVENUE") == (
+        "DELTA",
+        "OPERATING_REVENUE",
+    )
+    assert parse_column("ALASKA_OPERTING_REVENUE") == (
+        "ALASKA",
+        "OPERATING_REVENUE",
+    )
+    assert parse_column("AMERICAN_AIRLINE_NET_INCOME") == (
+        "AMERICAN",
+        "NET_INCOME",
+    )
+    assert parse_column("SUN_COUNTRY_PASSENGER") == (
+        "SUN_COUNTRY",
+        "PASSENGER",
+    )
+    assert parse_column("Legacy_Passengers") is None
+    assert parse_column("Year") is None
+
+
+def test_catalog_avoids_substring_collisions():
+    catalog = ColumnCatalog(
+        ["AIR_PASSENGER", "AIRTRAN_PASSENGER", "UNITED_PASSENGER"]
+    )
+    assert catalog.get("AIR", "PASSENGER") == "AIR_PASSENGER"
+    assert catalog.columns(["AIR"], "PASSENGER") == ["AIR_PASSENGER"]
+    assert catalog.get("UNITED", "NET_INCOME") is None
+
+
+def test_catalog_is_shared_per_column_set(wide_df):
+    assert ColumnCatalog.for_frame(wide_df) is ColumnCatalog.for_frame(
+        wide_df.copy()
+    )
+    with pytest.raises(ValueError):
+        ColumnCatalog.for_frame(wide_df).get("DELTA", "PASSENGERS_TYPO")
+
+
+def test_helpers_use_catalog(wide_df):
+    airlines = helpers.extract_airlines(wide_df)
+    assert "DELTA" in airlines and "DELTA_LINE" not in airlines
+    assert len(airlines) == 12
+    assert helpers.extract_columns(
+        wide_df, ["ALASKA", "DELTA"], "OPERATING_REVENUE"
+    ) == ["DELTA_AIR_LINE_OPERATING_REVENUE", "ALASKA_OPERTING_REVENUE"]
+
+    perf = helpers.calculate_performance(wide_df, airlines)
+    assert set(perf["Airline"]) == set(airlines)
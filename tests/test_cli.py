@@ -0,0 +1,137 @@
+import subprocess
+import sys
+
+import pytest
+from sample import cli, core
+
+HEAVY = (
+    "plotly.express",
+    "plotly.graph_objects",
+    "statsmodels",
+    "sklearn",
+    "scipy.stats",
+    "matplotlib",
+)
+
+
+def test_cli_import_does_not_load_heavy_dependencies():
+    code = (
+        "import sys, sample.cli, sample.core; "
+        f"print([m for m in {HEAVY!r} if m in sys.modules])"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True
+    )
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.strip() == "[]"
+
+
+def test_help_does_not_load_the_analysis_stack():
+    code = (
+        "import sys, sample.cli\n"
+        "for argv in (['--help'], ['forecast', '--help']):\n"
+        "    try:\n"
+        "        sample.cli.main(argv)\n"
+        "    except SystemExit:\n"
+        "        pass\n"
+        "print([m for m in ('numpy', 'pandas') if m in sys.modules])"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True
+    )
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.strip().endswith("[]")
+
+
+def test_help_lists_subcommands(capsys):
+    with pytest.raises(SystemExit) as exc:
+        cli.main(["--help"])
+    assert exc.value.code == 0
+    help_text = capsys.readouterr().out
+    for command in ("plots", "forecast", "score", "serve"):
+        assert command in help_text
+
+
+def test_score_prints_performance_index(wide_df, tmp_path, capsys):
+    source = tmp_path / "airlines.xlsx"
+    wide_df.to_excel(source, index=False)
+    args = ["score", "2010", "2019", "--source", str(source)]
+    assert cli.main(args + ["--cache-dir", str(tmp_path / "cache")]) == 0
+    assert "DELTA" in capsys.readouterr().out
+
+
+def test_subcommands_run_only_their_stages(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        core, "run_analysis", lambda **kwargs: calls.append(kwargs)
+    )
+    cli.main(["plots"])
+    cli.main(["forecast", "--backtest", "--workers", "2"])
+    cli.main([])
+    assert [c["stages"] for c in calls] == [
+        ("plots",),
+        ("forecast",),
+        ("plots", "forecast"),
+    ]
+    assert calls[1]["backtest"] and calls[1]["n_workers"] == 2
+
+
+def test_run_analysis_rejects_unknown_stage(wide_df):
+    with pytest.raises(ValueError, match="Unknown stages"):
+        core.run_analysis(wide_df, stages=("plots", "charts"))
+
+
+def test_compact_option(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        core, "run_analysis", lambda **kwargs: calls.append(kwargs)
+    )
+    cli.main(["plots"])
+    cli.main(["plots", "--compact"])
+    cli.main(["forecast", "--compact", "int64"])
+    assert [c["compact"] for c in calls] == [False, True, "int64"]
+
+
+def test_options_before_the_subcommand_are_kept(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        core, "run_analysis", lambda **kwargs: calls.append(kwargs)
+    )
+    cli.main(["--workers", "2", "--source", "x.xlsx", "forecast"])
+    cli.main(
+        ["--dashboard", "--compact", "int64", "plots", "--format", "json"]
+    )
+    cli.main(["--source", "x.xlsx", "plots", "--source", "y.xlsx"])
+    assert calls[0]["n_workers"] == 2 and calls[0]["source"] == "x.xlsx"
+    assert calls[1]["dashboard"] and calls[1]["compact"] == "int64"
+    assert calls[1]["chart_format"] == "json"
+    assert calls[2]["source"] == "y.xlsx"
+
+
+def test_refresh_option(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        core, "run_analysis", lambda **kwargs: calls.append(kwargs)
+    )
+    cli.main(["plots"])
+    cli.main(["--refresh", "forecast"])
+    assert [c["refresh_source"] for c in calls] == [False, True]
+    assert "refresh" not in calls[1]
+
+
+def test_bad_arguments_are_usage_errors(monkeypatch):
+    def failing(**kwargs):
+        raise ValueError("from the analysis")
+
+    monkeypatch.setattr(core, "run_analysis", failing)
+    for argv in (
+        ["--render-mode", "fancy"],
+        ["plots", "--format", "png"],
+        ["forecast", "--workers", "0"],
+        ["--profile", "stages.txt"],
+    ):
+        with pytest.raises(SystemExit) as exc:
+            cli.main(argv)
+        assert exc.value.code == 2
+    with pytest.raises(ValueError, match="from the analysis"):
+        cli.main(["plots"])
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+from sample import clustering, core
+from sample.cache import default_cache
+
+
+def _blobs(n_per, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = np.array([[0, 0, 0], [10, 0, 5], [0, 10, -5]], dtype=float)
+    points = np.concatenate(
+        [c + rng.normal(0, 0.5, (n_per, 3)) for c in centers]
+    )
+    truth = np.repeat(np.arange(3), n_per)
+    return points, truth
+
+
+def _same_partition(labels, truth):
+    pairs = set(zip(truth.tolist(), labels.tolist()))
+    return len(pairs) == len(set(truth.tolist())) == len(set(labels.tolist()))
+
+
+def test_features_describe_each_airline(wide_df):
+    features = clustering.airline_features(wide_df)
+    assert list(features.columns) == list(clustering.FEATURES)
+    assert len(features) == 12
+    margin = (
+        wide_df["SPIRIT_NET_INCOME"].sum()
+        / wide_df["SPIRIT_OPERATING_REVENUE"].sum()
+    )
+    assert np.isclose(features.loc["SPIRIT", "Net Margin"], margin)
+    # Passengers grow about 1% a quarter in the fixture.
+    assert np.allclose(features["Passenger Growth"], 0.029, atol=0.005)
+
+
+def test_kmeans_recovers_separated_clusters():
+    points, truth = _blobs(50)
+    centers, labels, inertia = clustering.kmeans(points, 3, seed=1)
+    assert centers.shape == (3, 3)
+    assert _same_partition(labels, truth)
+    assert inertia < 3 * len(points)
+
+
+def test_mini_batches_scale_to_many_points():
+    points, truth = _blobs(2000)
+    _, labels, _ = clustering.kmeans(points, 3, batch_size=256, seed=0)
+    assert _same_partition(labels, truth)
+
+
+def test_kmeans_never_leaves_a_cluster_empty():
+    points = np.array([[0.0], [0.0], [0.0], [1.0]])
+    _, labels, _ = clustering.kmeans(points, 4, restarts=2)
+    assert sorted(labels.tolist()) == [0, 1, 2, 3]
+
+
+def test_clusters_are_numbered_largest_first(wide_df):
+    features = clustering.airline_features(wide_df)
+    clusters = clustering.fit_clusters.uncached(features, k=3)
+    size = features["Log Revenue"].groupby(clusters).mean()
+    assert list(size.index) == [0, 1, 2]
+    assert size.is_monotonic_decreasing
+
+    cluster_map = clustering.cluster_airlines(wide_df)
+    assert sorted(a for g in cluster_map.values() for a in g) == sorted(
+        features.index
+    )
+    groups = clustering.named_groups(cluster_map)
+    assert list(groups) == ["Legacy", "LCC", "Regional"]
+    assert clustering.named_groups({0: ["A"], 1: ["B"]}) == {
+        "Cluster 0": ["A"],
+        "Cluster 1": ["B"],
+    }
+
+
+def test_clustering_is_cached_until_features_change(wide_df, monkeypatch):
+    default_cache.clear()
+    calls = []
+    kmeans = clustering.kmeans
+    monkeypatch.setattr(
+        clustering,
+        "kmeans",
+        lambda *args, **kwargs: calls.append(1) or kmeans(*args, **kwargs),
+    )
+    first = clustering.cluster_airlines(wide_df)
+    assert clustering.cluster_airlines(wide_df.copy()) == first
+    assert len(calls) == 1
+
+    wide_df["SPIRIT_NET_INCOME"] *= 3
+    clustering.cluster_airlines(wide_df)
+    assert len(calls) == 2
+
+
+def test_run_analysis_rejects_maps_without_a_cluster_per_group(
+    wide_df, monkeypatch
+):
+    def fail(*args, **kwargs):
+        raise AssertionError("validation must happen before loading")
+
+    monkeypatch.setattr(core, "compact_frame", fail)
+    two = {0: ["DELTA", "UNITED"], 1: ["SPIRIT", "FRONTIER"]}
+    with pytest.raises(ValueError, match="3 clusters"):
+        core.run_analysis(wide_df, cluster_map=two, compact=True)
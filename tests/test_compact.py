@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sample import core
+from sample.compact import compact_frame, is_compact, memory_mb
+from sample.export import render_mode
+from sample.facts import build_fact_table, cluster_totals
+from sample.helpers import melt_for_plotting, yearly_by_airline
+
+CLUSTER_MAP = {
+    0: ["ALASKA", "AMERICAN", "DELTA", "SOUTHWEST", "UNITED"],
+    1: ["ALLEGIANT", "FRONTIER", "JETBLUE", "SPIRIT"],
+    2: ["SKYWEST", "HAWAIIN", "SUN_COUNTRY"],
+}
+
+
+def test_compact_frame_halves_memory(wide_df):
+    original = wide_df.copy()
+    compact = compact_frame(wide_df)
+    pd.testing.assert_frame_equal(wide_df, original)
+    assert compact["DELTA_PASSENGER"].dtype == np.float32
+    assert compact["SPIRIT_NET_INCOME"].dtype == np.float32
+    assert compact["Year"].dtype == np.int16
+    assert compact["Quarter"].dtype == "category"
+    assert is_compact(compact) and not is_compact(wide_df)
+    assert memory_mb(compact) < 0.6 * memory_mb(wide_df)
+    np.testing.assert_allclose(
+        compact["SPIRIT_OPERATING_REVENUE"],
+        wide_df["SPIRIT_OPERATING_REVENUE"],
+        rtol=1e-6,
+    )
+
+
+def test_int64_currency_keeps_exact_totals(wide_df):
+    compact = compact_frame(wide_df, currency="int64")
+    assert compact["SPIRIT_NET_INCOME"].dtype == np.int64
+    assert compact["DELTA_PASSENGER"].dtype == np.float32
+    assert compact["SPIRIT_NET_INCOME"].sum() == (
+        wide_df["SPIRIT_NET_INCOME"].round().sum()
+    )
+
+    facts = build_fact_table(compact, CLUSTER_MAP)
+    assert facts["date"].dtype == "category"
+    totals = cluster_totals(facts)
+    rounded = wide_df.copy()
+    for col in compact.columns[compact.dtypes == np.int64]:
+        rounded[col] = rounded[col].round()
+    expected = cluster_totals(build_fact_table(rounded, CLUSTER_MAP))
+    for metric in ("NET_INCOME", "OPERATING_REVENUE"):
+        pd.testing.assert_frame_equal(
+            totals.xs(metric, axis=1, level="metric"),
+            expected.xs(metric, axis=1, level="metric"),
+            check_exact=True,
+        )
+
+    wide_df.loc[3, "SPIRIT_NET_INCOME"] = np.nan
+    with pytest.raises(ValueError, match="missing values"):
+        compact_frame(wide_df, currency="int64")
+    with pytest.raises(ValueError):
+        compact_frame(wide_df, currency="float16")
+
+
+def test_compact_fact_table_matches_full_precision(wide_df):
+    facts = build_fact_table(compact_frame(wide_df), CLUSTER_MAP)
+    assert facts["value"].dtype == np.float32
+    assert facts["date"].dtype == "category"
+    assert facts["date"].cat.codes.dtype == np.int8
+
+    totals = cluster_totals(facts)
+    expected = cluster_totals(build_fact_table(wide_df, CLUSTER_MAP))
+    assert isinstance(totals.index, pd.DatetimeIndex)
+    pd.testing.assert_index_equal(totals.index, expected.index)
+    np.testing.assert_allclose(totals, expected, rtol=1e-5)
+
+
+def test_yearly_by_airline_is_one_long_table(wide_df):
+    long = yearly_by_airline(
+        wide_df, ["DELTA", "SPIRIT", "DELTA", "NOPE"], "NET_INCOME", "Income"
+    )
+    assert list(long.columns) == ["Year", "Income", "Airline"]
+    assert list(long["Airline"].cat.categories) == ["DELTA", "SPIRIT"]
+    spirit = long[long["Airline"] == "SPIRIT"].set_index("Year")["Income"]
+    expected = wide_df.groupby("Year")["SPIRIT_NET_INCOME"].sum()
+    np.testing.assert_allclose(spirit, expected)
+
+
+def test_melt_keeps_column_order_as_categories():
+    wide = pd.DataFrame({"Year": [1, 2], "b": [1.0, 2.0], "a": [3.0, 4.0]})
+    long = melt_for_plotting(wide, "Year", "Airline", "Value")
+    assert list(long["Airline"].cat.categories) == ["b", "a"]
+    assert list(long["Value"]) == [1.0, 2.0, 3.0, 4.0]
+
+
+def test_run_analysis_in_compact_mode(wide_df, tmp_path):
+    with render_mode("headless"):
+        figures = core.run_analysis(
+            wide_df,
+            output_dir=str(tmp_path),
+            stages=("plots",),
+            compact=True,
+        )
+    assert len(figures) == 12
@@ -0,0 +1,130 @@
+import functools
+import os
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+from sample import dataset
+
+
+def test_load_dataset_builds_and_reuses_cache(tmp_path, wide_df, monkeypatch):
+    source = tmp_path / "airlines.xlsx"
+    wide_df.to_excel(source, index=False)
+    cache_dir = str(tmp_path / "cache")
+
+    cold = dataset.load_dataset(str(source), cache_dir=cache_dir)
+    pd.testing.assert_frame_equal(
+        cold, wide_df, check_dtype=False, check_exact=False
+    )
+
+    def fail(*args, **kwargs):
+        raise AssertionError("warm load must not parse Excel")
+
+    monkeypatch.setattr(dataset.pd, "read_excel", fail)
+    warm = dataset.load_dataset(str(source), cache_dir=cache_dir)
+    pd.testing.assert_frame_equal(warm, cold)
+
+
+def test_load_dataset_invalidates_on_source_change(tmp_path, wide_df):
+    source = tmp_path / "airlines.xlsx"
+    wide_df.to_excel(source, index=False)
+    cache_dir = str(tmp_path / "cache")
+    dataset.load_dataset(str(source), cache_dir=cache_dir)
+
+    changed = wide_df.assign(DELTA_PASSENGER=1.0)
+    changed.to_excel(source, index=False)
+    os.utime(source, ns=(0, 0))
+
+    reloaded = dataset.load_dataset(str(source), cache_dir=cache_dir)
+    assert (reloaded["DELTA_PASSENGER"] == 1.0).all()
+    caches = [p for p in os.listdir(cache_dir) if "@" in p]
+    assert len(caches) == 1
+
+
+def test_load_dataset_restores_missing_strings(tmp_path):
+    source = tmp_path / "gaps.xlsx"
+    frame = pd.DataFrame({"Year": [2003, 2004], "Quarter": ["Q1", None]})
+    frame.to_excel(source, index=False)
+
+    loaded = dataset.load_dataset(str(source), cache_dir=str(tmp_path / "c"))
+    assert loaded["Quarter"].iloc[0] == "Q1"
+    assert pd.isna(loaded["Quarter"].iloc[1])
+
+
+def test_load_dataset_requires_existing_source(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        dataset.load_dataset(
+            str(tmp_path / "missing.xlsx"), cache_dir=str(tmp_path / "c")
+        )
+
+
+def test_same_named_workbooks_keep_separate_caches(tmp_path, wide_df):
+    cache_dir = str(tmp_path / "cache")
+    sources = []
+    for folder, rows in (("a", 10), ("b", 20)):
+        os.makedirs(tmp_path / folder)
+        source = tmp_path / folder / "airlines.xlsx"
+        wide_df.iloc[:rows].to_excel(source, index=False)
+        sources.append(str(source))
+    # Matching mtimes must not let one file's index serve the other.
+    stat = os.stat(sources[0])
+    for source in sources:
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    for _ in range(2):
+        first, second = (
+            dataset.load_dataset(s, cache_dir=cache_dir) for s in sources
+        )
+        assert len(first) == 10 and len(second) == 20
+    caches = [p for p in os.listdir(cache_dir) if "@" in p]
+    assert len(caches) == 2
+
+
+@pytest.fixture
+def workbook_server(tmp_path):
+    """Serves ``tmp_path / "site"`` over HTTP; yields (base URL, codes)."""
+    site = tmp_path / "site"
+    site.mkdir()
+    codes = []
+
+    class Handler(SimpleHTTPRequestHandler):
+        def log_request(self, code="-", size="-"):
+            codes.append(int(code))
+
+    handler = functools.partial(Handler, directory=str(site))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", codes
+    server.shutdown()
+    server.server_close()
+
+
+def test_workbook_urls_are_cached_per_url_and_refreshable(
+    tmp_path, wide_df, workbook_server
+):
+    base, codes = workbook_server
+    site, cache_dir = tmp_path / "site", str(tmp_path / "cache")
+    wide_df.iloc[:10].to_excel(site / "a.xlsx", index=False)
+    wide_df.iloc[:20].to_excel(site / "b.xlsx", index=False)
+
+    def load(name, refresh=False):
+        return dataset.load_dataset(
+            f"{base}/{name}", cache_dir=cache_dir, refresh=refresh
+        )
+
+    assert len(load("a.xlsx")) == 10
+    assert len(load("b.xlsx")) == 20
+    assert len(codes) == 2
+
+    # Unchanged on the server: the refresh is answered 304.
+    assert len(load("a.xlsx", refresh=True)) == 10
+    assert codes[-1] == 304
+
+    wide_df.iloc[:30].to_excel(site / "a.xlsx", index=False)
+    stat = os.stat(site / "a.xlsx")
+    os.utime(site / "a.xlsx", (stat.st_atime + 10, stat.st_mtime + 10))
+    assert len(load("a.xlsx")) == 10  # cached copy until refreshed
+    assert len(load("a.xlsx", refresh=True)) == 30
+    assert codes[-1] == 200
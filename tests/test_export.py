@@ -0,0 +1,52 @@
+import json
+import os
+
+import plotly.graph_objects as go
+from sample.export import (
+    PLOTLY_JS,
+    chart_filename,
+    write_dashboard,
+    write_figure,
+)
+
+
+def _figure():
+    return go.Figure(go.Scatter(x=[1, 2, 3], y=[4, 5, 6]))
+
+
+def test_chart_filename_replaces_unsafe_characters():
+    assert (
+        chart_filename("Financial Resilience Comparison: 2008-2010")
+        == "Financial Resilience Comparison- 2008-2010.html"
+    )
+
+
+def test_write_figure_references_shared_bundle(tmp_path):
+    out = str(tmp_path)
+    first = write_figure(_figure(), "First Chart", output_dir=out)
+    write_figure(_figure(), "Second Chart", output_dir=out)
+
+    assert os.path.exists(os.path.join(out, PLOTLY_JS))
+    with open(first, encoding="utf-8") as fh:
+        page = fh.read()
+    assert f'src="{PLOTLY_JS}"' in page
+    assert len(page) < 50_000
+
+
+def test_write_figure_json_spec(tmp_path):
+    path = write_figure(
+        _figure(), "Spec", output_dir=str(tmp_path), fmt="json"
+    )
+    with open(path) as fh:
+        assert json.load(fh)["data"][0]["type"] == "scatter"
+    assert not os.path.exists(tmp_path / PLOTLY_JS)
+
+
+def test_write_dashboard_combines_figures(tmp_path):
+    path = write_dashboard(
+        {"One": _figure(), "Two": _figure()}, str(tmp_path / "dashboard.html")
+    )
+    with open(path, encoding="utf-8") as fh:
+        page = fh.read()
+    assert page.count(f'src="{PLOTLY_JS}"') == 1
+    assert 'id="chart-0"' in page and 'id="chart-1"' in page
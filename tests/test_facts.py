@@ -0,0 +1,59 @@
+import numpy as np
+from sample.facts import (
+    assign_clusters,
+    build_fact_table,
+    cluster_totals,
+    yearly_cluster_metric,
+)
+
+CLUSTER_MAP = {
+    0: ["ALASKA", "AMERICAN", "DELTA", "SOUTHWEST", "UNITED"],
+    1: ["ALLEGIANT", "FRONTIER", "JETBLUE", "SPIRIT"],
+    2: ["SKYWEST", "HAWAIIN", "SUN_COUNTRY"],
+}
+
+
+def test_fact_table_is_long_and_categorical(wide_df):
+    facts = build_fact_table(wide_df, CLUSTER_MAP)
+    assert list(facts.columns) == [
+        "date",
+        "airline",
+        "cluster",
+        "metric",
+        "value",
+    ]
+    assert len(facts) == len(wide_df) * 36
+    for col in ["airline", "cluster", "metric"]:
+        assert facts[col].dtype == "category"
+
+
+def test_cluster_totals_match_wide_sums(wide_df):
+    totals = cluster_totals(build_fact_table(wide_df, CLUSTER_MAP))
+    expected = wide_df[
+        ["ALLEGIANT_NET_INCOME", "FRONTIER_NET_INCOME"]
+        + ["JETBLUE_NET_INCOME", "SPIRIT_NET_INCOME"]
+    ].sum(axis=1)
+    np.testing.assert_allclose(totals[(1, "NET_INCOME")], expected)
+
+    yearly = yearly_cluster_metric(totals, "PASSENGER")
+    assert list(yearly.columns) == [
+        "Year",
+        "Cluster 0",
+        "Cluster 1",
+        "Cluster 2",
+    ]
+    assert yearly["Year"].tolist() == list(range(2003, 2024))
+
+
+def test_assign_clusters_regroups_without_rebuilding(wide_df):
+    facts = build_fact_table(wide_df, CLUSTER_MAP)
+    groups = {"Regional": ["ALASKA", "HAWAIIN", "SKYWEST"]}
+    totals = cluster_totals(assign_clusters(facts, groups))
+    expected = wide_df[
+        ["ALASKA_OPERTING_REVENUE", "HAWAIIN_OPERATING_REVENUE"]
+        + ["SKYWEST_OPERATING_REVENUE"]
+    ].sum(axis=1)
+    np.testing.assert_allclose(
+        totals[("Regional", "OPERATING_REVENUE")], expected
+    )
+    assert set(totals.columns.get_level_values("cluster")) == {"Regional"}
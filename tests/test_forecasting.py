@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+from sample import core
+from sample.forecasting import run_forecasts
+
+
+def _quarterly_series(wide_df, col):
+    index = pd.date_range("2003-01-01", periods=len(wide_df), freq="QS")
+    return pd.Series(wide_df[col].to_numpy(), index=index)
+
+
+def test_run_forecasts_is_deterministic_across_worker_counts(wide_df):
+    series_by_key = {
+        ("Passengers", "Legacy"): _quarterly_series(
+            wide_df, "DELTA_PASSENGER"
+        ),
+        ("Revenue", "LCC"): _quarterly_series(
+            wide_df, "SPIRIT_OPERATING_REVENUE"
+        ),
+    }
+    serial = run_forecasts(
+        series_by_key, core.smooth_forecast, horizon=4, n_workers=1, seed=7
+    )
+    pooled = run_forecasts(
+        series_by_key, core.smooth_forecast, horizon=4, n_workers=2, seed=7
+    )
+
+    assert list(serial) == list(series_by_key)
+    for key in series_by_key:
+        assert len(serial[key]["Forecast"]) == 4
+        np.testing.assert_allclose(
+            serial[key]["Forecast"], pooled[key]["Forecast"]
+        )
+        np.testing.assert_array_equal(
+            serial[key]["CI_Lower"], pooled[key]["CI_Lower"]
+        )
+        assert serial[key]["RMSE"] >= serial[key]["MAE"]
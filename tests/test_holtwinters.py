@@ -0,0 +1,82 @@
+import warnings
+
+import numpy as np
+import pytest
+from sample.holtwinters import HoltWintersBatch, forecast_airlines
+from statsmodels.tsa.holtwinters import ExponentialSmoothing
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(3)
+    t = np.arange(48)
+    slope = rng.uniform(0.5, 2, (4, 1))
+    amplitude = rng.uniform(5, 15, (4, 1))
+    return (
+        100
+        + slope * t
+        + amplitude * np.sin(np.pi * t / 2)
+        + rng.normal(0, 2, (4, 48))
+    )
+
+
+def _statsmodels(model, i):
+    level, trend, seasons = model.initial
+    return ExponentialSmoothing(
+        model.values[i],
+        trend="add",
+        seasonal=model.seasonal,
+        seasonal_periods=4,
+        initialization_method="known",
+        initial_level=level[i],
+        initial_trend=trend[i],
+        initial_seasonal=seasons[i],
+    )
+
+
+@pytest.mark.parametrize("seasonal", ["add", "mul"])
+def test_fixed_parameters_match_statsmodels(series, seasonal):
+    model = HoltWintersBatch(series, seasonal).fit(smoothing=(0.3, 0.1, 0.2))
+    forecast = model.forecast(10)
+    for i in range(len(series)):
+        expected = _statsmodels(model, i).fit(
+            smoothing_level=0.3,
+            smoothing_trend=0.1,
+            smoothing_seasonal=0.2,
+            optimized=False,
+        )
+        np.testing.assert_allclose(
+            model.fittedvalues[i], expected.fittedvalues
+        )
+        np.testing.assert_allclose(forecast[i], expected.forecast(10))
+
+
+@pytest.mark.parametrize("seasonal", ["add", "mul"])
+def test_optimised_fit_is_as_good_as_statsmodels(series, seasonal):
+    model = HoltWintersBatch(series, seasonal).fit()
+    assert ((model.params >= 0) & (model.params <= 1)).all()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for i in range(len(series)):
+            expected = _statsmodels(model, i).fit()
+            assert model.sse[i] <= expected.sse * (1 + 1e-4)
+
+
+def test_forecast_airlines(wide_df):
+    fitted, forecast = forecast_airlines(wide_df, "PASSENGER", steps=8)
+    assert fitted.shape == (84, 12)
+    assert forecast.shape == (8, 12)
+    assert str(forecast.index[0].date()) == "2024-01-01"
+    assert (forecast.index.month == [1, 4, 7, 10, 1, 4, 7, 10]).all()
+    assert "HAWAIIN" in forecast.columns
+
+
+def test_rejects_unusable_series(series):
+    with pytest.raises(ValueError):
+        HoltWintersBatch(-series, "mul")
+    with pytest.raises(ValueError):
+        HoltWintersBatch(series[:, :6])
+    gappy = series.copy()
+    gappy[0, 3] = np.nan
+    with pytest.raises(ValueError):
+        HoltWintersBatch(gappy)
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+from sample import core
+from sample.facts import build_fact_table, cluster_totals
+from sample.incremental import RefreshState
+
+CLUSTER_MAP = {
+    0: ["ALASKA", "AMERICAN", "DELTA", "SOUTHWEST", "UNITED"],
+    1: ["ALLEGIANT", "FRONTIER", "JETBLUE", "SPIRIT"],
+    2: ["SKYWEST", "HAWAIIN", "SUN_COUNTRY"],
+}
+
+
+def _run(state_dir, df):
+    state = RefreshState(str(state_dir))
+    plan = state.plan(df, {"clusters": CLUSTER_MAP})
+    totals = state.totals("clusters", df, CLUSTER_MAP)
+    state.save()
+    return plan, totals
+
+
+def test_plan_detects_new_quarters_and_revisions(wide_df, tmp_path):
+    plan, _ = _run(tmp_path, wide_df.iloc[:-1])
+    assert plan.full
+
+    plan, _ = _run(tmp_path, wide_df.iloc[:-1])
+    assert not plan.full and plan.changed_columns == []
+    assert not plan.affects(["PASSENGER"])
+
+    revised = wide_df.copy()
+    revised.loc[3, "SPIRIT_NET_INCOME"] += 1.0
+    plan, totals = _run(tmp_path, revised)
+    assert plan.new_rows == ["2023Q4"]
+    assert plan.revised_columns == ["SPIRIT_NET_INCOME"]
+    assert len(plan.appended_columns) == 36
+
+    expected = cluster_totals(build_fact_table(revised, CLUSTER_MAP))
+    pd.testing.assert_frame_equal(
+        totals.sort_index(axis=1), expected.sort_index(axis=1)
+    )
+
+
+def test_plan_treats_removed_columns_as_changed(wide_df, tmp_path):
+    _run(tmp_path, wide_df)
+    dropped = wide_df.drop(columns=["SPIRIT_NET_INCOME"])
+    plan, totals = _run(tmp_path, dropped)
+
+    assert not plan.full
+    assert plan.removed_columns == ["SPIRIT_NET_INCOME"]
+    assert plan.changed == {("SPIRIT", "NET_INCOME")}
+    assert plan.affects(["NET_INCOME"]) and not plan.affects(["PASSENGER"])
+    expected = cluster_totals(build_fact_table(dropped, CLUSTER_MAP))
+    pd.testing.assert_frame_equal(
+        totals.sort_index(axis=1), expected.sort_index(axis=1)
+    )
+
+
+def test_forecasts_refit_only_changed_series(wide_df, tmp_path):
+    index = pd.date_range("2003-01-01", periods=len(wide_df), freq="QS")
+    series = {
+        ("Passengers", "Legacy"): pd.Series(
+            wide_df["DELTA_PASSENGER"].to_numpy(), index=index
+        ),
+        ("Revenue", "LCC"): pd.Series(
+            wide_df["SPIRIT_OPERATING_REVENUE"].to_numpy(), index=index
+        ),
+    }
+
+    state = RefreshState(str(tmp_path))
+    first = state.forecasts(series, core.smooth_forecast, 4, n_workers=1)
+    state.save()
+    assert len(state.refitted) == 2
+
+    state = RefreshState(str(tmp_path))
+    changed = dict(series)
+    changed[("Revenue", "LCC")] = series[("Revenue", "LCC")] * 1.01
+    second = state.forecasts(changed, core.smooth_forecast, 4, n_workers=1)
+    assert state.refitted == [("Revenue", "LCC")]
+    np.testing.assert_array_equal(
+        second[("Passengers", "Legacy")]["Forecast"],
+        first[("Passengers", "Legacy")]["Forecast"],
+    )
+    np.testing.assert_allclose(
+        second[("Revenue", "LCC")]["Forecast"],
+        first[("Revenue", "LCC")]["Forecast"] * 1.01,
+        rtol=0.05,
+    )
+
+
+def test_forecasts_refit_when_the_model_changes(wide_df, tmp_path):
+    index = pd.date_range("2003-01-01", periods=len(wide_df), freq="QS")
+    key = ("Passengers", "Legacy")
+    series = {key: pd.Series(wide_df["DELTA_PASSENGER"].to_numpy(), index)}
+    state = RefreshState(str(tmp_path))
+    state.forecasts(series, core.smooth_forecast, 4, n_workers=1)
+    state.save()
+
+    # Same data, new configuration: refit cold, since the stored
+    # parameters belong to the old model's layout.
+    damped = {**core.DEFAULT_CONFIG, "damped_trend": True, "seasonal": None}
+    state = RefreshState(str(tmp_path))
+    results = state.forecasts(
+        series, core.smooth_forecast, 4, n_workers=1, configs={key: damped}
+    )
+    assert state.refitted == [key]
+    _, expected, _ = core.smooth_forecast(series[key], 4, config=damped)
+    np.testing.assert_allclose(results[key]["Forecast"], expected)
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sample.catalog import ColumnCatalog
+from sample.helpers import extract_airlines
+from sample.ingest import ingest, read_extract
+
+
+@pytest.fixture
+def extracts(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 2000
+    segments = pd.DataFrame(
+        {
+            "PASSENGERS": rng.integers(0, 300, n).astype(float),
+            "UNIQUE_CARRIER": rng.choice(["AA", "DL", "HA", "ZZ"], n),
+            "YEAR": rng.choice([2021, 2022], n),
+            "QUARTER": rng.integers(1, 5, n),
+            "ORIGIN": "JFK",
+        }
+    )
+    financials = pd.DataFrame(
+        {
+            "NET_INCOME": rng.normal(size=40),
+            "OP_REVENUES": rng.uniform(1, 10, 40),
+            "UNIQUE_CARRIER": ["AA", "DL", "HA", "ZZ"] * 10,
+            "YEAR": np.repeat([2021, 2022], 20),
+            "QUARTER": np.tile(np.repeat([1, 2, 3, 4, 1], 4), 2),
+        }
+    )
+    t100 = tmp_path / "t100.csv"
+    form41 = tmp_path / "p12.csv.gz"
+    segments.to_csv(t100, index=False)
+    financials.to_csv(form41, index=False)
+    return segments, financials, str(t100), str(form41)
+
+
+def test_chunked_totals_match_groupby(extracts):
+    segments, _, t100, _ = extracts
+    totals = read_extract(t100, {"PASSENGERS": "PASSENGER"}, chunksize=97)
+    known = segments[segments["UNIQUE_CARRIER"] != "ZZ"]
+    expected = known.groupby(["UNIQUE_CARRIER", "YEAR", "QUARTER"])[
+        "PASSENGERS"
+    ].sum()
+    assert len(totals) == len(expected)
+    np.testing.assert_allclose(
+        totals.loc[("AMERICAN", 2022, "Q3"), "PASSENGER"],
+        expected.loc[("AA", 2022, 3)],
+    )
+
+
+def test_ingest_builds_workbook_columns(extracts, tmp_path):
+    _, financials, t100, form41 = extracts
+    output = tmp_path / "bts.xlsx"
+    wide = ingest(t100, [form41], chunksize=250, output=str(output))
+
+    assert list(wide.columns[:2]) == ["Year", "Quarter"]
+    assert len(wide) == 8
+    assert sorted(extract_airlines(wide)) == ["AMERICAN", "DELTA", "HAWAIIN"]
+    catalog = ColumnCatalog.for_frame(wide)
+    assert catalog.complete_airlines(
+        ["PASSENGER", "NET_INCOME", "OPERATING_REVENUE"]
+    ) == ["AMERICAN", "DELTA", "HAWAIIN"]
+
+    delta_q1 = financials[
+        (financials["UNIQUE_CARRIER"] == "DL")
+        & (financials["YEAR"] == 2021)
+        & (financials["QUARTER"] == 1)
+    ]["NET_INCOME"].sum()
+    row = wide[(wide["Year"] == 2021) & (wide["Quarter"] == "Q1")]
+    assert np.isclose(row["DELTA_NET_INCOME"].item(), delta_q1)
+    pd.testing.assert_frame_equal(
+        pd.read_excel(output), wide, check_dtype=False
+    )
+
+
+def test_monthly_extract_rolls_up_to_quarters(tmp_path):
+    path = tmp_path / "monthly.csv"
+    pd.DataFrame(
+        {
+            "CARRIER": ["WN"] * 6,
+            "YEAR": [2020] * 6,
+            "MONTH": [1, 2, 3, 4, 5, 12],
+            "PASSENGERS": [1.0, 2, 3, 4, 5, 6],
+        }
+    ).to_csv(path, index=False)
+    wide = ingest(t100_paths=[str(path)])
+    assert list(wide["Quarter"]) == ["Q1", "Q2", "Q4"]
+    assert list(wide["SOUTHWEST_PASSENGER"]) == [6, 9, 6]
+
+
+def test_ingest_requires_extracts():
+    with pytest.raises(ValueError):
+        ingest()
@@ -0,0 +1,34 @@
+import numpy as np
+from sample.helpers import monte_carlo_batch, monte_carlo_forecast
+
+
+def test_monte_carlo_forecast_is_seeded():
+    forecast = np.linspace(100.0, 120.0, 8)
+    residuals = np.random.default_rng(1).normal(0, 5, 30)
+    first = monte_carlo_forecast(forecast, residuals, seed=3)
+    second = monte_carlo_forecast(forecast, residuals, seed=3)
+    np.testing.assert_array_equal(first[0], second[0])
+    assert np.all(first[0] < forecast) and np.all(first[1] > forecast)
+
+
+def test_chunked_mode_matches_dense_percentiles():
+    forecast = np.linspace(100.0, 120.0, 8)
+    residuals = np.random.default_rng(1).normal(0, 5, 30)
+    dense = monte_carlo_forecast(
+        forecast, residuals, n_simulations=5000, seed=11
+    )
+    chunked = monte_carlo_forecast(
+        forecast, residuals, n_simulations=5000, seed=11, chunk_size=512
+    )
+    np.testing.assert_allclose(dense, chunked, atol=0.5)
+
+
+def test_batch_handles_ragged_residuals():
+    forecasts = np.array([[10.0, 11.0, 12.0], [50.0, 50.0, 50.0]])
+    residuals = [np.array([-1.0, 0.0, 1.0]), np.array([-5.0, 5.0])]
+    lower, upper = monte_carlo_batch(
+        forecasts, residuals, n_simulations=2000, seed=0, chunk_size=300
+    )
+    assert lower.shape == upper.shape == (2, 3)
+    np.testing.assert_allclose(lower[0], forecasts[0] - 1)
+    np.testing.assert_allclose(upper[1], forecasts[1] + 5)
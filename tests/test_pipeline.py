@@ -0,0 +1,58 @@
+import os
+
+import pytest
+from sample import core
+from sample.pipeline import ExportPipeline
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_pipeline_writes_every_chart(wide_df, tmp_path, executor):
+    pipeline = ExportPipeline(
+        output_dir=str(tmp_path), max_workers=2, executor=executor
+    )
+    pipeline.add(core.plot_market_share_volatility, wide_df)
+    pipeline.add(core.plot_airline_performance_index, wide_df, 2004, 2008)
+    pipeline.add(
+        core.plot_market_share_volatility, wide_df, name="Volatility Copy"
+    )
+
+    report = pipeline.run()
+
+    assert list(report["chart"]) == [
+        "Market Share Volatility",
+        "Performance Index by Individual Airline (2004-2008)",
+        "Volatility Copy",
+    ]
+    assert (report[["build_seconds", "write_seconds"]] >= 0).all().all()
+    assert (report["payload_bytes"] > 0).all()
+    for path in report["path"]:
+        assert os.path.exists(path)
+    assert len(pipeline.figures) == (3 if executor == "thread" else 0)
+
+
+def test_pipeline_rejects_duplicate_names():
+    pipeline = ExportPipeline()
+    pipeline.add(core.plot_market_share_volatility, None, name="Chart")
+    with pytest.raises(ValueError):
+        pipeline.add(core.plot_market_share_volatility, None, name="Chart")
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_pipeline_rejects_unnamed_charts_sharing_a_title(
+    wide_df, tmp_path, executor
+):
+    pipeline = ExportPipeline(output_dir=str(tmp_path), executor=executor)
+    pipeline.add(core.plot_market_share_volatility, wide_df)
+    pipeline.add(core.plot_market_share_volatility, wide_df)
+    with pytest.raises(ValueError, match="Market Share Volatility"):
+        pipeline.run()
+
+    pipeline = ExportPipeline(output_dir=str(tmp_path), executor=executor)
+    pipeline.add(core.plot_market_share_volatility, wide_df)
+    pipeline.add(
+        core.plot_market_share_volatility,
+        wide_df,
+        name="Market Share Volatility",
+    )
+    with pytest.raises(ValueError):
+        pipeline.run()
@@ -0,0 +1,88 @@
+import json
+import pstats
+
+import pytest
+from sample import core, profiling
+
+
+@pytest.fixture(autouse=True)
+def profiling_on():
+    profiling.configure_profiling(enabled=True, memory=True, profile_stage="")
+    profiling.reset()
+    yield
+    profiling.configure_profiling(enabled=False, profile_stage="")
+    profiling.reset()
+
+
+def test_stage_counts_time_and_memory():
+    for _ in range(3):
+        with profiling.stage("outer"):
+            with profiling.stage("inner"):
+                data = bytearray(8 << 20)
+            del data
+
+    report = profiling.report().set_index("stage")
+    assert report.loc["outer", "count"] == 3
+    assert report.loc["inner", "count"] == 3
+    assert (
+        report.loc["outer", "wall_seconds"]
+        >= report.loc["inner", "wall_seconds"]
+    )
+    assert report.loc["inner", "peak_mb"] >= 8
+    assert report.loc["outer", "peak_mb"] >= 8
+
+
+def test_disabled_stages_record_nothing():
+    profiling.configure_profiling(enabled=False)
+
+    @profiling.profiled
+    def work():
+        return 1
+
+    with profiling.stage("skipped"):
+        assert work() == 1
+    assert profiling.report().empty
+
+
+def test_reports_and_stage_profile(tmp_path):
+    profiling.configure_profiling(memory=False, profile_stage="hot")
+
+    @profiling.profiled("hot")
+    def hot():
+        return sum(i * i for i in range(10000))
+
+    hot()
+    hot()
+    paths = profiling.write_report(str(tmp_path / "profile.json"))
+
+    assert [p.rsplit("/", 1)[-1] for p in paths] == [
+        "profile.json",
+        "hot.pstats",
+    ]
+    with open(paths[0]) as fh:
+        rows = json.load(fh)
+    assert rows[0]["stage"] == "hot" and rows[0]["count"] == 2
+    assert pstats.Stats(paths[1]).total_calls > 0
+
+    profiling.write_report(str(tmp_path / "profile.csv"))
+    assert (tmp_path / "profile.csv").read_text().startswith("stage,count")
+    with pytest.raises(ValueError):
+        profiling.write_report(str(tmp_path / "profile.txt"))
+
+
+def test_run_analysis_profiles_only_its_own_run(wide_df, tmp_path, capsys):
+    profiling.configure_profiling(enabled=False)
+    report = tmp_path / "stages.json"
+    core.run_analysis(
+        wide_df,
+        output_dir=str(tmp_path),
+        render_mode="export-only",
+        stages=("plots",),
+        profile=str(report),
+    )
+    assert not profiling.profiling_enabled()
+    stages = {row["stage"] for row in json.loads(report.read_text())}
+    assert "aggregates" in stages
+    out = capsys.readouterr().out
+    assert f"Stage profile written to {report}" in out
+    assert "wall_seconds" not in out
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+from sample import helpers, ranges
+from sample.ranges import PerformanceIndex, rolling_windows
+
+
+def _reference_sums(df, start_year, end_year):
+    df_range = df[(df["Year"] >= start_year) & (df["Year"] <= end_year)]
+    return pd.DataFrame(
+        {
+            "Revenue": df_range["DELTA_AIR_LINE_OPERATING_REVENUE"].sum(),
+            "Net Income": df_range["DELTA_AIRLINE_NET_INCOME"].sum(),
+            "Passengers": df_range["DELTA_PASSENGER"].sum(),
+        },
+        index=["DELTA"],
+    )
+
+
+def test_window_sums_match_filtered_sums(wide_df):
+    index = PerformanceIndex(wide_df)
+    scores = index.score(2007, 2012).set_index("Airline")
+    expected = _reference_sums(wide_df, 2007, 2012)
+    np.testing.assert_allclose(
+        scores.loc[["DELTA"], expected.columns], expected, rtol=1e-12
+    )
+    assert scores["Performance Score"].between(0, 1).all()
+
+
+def test_score_matches_range_helper(wide_df):
+    ranked = helpers.test_airline_performance_by_range(wide_df, 2003, 2023)
+    assert list(ranked.columns) == [
+        "Airline",
+        "Revenue",
+        "Net Income",
+        "Passengers",
+        "Revenue (Norm)",
+        "Net Income (Norm)",
+        "Passengers (Norm)",
+        "Performance Score",
+    ]
+    assert ranked["Performance Score"].is_monotonic_decreasing
+    assert len(ranked) == 12
+
+
+def test_score_windows_batches_rolling_windows(wide_df):
+    index = PerformanceIndex(wide_df)
+    windows = rolling_windows(5)
+    assert windows[0].tolist() == [2003, 2007]
+    assert windows[-1].tolist() == [2019, 2023]
+
+    batch = index.score_windows(windows)
+    assert len(batch) == len(windows) * len(index.airlines)
+    single = index.score(2010, 2014).set_index("Airline")
+    window = batch[batch["Start Year"] == 2010].set_index("Airline")
+    np.testing.assert_allclose(
+        window.loc[single.index, "Performance Score"],
+        single["Performance Score"],
+    )
+
+
+def test_range_queries_reuse_the_frame_index(wide_df, monkeypatch):
+    first = helpers.test_airline_performance_by_range(wide_df, 2004, 2010)
+    first["Performance Score"] = -1.0
+
+    def rebuild(df):
+        raise AssertionError("index rebuilt for the same frame")
+
+    monkeypatch.setattr(ranges, "PerformanceIndex", rebuild)
+    second = helpers.test_airline_performance_by_range(wide_df, 2004, 2010)
+    assert second["Performance Score"].between(0, 1).all()
+
+
+def test_range_queries_see_in_place_changes(wide_df):
+    df = wide_df.copy()
+    before = helpers.test_airline_performance_by_range(df, 2003, 2023)
+    assert before["Airline"].iloc[0] != "DELTA"
+
+    df["DELTA_PASSENGER"] *= 100
+    df.loc[:, "DELTA_AIR_LINE_OPERATING_REVENUE"] = 1e15
+    after = helpers.test_airline_performance_by_range(df, 2003, 2023)
+    fresh = PerformanceIndex(df).score(2003, 2023)
+    pd.testing.assert_frame_equal(after, fresh)
+    assert after["Airline"].iloc[0] == "DELTA"
@@ -0,0 +1,73 @@
+import os
+import subprocess
+import sys
+
+import plotly.graph_objects as go
+import pytest
+from sample import core, export
+
+
+@pytest.fixture
+def no_show(monkeypatch):
+    shown = []
+    monkeypatch.setattr(go.Figure, "show", lambda self: shown.append(self))
+    yield shown
+    export.set_render_mode("interactive")
+    export.configure_export(output_dir=".")
+
+
+def test_headless_mode_writes_without_showing(wide_df, tmp_path, no_show):
+    export.configure_export(output_dir=str(tmp_path))
+    export.set_render_mode("headless")
+
+    fig = core.plot_market_share_volatility(wide_df)
+
+    assert isinstance(fig, go.Figure)
+    assert no_show == []
+    assert os.path.exists(tmp_path / "Market Share Volatility.html")
+
+
+def test_export_only_mode_returns_figures_unwritten(
+    wide_df, tmp_path, no_show
+):
+    export.configure_export(output_dir=str(tmp_path))
+    with export.render_mode("export-only"):
+        fig = core.plot_airline_performance_index(wide_df, 2005, 2010)
+    assert export.get_render_mode() == "interactive"
+
+    assert export.figure_title(fig).endswith("(2005-2010)")
+    assert no_show == []
+    assert os.listdir(tmp_path) == []
+
+
+def test_set_render_mode_rejects_unknown_modes():
+    with pytest.raises(ValueError):
+        export.set_render_mode("batch")
+
+
+def test_run_analysis_render_mode_applies_to_that_run(
+    wide_df, tmp_path, no_show
+):
+    figures = core.run_analysis(
+        wide_df,
+        output_dir=str(tmp_path),
+        chart_format="json",
+        render_mode="export-only",
+        stages=("plots",),
+    )
+    assert len(figures) == 12 and no_show == []
+    assert len(list(tmp_path.glob("*.json"))) == 12
+    assert export.get_render_mode() == "interactive"
+    assert export.resolve_output() == (".", "html")
+
+
+def test_render_mode_environment_is_validated_on_import():
+    env = {**os.environ, "AIRLINE_RENDER_MODE": "batch"}
+    out = subprocess.run(
+        [sys.executable, "-c", "import sample.export"],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    assert out.returncode != 0
+    assert "AIRLINE_RENDER_MODE 'batch'" in out.stderr
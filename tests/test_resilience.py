@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+from sample import core, helpers
+from sample.resilience import ResilienceEngine
+
+
+def _reference_rate(df, cols, year_before, year_after):
+    totals = df[cols].sum(axis=1, min_count=1)
+    pre = totals[df["Year"] == year_before].mean()
+    post = totals[df["Year"] == year_after].mean()
+    return (post - pre) / pre * 100
+
+
+def test_recovery_rates_match_filtered_means(wide_df):
+    df = wide_df.copy()
+    df.loc[df["Year"] == 2007, "FRONTIER_NET_INCOME"] = np.nan
+    engine = ResilienceEngine(df, core.RESILIENCE_GROUPS)
+    rates = engine.recovery_rates([(2007, 2010), (2018, 2022)])
+    for label, cols in core.RESILIENCE_GROUPS.items():
+        for pre, post in [(2007, 2010), (2018, 2022)]:
+            expected = _reference_rate(df, cols, pre, post)
+            assert np.isclose(rates.loc[(pre, post), label], expected)
+
+
+def test_calc_recovery_rate_per_column(wide_df):
+    cols = ["DELTA_AIRLINE_NET_INCOME", "ALASKA_NET_INCOME"]
+    rates = helpers.calc_recovery_rate.uncached(wide_df, 2007, 2010, cols)
+    pre = wide_df[wide_df["Year"] == 2007][cols].mean()
+    post = wide_df[wide_df["Year"] == 2010][cols].mean()
+    pd.testing.assert_series_equal(rates, (post - pre) / pre * 100)
+
+
+def test_sweep_over_groupings(wide_df):
+    engine = ResilienceEngine.for_groupings(
+        wide_df,
+        {
+            "size": {"big": ["DELTA", "UNITED"], "small": ["SPIRIT"]},
+            "single": {"alaska": ["ALASKA"]},
+        },
+    )
+    sweep = engine.sweep(range(2005, 2009), [2008, 2010, 2030])
+    # 3 + 4 + 4 valid (pre, post) pairs, three groups each.
+    assert len(sweep) == 11 * 3
+    assert (sweep["Pre Year"] < sweep["Recovery Year"]).all()
+    assert set(sweep["Group"]) == {
+        ("size", "big"),
+        ("size", "small"),
+        ("single", "alaska"),
+    }
+    assert (
+        sweep.loc[sweep["Recovery Year"] == 2030, "Recovery Rate"].isna().all()
+    )
+    assert (
+        sweep.loc[sweep["Recovery Year"] < 2030, "Recovery Rate"].notna().all()
+    )
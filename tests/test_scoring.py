@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sample import helpers
+from sample.scoring import combine, composite_score, normalize
+
+
+def _block():
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=(50, 4)) * [1, 10, 100, 1000]
+    values[[3, 17], 1] = np.nan
+    values[:, 3] = 7.0
+    return values
+
+
+def test_methods_match_column_by_column_pandas():
+    values = _block()
+    frame = pd.DataFrame(values)
+    expected = {
+        "minmax": (frame - frame.min()) / (frame.max() - frame.min()),
+        "zscore": (frame - frame.mean()) / frame.std(ddof=0),
+        "robust": (frame - frame.median())
+        / (frame.quantile(0.75) - frame.quantile(0.25)),
+    }
+    for method, reference in expected.items():
+        got = normalize(values, method)
+        np.testing.assert_allclose(got[:, :3], reference.iloc[:, :3])
+        assert np.isnan(got[[3, 17], 1]).all()
+        # No spread: zeros instead of a division by zero.
+        assert (got[:, 3] == 0).all()
+
+    with pytest.raises(ValueError):
+        normalize(values, "rank")
+
+
+def test_normalize_in_place_and_along_any_axis():
+    values = _block()
+    expected = normalize(values)
+    out = values.copy()
+    assert normalize(out, out=out) is out
+    np.testing.assert_array_equal(out, expected)
+
+    stacked = np.stack([values.T, 2 * values.T])
+    np.testing.assert_allclose(normalize(stacked, axis=2)[1], expected.T)
+
+
+def test_composite_score_weights_and_skips_missing_metrics():
+    normalized, score = composite_score(
+        [[1.0, 10.0], [3.0, np.nan], [2.0, 30.0]], weights=[1, 3]
+    )
+    np.testing.assert_allclose(
+        normalized, [[0, 0], [1, np.nan], [0.5, 1]], equal_nan=True
+    )
+    np.testing.assert_allclose(score, [0, 1, 0.875])
+    assert np.isnan(combine([[np.nan, np.nan]]))[0]
+    with pytest.raises(ValueError):
+        combine(normalized, weights=[1, 2, 3])
+
+
+def test_helpers_use_the_kernel(wide_df):
+    cols = helpers.extract_columns(wide_df, ["DELTA", "SPIRIT"], "PASSENGER")
+    normed = helpers.normalize_columns(wide_df, cols)
+    np.testing.assert_allclose(normed[cols].min(), 0)
+    np.testing.assert_allclose(normed[cols].max(), 1)
+    assert wide_df[cols].max().gt(1).all()
+
+    perf = pd.DataFrame(
+        {
+            "Airline": ["A", "B", "C"],
+            "Total Revenue": [1.0, 2.0, 3.0],
+            "Total Net Income": [5.0, 5.0, 5.0],
+            "Avg Passenger Growth Rate": [0.3, 0.1, 0.2],
+        }
+    )
+    ranked = helpers.normalize_performance(perf)
+    assert ranked["Airline"].tolist() == ["C", "A", "B"]
+    assert ranked["Overall Score"].notna().all()
@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+from sample import core, helpers, selection
+from sample.cache import ResultCache
+from sample.forecasting import run_forecasts
+from sample.selection import (
+    candidate_configs,
+    config_name,
+    select_model,
+    select_models,
+)
+
+
+def _series(wide_df, col):
+    index = pd.date_range("2003-01-01", periods=len(wide_df), freq="QS")
+    return pd.Series(wide_df[col].to_numpy(), index=index)
+
+
+def test_candidates_respect_sign_of_data(wide_df):
+    positive = candidate_configs(_series(wide_df, "DELTA_PASSENGER"))
+    mixed = candidate_configs(_series(wide_df, "DELTA_AIRLINE_NET_INCOME"))
+    assert len(positive) == 18
+    assert {config_name(c) for c in mixed} == {
+        "N,N",
+        "N,A",
+        "A,N",
+        "A,A",
+        "Ad,N",
+        "Ad,A",
+    }
+
+
+def test_aic_selection_prunes_and_caches(wide_df):
+    series = _series(wide_df, "DELTA_PASSENGER")
+    cache = ResultCache()
+    chosen = select_model(series, n_workers=1, cache=cache)
+
+    assert chosen["config"]["seasonal"] is not None
+    stages = chosen["scores"].groupby("Stage").size()
+    assert stages[1] == 18 and stages[2] < 18
+    assert chosen["name"] in set(
+        chosen["scores"].loc[chosen["scores"]["Stage"] == 2, "Candidate"]
+    )
+
+    again = select_model(series, n_workers=2, cache=cache)
+    assert again is chosen and cache.hits == 1
+    select_model(series * 1.01, n_workers=1, cache=cache)
+    assert cache.misses == 2
+
+
+def test_backtest_selection_halves_candidates(wide_df):
+    series = _series(wide_df, "DELTA_AIRLINE_NET_INCOME")
+    chosen = select_model(
+        series,
+        criterion="backtest",
+        initial=64,
+        rounds=3,
+        n_workers=1,
+        cache=ResultCache(),
+    )
+    stages = chosen["scores"].groupby("Stage").size()
+    assert stages[1] == 6
+    assert list(stages) == sorted(stages, reverse=True)
+    assert np.isfinite(chosen["scores"]["Score"]).all()
+
+
+def test_select_models_fits_every_series_per_round_in_one_map(
+    wide_df, monkeypatch
+):
+    series_by_key = {
+        col: _series(wide_df, col)
+        for col in ["DELTA_PASSENGER", "SPIRIT_PASSENGER"]
+    }
+    expected = {
+        key: select_model(series, n_workers=1, cache=ResultCache())
+        for key, series in series_by_key.items()
+    }
+
+    calls = []
+
+    def counting_map(func, tasks, n_workers=None):
+        calls.append(len(tasks))
+        return [func(task) for task in tasks]
+
+    monkeypatch.setattr(selection, "parallel_map", counting_map)
+    chosen = select_models(series_by_key, n_workers=2, cache=ResultCache())
+    # Quick fits of 2 x 18 candidates, then one refit of all survivors.
+    assert len(calls) == 2 and calls[0] == 36
+    for key, selected in chosen.items():
+        assert selected["name"] == expected[key]["name"]
+        pd.testing.assert_frame_equal(
+            selected["scores"], expected[key]["scores"]
+        )
+
+
+def test_smooth_forecast_uses_given_config(wide_df):
+    series = _series(wide_df, "DELTA_PASSENGER")
+    config = {
+        "trend": "add",
+        "damped_trend": True,
+        "seasonal": None,
+        "use_boxcox": False,
+    }
+    _, forecast, model_fit = helpers.smooth_forecast.uncached(
+        series, "Passengers", 4, config=config
+    )
+    assert len(forecast) == 4
+    assert model_fit.model.damped_trend
+    assert not model_fit.model.has_seasonal
+
+
+def test_selections_persist_on_disk_and_drive_forecasts(
+    wide_df, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(
+        selection, "selection_cache", ResultCache(directory=str(tmp_path))
+    )
+    key = ("Passengers", "Legacy")
+    series = {key: _series(wide_df, "DELTA_PASSENGER")}
+    configs = core.select_configs(series, "aic", n_workers=1)
+
+    # A later run (a fresh process) finds the choice on disk.
+    later = ResultCache(directory=str(tmp_path))
+    monkeypatch.setattr(selection, "selection_cache", later)
+    assert core.select_configs(series, "aic", n_workers=1) == configs
+    assert later.hits == 1 and later.misses == 0
+
+    results = run_forecasts(
+        series, core.smooth_forecast, 4, n_workers=1, configs=configs
+    )
+    _, expected, _ = core.smooth_forecast(series[key], 4, config=configs[key])
+    np.testing.assert_allclose(results[key]["Forecast"], expected)
@@ -0,0 +1,122 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from sample import service
+from sample.service import DashboardData, DashboardService
+
+CLUSTER_MAP = {
+    0: ["AMERICAN", "DELTA", "UNITED", "SOUTHWEST", "ALASKA"],
+    1: ["FRONTIER", "ALLEGIANT", "SPIRIT", "JETBLUE"],
+    2: ["SUN_COUNTRY", "HAWAIIN", "SKYWEST"],
+}
+
+
+async def _get(port, path):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: test\r\n\r\n".encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    await writer.wait_closed()
+    head, body = response.split(b"\r\n\r\n", 1)
+    status = int(head.split()[1])
+    return status, json.loads(body)
+
+
+def _with_server(wide_df, scenario):
+    async def main():
+        server = await DashboardService(wide_df, CLUSTER_MAP).start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return await scenario(port)
+
+    return asyncio.run(main())
+
+
+def test_serves_chart_data_over_http(wide_df):
+    async def scenario(port):
+        return await asyncio.gather(
+            _get(port, "/health"),
+            _get(port, "/charts"),
+            _get(port, "/charts/net-income?start=2010&end=2012"),
+            _get(port, "/charts/cluster-passengers?cluster=1"),
+            _get(port, "/charts/performance-index?start=2010&end=2019"),
+        )
+
+    health, charts, income, cluster, index = _with_server(wide_df, scenario)
+    assert health == (200, {"status": "ok"})
+    assert charts[1]["years"] == [2003, 2023]
+    assert set(charts[1]["charts"]) == set(service.CHARTS)
+
+    status, figure = income
+    assert status == 200
+    assert len(figure["data"]) == 12
+    delta = next(t for t in figure["data"] if t["name"] == "DELTA")
+    assert delta["x"] == [2010, 2011, 2012]
+    expected = wide_df[wide_df["Year"] == 2011]["DELTA_AIRLINE_NET_INCOME"]
+    assert delta["y"][1] == pytest.approx(expected.sum())
+
+    assert [t["name"] for t in cluster[1]["data"]] == CLUSTER_MAP[1]
+    assert index[1]["layout"]["title"]["text"].endswith("(2010-2019)")
+
+
+def test_bad_requests_get_json_errors(wide_df):
+    async def scenario(port):
+        return await asyncio.gather(
+            _get(port, "/charts/net-income?airlines=DELTA,NOPE"),
+            _get(port, "/charts/revenue?start=1990"),
+            _get(port, "/charts/forecast?metric=Profit"),
+            _get(port, "/nowhere"),
+        )
+
+    unknown, years, metric, missing = _with_server(wide_df, scenario)
+    assert unknown == (400, {"error": "Unknown airlines: NOPE"})
+    assert years[0] == 400 and metric[0] == 400
+    assert missing[0] == 404
+
+
+def test_identical_requests_share_one_computation(wide_df, monkeypatch):
+    calls = []
+    revenue = DashboardData.revenue
+
+    def counting(self, **kwargs):
+        calls.append(kwargs)
+        return revenue(self, **kwargs)
+
+    monkeypatch.setitem(
+        service.CHARTS, "revenue", (counting, service.CHARTS["revenue"][1])
+    )
+
+    async def scenario(port):
+        paths = ["/charts/revenue?airlines=DELTA"] * 5 + ["/charts/revenue"]
+        return await asyncio.gather(*(_get(port, p) for p in paths))
+
+    responses = _with_server(wide_df, scenario)
+    assert all(status == 200 for status, _ in responses)
+    assert len(calls) == 2
+
+
+def test_forecast_runs_off_the_event_loop(wide_df, monkeypatch):
+    threads = []
+    forecast = DashboardData.forecast
+
+    def recording(self, **kwargs):
+        threads.append(threading.current_thread())
+        return forecast(self, **kwargs)
+
+    monkeypatch.setitem(
+        service.CHARTS, "forecast", (recording, service.CHARTS["forecast"][1])
+    )
+
+    async def main():
+        app = DashboardService(wide_df, CLUSTER_MAP)
+        return await app.respond("GET", "/charts/forecast?metric=Revenue")
+
+    status, figure = asyncio.run(main())
+    assert status == 200
+    assert threads and threads[0] is not threading.main_thread()
+    names = [t["name"] for t in figure["data"]]
+    assert names[:2] == ["Legacy Actual", "Legacy Forecast"]
+    assert len(figure["data"][1]["x"]) == service.FORECAST_HORIZON
@@ -0,0 +1,102 @@
+import base64
+import json
+
+import numpy as np
+import plotly.graph_objects as go
+from sample import traces
+from sample.export import render_figure, render_mode, write_figure
+
+
+def _decode(spec):
+    return np.frombuffer(base64.b64decode(spec["bdata"]), spec["dtype"])
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    x = np.arange(1000.0)
+    y = np.zeros(1000)
+    y[537] = 50.0
+    keep = traces.lttb(x, y, 50)
+    assert len(keep) == 50
+    assert keep[0] == 0 and keep[-1] == 999
+    assert (np.diff(keep) > 0).all()
+    assert 537 in keep
+    assert list(traces.lttb(x[:10], y[:10], 50)) == list(range(10))
+
+
+def test_round_significant():
+    values = traces.round_significant(
+        [123456789.0, -0.000123456, 0.0, np.nan], 3
+    )
+    np.testing.assert_allclose(values[:3], [1.23e8, -1.23e-4, 0.0])
+    assert np.isnan(values[3])
+
+
+def test_typed_arrays_use_the_smallest_dtype():
+    years = traces.typed_array(np.arange(2003, 2024))
+    assert years["dtype"] == "i2"
+    assert list(_decode(years)) == list(range(2003, 2024))
+
+    revenue = traces.typed_array([1234567891.0, 2.5, np.nan], digits=6)
+    assert revenue["dtype"] == "f4"
+    np.testing.assert_allclose(
+        _decode(revenue)[:2], [1.23457e9, 2.5], rtol=1e-7
+    )
+    assert np.isnan(_decode(revenue)[2])
+
+    assert traces.typed_array([2**40])["dtype"] == "f8"
+    assert traces.typed_array([0.1], digits=10)["dtype"] == "f8"
+
+
+def test_compact_figure_downsamples_long_lines_only():
+    x = np.arange(20000.0)
+    y = np.sin(x / 300)
+    fig = go.Figure(
+        [
+            go.Scatter(x=x, y=y, name="line"),
+            go.Scatter(x=x, y=y, fill="tozeroy", name="area"),
+            go.Bar(x=["a", "b"], y=[1.5, 2.5], name="bars"),
+        ]
+    )
+    before = traces.payload_bytes(fig)
+    traces.compact_figure(fig, max_points=500)
+    line, area, bars = fig.data
+    assert len(_decode(line.y)) == 500
+    assert len(_decode(area.y)) == 20000
+    assert list(bars.x) == ["a", "b"] and bars.y["dtype"] == "f4"
+    assert traces.payload_bytes(fig) < before / 3
+
+    # Already encoded traces are left alone.
+    again = traces.payload_bytes(traces.compact_figure(fig, max_points=100))
+    assert again == traces.payload_bytes(fig)
+
+
+def test_prepare_xy_keeps_dates():
+    dates = np.arange("2003-01", "2023-01", dtype="datetime64[M]")
+    y = np.linspace(0, 1, len(dates))
+    x, kept, keep = traces.prepare_xy(dates, y, max_points=24)
+    assert len(x) == len(keep) == 24
+    assert x.dtype.kind == "M" and x[0] == dates[0]
+    np.testing.assert_array_equal(kept, y[keep])
+
+
+def test_downsampling_keeps_labels_aligned():
+    labels = np.array([f"p{i}" for i in range(3000)])
+    fig = go.Figure(go.Scatter(x=labels, y=np.arange(3000.0)))
+    traces.compact_figure(fig, max_points=100)
+    y = _decode(fig.data[0].y)
+    assert len(fig.data[0].x) == len(y) == 100
+    assert [f"p{int(v)}" for v in y] == list(fig.data[0].x)
+
+
+def test_rendered_figures_keep_their_arrays(tmp_path):
+    y = np.sin(np.arange(5000.0) / 50)
+    fig = go.Figure(go.Scatter(x=np.arange(5000), y=y))
+    with render_mode("export-only"):
+        returned = render_figure(fig, "wave")
+    assert returned is fig
+    np.testing.assert_array_equal(fig.data[0].y, y)
+
+    path = write_figure(fig, "wave", str(tmp_path), "json")
+    with open(path) as fh:
+        written = json.load(fh)["data"][0]
+    assert len(_decode(written["y"])) == traces._settings["max_points"]
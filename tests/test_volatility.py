@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sample.catalog import ColumnCatalog
+from sample.volatility import RollingStd, VolatilityEngine, market_shares
+
+
+def _reference(df, metric, window):
+    catalog = ColumnCatalog.for_frame(df)
+    airlines = [a for a in catalog.airlines if catalog.get(a, metric)]
+    values = df[[catalog.get(a, metric) for a in airlines]].fillna(0)
+    shares = values.div(values.sum(axis=1), axis=0)
+    shares.columns = airlines
+    return shares.rolling(window).std()
+
+
+def test_rolling_std_matches_pandas_for_every_window():
+    x = np.random.default_rng(0).normal(size=(40, 5)).cumsum(axis=0)
+    rolling = RollingStd(5, windows=(6, 2, 13))
+    out = np.stack([rolling.update(row) for row in x])
+    for w, window in enumerate((2, 6, 13)):
+        expected = pd.DataFrame(x).rolling(window).std().to_numpy()
+        np.testing.assert_allclose(out[:, w], expected, atol=1e-10)
+
+    with pytest.raises(ValueError):
+        RollingStd(5, windows=(1, 4))
+
+
+def test_shares_are_taken_per_metric(wide_df):
+    engine = VolatilityEngine(wide_df, windows=(4, 8))
+    for metric in ("PASSENGER", "OPERATING_REVENUE"):
+        for window in (4, 8):
+            got = engine.volatility(metric, window)
+            expected = _reference(wide_df, metric, window)
+            np.testing.assert_allclose(got, expected, atol=1e-12)
+            assert list(got.columns) == list(expected.columns)
+
+    shares = market_shares([[1.0, np.nan, 3.0], [0.0, 0.0, 0.0]])
+    np.testing.assert_allclose(shares, [[0.25, 0.0, 0.75], [0, 0, 0]])
+
+
+def test_append_matches_a_single_pass(wide_df):
+    whole = VolatilityEngine(wide_df, windows=(4, 12))
+    engine = VolatilityEngine(wide_df.iloc[:30], windows=(4, 12))
+    new = engine.append(wide_df.iloc[30:60])
+    assert len(new) == 30
+    engine.append(wide_df.iloc[60:])
+    pd.testing.assert_frame_equal(engine.frame, whole.frame)
+
+    summary = whole.summary(4)
+    assert list(summary.columns) == ["Metric", "Airline", "Volatility"]
+    assert len(summary) == 24
+    assert summary["Volatility"].is_monotonic_decreasing